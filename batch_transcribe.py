@@ -0,0 +1,128 @@
+# batch_transcribe.py
+"""
+Convierte una carpeta de dictaciones grabadas (WAV int16 mono 16 kHz)
+en proformas Excel, en paralelo y sin Qt.
+
+Cada fichero pasa por el mismo pipeline que voice_replay.py
+(recognizer -> VoiceNormalizer -> CommandState -> ProformaModel) y
+acaba en export_proforma_to_excel. Cada proceso del pool carga el
+modelo Vosk y los materiales una sola vez.
+
+Uso:
+    python batch_transcribe.py grabaciones/
+    python batch_transcribe.py grabaciones/ --salida proformas/ --procesos 4
+"""
+import argparse
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from core.env import load_env
+from db.materials_repository import load_materials
+from excel.excel_exporter import export_proforma_to_excel, output_dir
+from voice.recognizer_service import MODEL_PATH, get_recognizer_service
+from voice_replay import GRAMMAR_CHOICES, replay
+
+# Estado de cada proceso del pool
+_materials = None
+_model_path = None
+
+
+def _init_worker(model_path: str):
+    global _materials, _model_path
+    _model_path = model_path
+    _materials = load_materials()
+    get_recognizer_service(model_path).model()
+
+
+def transcribe_file(path: str, output_dir: str, grammar: str, use_vad: bool) -> dict:
+    """Una grabación -> un .xlsx. Devuelve métricas simples (picklables)."""
+    start = time.perf_counter()
+    stats = replay(
+        path,
+        grammar=grammar,
+        use_vad=use_vad,
+        model_path=_model_path,
+        verbose=False,
+        materials=_materials,
+    )
+
+    name = os.path.splitext(os.path.basename(path))[0]
+    output_path = export_proforma_to_excel(
+        stats["model"],
+        output_path=os.path.join(output_dir, f"{name}.xlsx"),
+        open_file=False,
+    )
+
+    return {
+        "path": path,
+        "output": output_path,
+        "audio": stats["audio"],
+        "wall": time.perf_counter() - start,
+        "tokens": stats["tokens"],
+        "errors": stats["errors"],
+        "rows": stats["model"].row_count(),
+    }
+
+
+def main():
+    load_env()
+    parser = argparse.ArgumentParser(description="Dictaciones grabadas -> proformas Excel")
+    parser.add_argument("directory", help="carpeta con ficheros .wav")
+    parser.add_argument("--salida", default=output_dir(), help="carpeta de los .xlsx")
+    parser.add_argument("--procesos", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--gramatica", choices=GRAMMAR_CHOICES, default="modo")
+    parser.add_argument("--sin-vad", action="store_true")
+    parser.add_argument("--model", default=MODEL_PATH)
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(args.directory, "*.wav")))
+    if not paths:
+        print(f"No hay ficheros .wav en {args.directory}")
+        return
+
+    workers = max(1, min(args.procesos, len(paths)))
+    print(f"{len(paths)} grabaciones, {workers} procesos")
+
+    start = time.perf_counter()
+    results = []
+    failed = 0
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(args.model,),
+    ) as pool:
+        futures = {
+            pool.submit(transcribe_file, path, args.salida, args.gramatica, not args.sin_vad): path
+            for path in paths
+        }
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                failed += 1
+                print(f"❌ {path}: {e}")
+                continue
+            results.append(result)
+            print(
+                f"✅ {os.path.basename(path):<30} {result['audio']:7.1f} s audio  "
+                f"{result['wall']:6.1f} s  {result['rows']:3d} filas  "
+                f"{result['errors']:3d} no reconocidos -> {result['output']}"
+            )
+
+    wall = time.perf_counter() - start
+    audio = sum(r["audio"] for r in results)
+    tokens = sum(r["tokens"] for r in results)
+
+    print()
+    print(f"Ficheros:         {len(results)} correctos, {failed} con error")
+    print(f"Audio total:      {audio:.1f} s")
+    print(f"Tiempo total:     {wall:.1f} s  ({audio / wall if wall else 0:.1f}x tiempo real)")
+    print(f"Rendimiento:      {len(results) / wall * 60 if wall else 0:.1f} ficheros/min, "
+          f"{tokens / wall if wall else 0:.1f} tokens/s")
+
+
+if __name__ == "__main__":
+    main()
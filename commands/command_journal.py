@@ -0,0 +1,139 @@
+# commands/command_journal.py
+"""
+Diario de comandos: cada token que pasa por CommandState.handle_word se
+añade a un .jsonl junto al mensaje resultante. Los cambios que no son
+tokens (clic en una celda, edición a mano, generar proforma, palabra
+retractada...) se guardan como checkpoint con las filas completas y lo
+pendiente de CommandState (número y producto a medio dictar).
+
+replay_journal() reconstruye el ProformaModel sin Qt y compara los
+mensajes con los grabados: sirve para recuperar una sesión tras un
+cierre inesperado y como regresión / benchmark de CommandState.
+"""
+import json
+import os
+import time
+from dataclasses import asdict, dataclass, field
+
+from commands.command_state import CommandState
+from core.env import getenv
+from core.session import ProformaSession
+from models.proforma_model import ProformaModel
+from models.proforma_row import ProformaRow
+
+
+def command_journal_enabled() -> bool:
+    """COMMAND_JOURNAL=1 -> registrar cada token procesado."""
+    return getenv("COMMAND_JOURNAL", "0").strip().lower() in ("1", "true", "si", "sí")
+
+
+def journals_dir() -> str:
+    return getenv("COMMAND_JOURNAL_DIR", ".cache/journal")
+
+
+class CommandJournal:
+    """
+    Escritura solo por añadido, una línea JSON por entrada:
+
+        {"token": "CANTIDAD", "msg": "Modo CANTIDAD activado...", "row": 0, "mode": "QUANTITY"}
+        {"checkpoint": {"rows": [...], "active_row": 3, "mode": "PRODUCT",
+                        "number_words": [], "product_buffer": ["EPOXI", "VERDE"]}}
+
+    El fichero va con buffer de línea: cada entrada llega al sistema
+    operativo al escribirla, así que un cierre del proceso no la pierde.
+    """
+
+    def __init__(self, path: str | None = None):
+        self.path = path or os.path.join(journals_dir(), time.strftime("%Y%m%d-%H%M%S") + ".jsonl")
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8", buffering=1)
+
+    def record(self, token: str, message: str, state):
+        self._write({
+            "token": token,
+            "msg": message,
+            "row": state.active_row,
+            "mode": state.mode.name,
+        })
+
+    def checkpoint(self, model, state):
+        self._write({
+            "checkpoint": {
+                "rows": [asdict(row) for row in model.rows],
+                **state.checkpoint_data(),
+            }
+        })
+
+    def close(self):
+        self._file.close()
+
+    def _write(self, entry: dict):
+        self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+# --------------------------------------------------
+# Replay
+# --------------------------------------------------
+
+@dataclass
+class JournalReplay:
+    model: ProformaModel
+    state: CommandState
+    tokens: int = 0
+    seconds: float = 0.0  # solo CommandState (sin lectura del fichero)
+    mismatches: list[tuple[int, str, str, str]] = field(default_factory=list)  # línea, token, grabado, ahora
+
+    @property
+    def tokens_per_second(self) -> float:
+        return self.tokens / self.seconds if self.seconds else 0.0
+
+
+def read_journal(path: str) -> list[tuple[int, dict]]:
+    """(nº de línea, entrada). Una última línea a medias (cierre brusco) se ignora."""
+    entries = []
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entries.append((number, json.loads(line)))
+            except json.JSONDecodeError:
+                break
+    return entries
+
+
+def restore_checkpoint(checkpoint: dict, model, state):
+    model.replace_rows([ProformaRow(**row) for row in checkpoint["rows"]])
+    state.restore_checkpoint_data(checkpoint)
+
+
+def replay_journal(path: str, materials: dict, entries=None) -> JournalReplay:
+    """Aplica el diario sobre un modelo nuevo (una fila PRODUCT, como la UI)."""
+    session = ProformaSession(materials)
+    result = JournalReplay(session.model, session.state)
+    entries = entries if entries is not None else read_journal(path)
+
+    # Tokens seguidos -> un único apply_tokens (como un lote de la UI)
+    run: list[tuple[int, dict]] = []
+
+    def flush():
+        if not run:
+            return
+        start = time.perf_counter()
+        batch = session.apply([entry["token"] for _, entry in run])
+        result.seconds += time.perf_counter() - start
+        result.tokens += len(run)
+        for (number, entry), message in zip(run, batch.messages):
+            if message != entry["msg"]:
+                result.mismatches.append((number, entry["token"], entry["msg"], message))
+        run.clear()
+
+    for number, entry in entries:
+        if "checkpoint" in entry:
+            flush()
+            restore_checkpoint(entry["checkpoint"], result.model, result.state)
+        else:
+            run.append((number, entry))
+    flush()
+    return result
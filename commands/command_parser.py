@@ -1,13 +1,51 @@
 # commands/command_parser.py
-def parse_command(command_text, model, state):
-    tokens = command_text.split()
-    last_msg = ""
+from dataclasses import dataclass, field
 
-    for token in tokens:
-        msg = state.handle_word(token, model)
-        last_msg = msg
 
-    return state.active_row, last_msg
+@dataclass
+class CommandBatch:
+    """
+    Resultado de aplicar varios tokens seguidos.
+
+    rows: filas sobre las que han actuado los comandos (la activa al
+    empezar y la activa tras cada token). Solo esas cambian en el modelo,
+    salvo que structural indique filas añadidas / borradas.
+    """
+    messages: list[str] = field(default_factory=list)
+    rows: set[int] = field(default_factory=set)
+    structural: bool = False
+    mode_changed: bool = False
+
+    @property
+    def message(self) -> str:
+        return self.messages[-1] if self.messages else ""
+
+    def extend(self, other: "CommandBatch"):
+        """Añade un lote posterior (mode_changed lo calcula quien agrupa)."""
+        self.messages += other.messages
+        self.rows |= other.rows
+        self.structural |= other.structural
 
 
+def apply_tokens(tokens, model, state) -> CommandBatch:
+    """Aplica los tokens al modelo y devuelve qué hay que repintar."""
+    batch = CommandBatch()
+    row_count = model.row_count()
+    mode = state.mode
+    batch.rows.add(state.active_row)
 
+    for token in tokens:
+        batch.messages.append(state.handle_word(token, model))
+        batch.rows.add(state.active_row)
+        # Borrar + crear en el mismo lote deja el mismo número de filas
+        if model.row_count() != row_count:
+            batch.structural = True
+            row_count = model.row_count()
+
+    batch.mode_changed = state.mode != mode
+    return batch
+
+
+def parse_command(command_text, model, state):
+    batch = apply_tokens(command_text.split(), model, state)
+    return state.active_row, batch.message
@@ -1,8 +1,14 @@
 #command_state.py
 
-import os
 import re
+import time
+from collections import Counter, defaultdict
 from models.proforma_row import ProformaRow
+from commands.material_index import MaterialIndex
+from commands.product_ranker import ProductRanker
+from commands.product_resolver import merge_numeric_tokens
+from commands.spanish_numbers import SpanishNumberParser
+from core.env import getenv
 from enum import Enum, auto
 
 
@@ -18,6 +24,62 @@ class CommandMode(Enum):
     PRICE = auto()
     ROW = auto()
 
+
+# --------------------------------------------------
+# Tabla de transiciones: (modos, token, método)
+# --------------------------------------------------
+# token = palabra literal o clase de token. Al resolver una palabra:
+# literal > TRIGGER (PRODUCT_TRIGGER_WORDS) > NUMBER > ANY.
+# Todos los métodos reciben (word, model).
+
+TRIGGER = "<trigger>"
+NUMBER = "<numero>"
+ANY = "<otra>"
+TOKEN_CLASSES = (TRIGGER, NUMBER, ANY)
+
+ALL_MODES = tuple(CommandMode)
+NUMBER_MODES = (CommandMode.QUANTITY, CommandMode.PRICE)
+
+TRANSITIONS = [
+    # CANCELAR -> máxima prioridad
+    (ALL_MODES, "CANCELAR", "_cmd_cancel"),
+
+    # ROW: subcomandos / formato de fila o número de fila
+    ((CommandMode.ROW,), "TITULO", "_cmd_title"),
+    ((CommandMode.ROW,), "INFORMACION", "_cmd_info"),
+    ((CommandMode.ROW,), "DETALLE", "_cmd_info"),
+    ((CommandMode.ROW,), "PRODUCTO", "_cmd_product_row"),
+    ((CommandMode.ROW,), "VACIA", "_cmd_empty"),
+    ((CommandMode.ROW,), "BORRAR", "_cmd_delete"),
+    ((CommandMode.ROW,), NUMBER, "_cmd_row_number"),
+    ((CommandMode.ROW,), ANY, "_cmd_invalid_row"),
+
+    # QUANTITY / PRICE: numerales, SIGUIENTE, FILA y triggers
+    (NUMBER_MODES, ANY, "_edit_number"),
+
+    # PRODUCT: acotar candidatos / SIGUIENTE confirma
+    ((CommandMode.PRODUCT,), ANY, "_handle_product_word"),
+
+    # IDLE: movimiento, edición de celda y activar PRODUCT con token inicial
+    ((CommandMode.IDLE,), "FILA", "_cmd_row"),
+    ((CommandMode.IDLE,), "SIGUIENTE", "_cmd_next"),
+    ((CommandMode.IDLE,), "PRODUCTO", "_cmd_product_selection"),
+    ((CommandMode.IDLE,), "CANTIDAD", "_cmd_quantity"),
+    ((CommandMode.IDLE,), "PRECIO", "_cmd_price"),
+    ((CommandMode.IDLE,), TRIGGER, "_cmd_product_trigger"),
+    ((CommandMode.IDLE,), ANY, "_cmd_unknown"),
+]
+
+# Especulación sobre hipótesis parciales: la misma resolución que
+# handle_word, pero solo estos métodos tienen versión sin ProformaModel
+# (modo y candidatos). Cualquier otra transición detiene la especulación.
+SPECULATIVE_STEPS = {
+    "_cmd_product_selection": "_speculate_begin_product",
+    "_cmd_product_row": "_speculate_begin_product",
+    "_cmd_product_trigger": "_speculate_product_trigger",
+    "_handle_product_word": "_speculate_product_word",
+}
+
 def normalize_product_tokens(name: str) -> list[str]:
     """
     'EPOXI RAL 7043 K-1'
@@ -66,142 +128,321 @@ class CommandState:
         self.materials = materials
         self.active_row = 0
         self.mode = CommandMode.IDLE
-        self.number_buffer = ""
+        self.number_parser = SpanishNumberParser()
 
         # Producto
+        # _product_ids: ids de MaterialIndex (None = todo el catálogo)
+        self.index = MaterialIndex(self.materials.keys())
+        self.ranker = ProductRanker(self.index)
         self.product_buffer: list[str] = []
-        self.product_matches: list[str] = []
+        self._product_ids: frozenset[int] | None = frozenset()
+        self._product_names: list[str] | None = None
 
-        self.material_tokens = {
-            name: normalize_product_tokens(name)
-            for name in self.materials.keys()
-        }
+        # Secuencia de dígitos en curso (códigos RAL / referencias)
+        self._digit_node = None
+        self._digit_base: frozenset[int] | None = None
+
+        # Acotado especulativo sobre parciales: estado confirmado + palabras aplicadas
+        self._speculative_base = None
+        self._speculative_words: list[str] = []   # aplicadas
+        self._speculative_hypothesis: list[str] = []  # última recibida
 
         self.product_triggers = [
             t.strip().upper()
-            for t in os.getenv("PRODUCT_TRIGGER_WORDS", "PRODUCTO").split(",")
+            for t in getenv("PRODUCT_TRIGGER_WORDS", "PRODUCTO").split(",")
         ]
 
-        # 1️⃣ Movimiento absoluto / prioridad
-        self.MOVEMENT_COMMANDS = {
-            "CANCELAR": self._cmd_cancel,
-            "FILA": self._cmd_row,
-            "SIGUIENTE": self._cmd_next,
-        }
+        # CommandJournal opcional: registra cada token y su mensaje
+        self.journal = None
 
-        # 2️⃣ Selección / edición de celda
-        self.EDIT_COMMANDS = {
-            "PRODUCTO": self._cmd_product_selection,
-            "CANTIDAD": self._cmd_quantity,
-            "PRECIO": self._cmd_price,
-        }
+        # Contadores por transición "MODO:token" (veces / segundos)
+        self.transition_hits = Counter()
+        self.transition_seconds = defaultdict(float)
+        self._compile_transitions()
 
-        # 3️⃣ Subcomandos ROW / formato de fila
-        self.ROW_SUBCOMMANDS = {
-            "TITULO": self._cmd_title,
-            "INFORMACION": self._cmd_info,
-            "DETALLE": self._cmd_info,
-            "PRODUCTO": self._cmd_product_row,
-            "VACIA": self._cmd_empty,
-            "BORRAR": self._cmd_delete,
+    # --------------------------------------------------
+    # Candidatos de producto
+    # --------------------------------------------------
+
+    @property
+    def product_matches(self) -> list[str]:
+        """Nombres candidatos en orden de catálogo (no modificar la lista)."""
+        if self._product_ids is None:
+            return self.index.names
+        if self._product_names is None:
+            self._product_names = self.index.names_for(self._product_ids)
+        return self._product_names
+
+    @product_matches.setter
+    def product_matches(self, names):
+        self.discard_speculation()
+        names = list(names)
+        if len(names) == len(self.index):
+            self._set_product_ids(None)
+        else:
+            self._set_product_ids(self.index.ids_for_names(names))
+
+    def product_suggestions(self, k: int = 50) -> list[str]:
+        """Los k mejores candidatos según ProductRanker."""
+        return self.ranker.suggest(self.product_buffer, self._product_ids, k)
+
+    @property
+    def product_match_count(self) -> int:
+        if self._product_ids is None:
+            return len(self.index)
+        return len(self._product_ids)
+
+    def _set_product_ids(self, ids):
+        self._product_ids = ids
+        self._product_names = None
+
+    def _end_digit_run(self):
+        self._digit_node = None
+        self._digit_base = None
+
+    def _narrow_product(self, ids, node, base, word: str):
+        """
+        Un paso de acotado sin tocar el estado.
+        Devuelve (ids, nodo del trie, base de la secuencia de dígitos).
+        """
+        if word.isdigit():
+            # 🔢 Dígitos: bajar por el trie desde el inicio de la secuencia
+            if node is None:
+                base = ids
+            for digit in word:
+                node, ids = self.index.narrow_digit(base, node, digit)
+            return ids, node, base
+        # 🔥 Acotar sobre los candidatos actuales (índice invertido)
+        return self.index.narrow(ids, word), None, None
+
+    def choose_product_alternative(self, alternatives: list[list[str]]) -> int:
+        """
+        N-best del reconocedor en modo PRODUCT: índice de la alternativa que
+        deja el conjunto de candidatos no vacío más pequeño. Empate -> la
+        primera (más probable según Vosk). Ninguna válida -> 0.
+        """
+        if self.mode != CommandMode.PRODUCT:
+            return 0
+
+        best, best_count = 0, None
+        for i, words in enumerate(alternatives):
+            ids, node, base = self._product_ids, self._digit_node, self._digit_base
+            for word in words:
+                word = normalize_spoken_number(word.upper())
+                if word in ("CANCELAR", "SIGUIENTE"):
+                    break  # fin del acotado
+                ids, node, base = self._narrow_product(ids, node, base, word)
+            count = len(self.index) if ids is None else len(ids)
+            if count and (best_count is None or count < best_count):
+                best, best_count = i, count
+        return best
+
+    def begin_product(self):
+        """Entrar en modo PRODUCT con todo el catálogo como candidato."""
+        self.discard_speculation()
+        self._start_product()
+
+    def _start_product(self):
+        self.mode = CommandMode.PRODUCT
+        self.product_buffer.clear()
+        self._end_digit_run()
+        self._set_product_ids(None)
+
+    # --------------------------------------------------
+    # Especulación sobre hipótesis parciales
+    # --------------------------------------------------
+
+    def snapshot(self):
+        """Estado de fila/modo/número/producto para deshacer (los sets no se mutan nunca)."""
+        return (
+            self.active_row,
+            self.mode,
+            list(self.number_parser.words),
+            list(self.product_buffer),
+            self._product_ids,
+            self._product_names,
+            self._digit_node,
+            self._digit_base,
+        )
+
+    def restore(self, snapshot):
+        (
+            self.active_row,
+            self.mode,
+            number_words,
+            buffer,
+            self._product_ids,
+            self._product_names,
+            self._digit_node,
+            self._digit_base,
+        ) = snapshot
+        self.number_parser.words = list(number_words)
+        self.product_buffer[:] = buffer
+
+    def checkpoint_data(self) -> dict:
+        """
+        snapshot() del estado confirmado en JSON, para el diario: los
+        candidatos y la posición en el trie de dígitos salen del buffer.
+        """
+        active_row, mode, number_words, buffer = (self._speculative_base or self.snapshot())[:4]
+        return {
+            "active_row": active_row,
+            "mode": mode.name,
+            "number_words": list(number_words),
+            "product_buffer": list(buffer),
         }
+
+    def restore_checkpoint_data(self, data: dict):
+        """Inverso de checkpoint_data(): mismo estado que cuando se guardó."""
+        self.reset()
+        self.active_row = data["active_row"]
+        mode = CommandMode[data["mode"]]
+        buffer = data.get("product_buffer", [])
+        if mode == CommandMode.PRODUCT or buffer:
+            self._start_product()
+            for word in buffer:
+                self._add_product_word(word)
+        self.mode = mode
+        self.number_parser.words = list(data.get("number_words", []))
+
+    @property
+    def speculating(self) -> bool:
+        return self._speculative_base is not None
+
+    def speculate(self, words: list[str]) -> bool:
+        """
+        Acota productos con palabras aún no confirmadas por el reconocedor.
+
+        Cada palabra se resuelve con la misma tabla que handle_word; solo
+        avanzan las transiciones de SPECULATIVE_STEPS, que tocan modo y
+        candidatos (nunca el ProformaModel). La primera otra la detiene. Si la hipótesis amplía la
+        anterior solo se aplican las palabras nuevas; si no, se parte del
+        estado confirmado. Devuelve True si el estado visible ha cambiado.
+        """
+        words = [normalize_spoken_number(w.upper()) for w in words]
+        if self._speculative_base is not None and words == self._speculative_hypothesis:
+            return False
+        self._speculative_hypothesis = words
+
+        changed = False
+        if self._speculative_base is None:
+            self._speculative_base = self.snapshot()
+        elif words[:len(self._speculative_words)] == self._speculative_words:
+            words = words[len(self._speculative_words):]
+        else:
+            self.restore(self._speculative_base)
+            self._speculative_words = []
+            changed = True
+
+        for word in words:
+            key, _ = self._resolve(word)
+            step = self._speculative_steps.get(key)
+            if step is None or not step(word):
+                break
+            self._speculative_words.append(word)
+            changed = True
+        return changed
+
+    def _speculate_begin_product(self, word) -> bool:
+        self._start_product()
+        return True
+
+    def _speculate_product_trigger(self, word) -> bool:
+        self._start_product()
+        self._add_product_word(word)
+        return True
+
+    def _speculate_product_word(self, word) -> bool:
+        # Confirmar escribe en el modelo: eso solo con palabras confirmadas
+        if word == "SIGUIENTE":
+            return False
+        self._add_product_word(word)
+        return True
+
+    def discard_speculation(self) -> bool:
+        """Vuelve al estado confirmado. True si había especulación."""
+        if self._speculative_base is None:
+            return False
+        self.restore(self._speculative_base)
+        self._speculative_base = None
+        self._speculative_words = []
+        self._speculative_hypothesis = []
+        return True
+
     # --------------------------------------------------
 
     def reset(self):
+        self.discard_speculation()
         self.mode = CommandMode.IDLE
-        self.number_buffer = ""
+        self.number_parser.reset()
         self.product_buffer.clear()
-        self.product_matches.clear()
+        self._end_digit_run()
+        self._set_product_ids(frozenset())
 
     # --------------------------------------------------
 
     def handle_word(self, word: str, model):
+        # Las palabras confirmadas siempre parten del estado confirmado
+        self.discard_speculation()
         word = normalize_spoken_number(word.upper())
 
-        # ------------------------------
-        # CANCELAR -> máxima prioridad
-        # ------------------------------
-        if word == "CANCELAR":
-            return self._cmd_cancel(model)
-
-        # ------------------------------
-        # MODO ROW -> interceptar antes
-        # ------------------------------
-        if self.mode == CommandMode.ROW:
-            # Subcomandos ROW
-            if word in self.ROW_SUBCOMMANDS:
-                result = self.ROW_SUBCOMMANDS[word](model)
-                self.reset()
-                return result
-
-            # Número de fila
-            row_number = self.WORD_TO_INT.get(word)
-            if row_number is None:
-                try:
-                    row_number = int(word)
-                except ValueError:
-                    return f"Fila inválida: {word}"
-
-            if 1 <= row_number <= model.row_count():
-                self.active_row = row_number - 1
-                self.reset()
-                return f"Fila cambiada a {row_number}"
-            else:
-                return "Número de fila fuera de rango"
+        start = time.perf_counter()
+        key, handler = self._resolve(word)
+        result = handler(word, model)
+        self.transition_hits[key] += 1
+        self.transition_seconds[key] += time.perf_counter() - start
 
-        # ------------------------------
-        # MODO QUANTITY / PRICE
-        # ------------------------------
-        if self.mode in (CommandMode.QUANTITY, CommandMode.PRICE):
-            return self._edit_number(word, model)
-
-        # ------------------------------
-        # MODO PRODUCT
-        # ------------------------------
-        if self.mode == CommandMode.PRODUCT:
-            return self._handle_product_word(word, model)
-
-        # ------------------------------
-        # IDLE -> MOVIMIENTO
-        # ------------------------------
-        if word in self.MOVEMENT_COMMANDS:
-            return self.MOVEMENT_COMMANDS[word](model)
-
-        # ------------------------------
-        # IDLE -> EDICIÓN
-        # ------------------------------
-        if word in self.EDIT_COMMANDS:
-            return self.EDIT_COMMANDS[word](model)
-
-        # ------------------------------
-        # IDLE -> PRODUCT TRIGGERS
-        # ------------------------------
-# ------------------------------
-# IDLE -> activar PRODUCT con token inicial
-# ------------------------------
-        if self.mode == CommandMode.IDLE and word in self.product_triggers:
-            self.mode = CommandMode.PRODUCT
-            self.product_buffer.clear()
-            self.product_matches = list(self.materials.keys())
-            return self._handle_product_word(word, model)
-
-
-        # ------------------------------
-        # IDLE -> PRODUCTO EXACTO
-        # ------------------------------
-        if word in self.product_triggers:
-            self.mode = CommandMode.PRODUCT
-            self.product_buffer = []
-            self.product_matches = list(self.materials.keys())
-
-            # 🔥 tratar el trigger como una palabra de producto normal
-            return self._handle_product_word(word, model)
+        if self.journal is not None:
+            self.journal.record(word, result, self)
+        return result
 
+    # --------------------------------------------------
+    # Tabla de transiciones
+    # --------------------------------------------------
 
-        # ------------------------------
-        # NO RECONOCIDO
-        # ------------------------------
-        return f"Palabra no reconocida: {word}"
+    def _compile_transitions(self):
+        """
+        TRANSITIONS -> por modo: dict palabra -> (clave, handler) y
+        (clave, handler) para cada clase de token.
+        """
+        literals = {mode: {} for mode in CommandMode}
+        classes = {mode: {} for mode in CommandMode}
+        speculative = {}
+        for modes, token, name in TRANSITIONS:
+            for mode in modes:
+                target = classes if token in TOKEN_CLASSES else literals
+                key = f"{mode.name}:{token}"
+                # La primera fila de la tabla gana
+                if token in target[mode]:
+                    continue
+                target[mode][token] = (key, getattr(self, name))
+                if name in SPECULATIVE_STEPS:
+                    speculative[key] = getattr(self, SPECULATIVE_STEPS[name])
+
+        self._literal_transitions = literals
+        self._class_transitions = classes
+        self._speculative_steps = speculative
+
+    def _resolve(self, word: str):
+        """(clave, handler) de la palabra en el modo actual."""
+        transition = self._literal_transitions[self.mode].get(word)
+        if transition is not None:
+            return transition
+
+        classes = self._class_transitions[self.mode]
+        if TRIGGER in classes and word in self.product_triggers:
+            return classes[TRIGGER]
+        if NUMBER in classes and (word.isdigit() or word in self.WORD_TO_INT):
+            return classes[NUMBER]
+        return classes[ANY]
+
+    def transition_summary(self, limit: int = 10) -> list[str]:
+        """Transiciones más usadas: 'MODO:token  veces  tiempo medio'."""
+        lines = []
+        for key, hits in self.transition_hits.most_common(limit):
+            mean = self.transition_seconds[key] / hits
+            lines.append(f"{key:<24} {hits:6d}  {mean * 1e6:8.1f} µs")
+        return lines
 
     # --------------------------------------------------
     # MÉTODOS PRIVADOS DE COMANDOS
@@ -210,21 +451,35 @@ class CommandState:
     # --------------------------------------------------
     # MOVIMIENTO / PRIORIDAD
     # --------------------------------------------------
-    def _cmd_cancel(self, model):
+    def _cmd_cancel(self, word, model):
         self.reset()
         return "Comando cancelado"
 
-    def _cmd_row(self, model):
+    def _cmd_row(self, word, model):
         self.mode = CommandMode.ROW
         return "Modo FILA activo"
 
+    def _cmd_row_number(self, word, model):
+        row_number = self.WORD_TO_INT.get(word) or int(word)
+        if 1 <= row_number <= model.row_count():
+            self.active_row = row_number - 1
+            self.reset()
+            return f"Fila cambiada a {row_number}"
+        return "Número de fila fuera de rango"
+
+    def _cmd_invalid_row(self, word, model):
+        return f"Fila inválida: {word}"
+
+    def _cmd_unknown(self, word, model):
+        return f"Palabra no reconocida: {word}"
+
     # --------------------------------------------------
     # MOVIMIENTO / SIGUIENTE
     # --------------------------------------------------
-    def _cmd_next(self, model):
+    def _cmd_next(self, word, model):
         if self.mode in (CommandMode.QUANTITY, CommandMode.PRICE):
             # Delegar a _edit_number para confirmar valor
-            return self._edit_number("SIGUIENTE", model)
+            return self._edit_number(word, model)
 
         if self.mode == CommandMode.IDLE:
             # Avanzar fila
@@ -238,54 +493,51 @@ class CommandState:
     # --------------------------------------------------
     # EDICIÓN DE CELDA
     # --------------------------------------------------
-    def _cmd_product_selection(self, model):
-        self.mode = CommandMode.PRODUCT
-        self.product_buffer.clear()
-        self.product_matches = list(self.materials.keys())
-        return f"Modo PRODUCT activo ({len(self.product_matches)} candidatos)"
+    def _cmd_product_selection(self, word, model):
+        # PRODUCTO solo activa el modo: no es una palabra del catálogo
+        self.begin_product()
+        return f"Modo PRODUCT activo ({self.product_match_count} candidatos)"
+
+    def _cmd_product_trigger(self, word, model):
+        # 🔥 tratar el trigger configurado como una palabra de producto normal
+        self.begin_product()
+        return self._handle_product_word(word, model)
 
-    def _cmd_quantity(self, model):
+    def _cmd_quantity(self, word, model):
         self.mode = CommandMode.QUANTITY
-        self.number_buffer = ""
+        self.number_parser.reset()
         return "Modo CANTIDAD activado, dicta números"
 
-    def _cmd_price(self, model):
+    def _cmd_price(self, word, model):
         self.mode = CommandMode.PRICE
-        self.number_buffer = ""
+        self.number_parser.reset()
         return "Modo PRECIO activado, dicta números"
 
     # --------------------------------------------------
     # SUBCOMANDOS ROW
     # --------------------------------------------------
-    def _cmd_title(self, model):
-        row = model.get_row(self.active_row)
-        row.type = "TITLE"
-        # Solo columna visible para texto, no tocar cantidad/precio
-        row.col_1 = row.col_1 or ""
-        # no tocar col_2, col_3, col_4
+    def _cmd_title(self, word, model):
+        # Solo cambia el tipo: no tocar texto, cantidad ni precio
+        model.set_row_type(self.active_row, "TITLE")
         self.reset()
         return "Fila cambiada a TITULO"
 
-    def _cmd_info(self, model):
-        row = model.get_row(self.active_row)
-        row.type = "INFO"
-        # Solo las columnas que tengan sentido para INFO
-        row.col_1 = row.col_1 or ""
-        row.col_2 = row.col_2 or ""
-        # col_3 y col_4 no tocar
+    def _cmd_info(self, word, model):
+        # Solo cambia el tipo: col_0–col_2 siguen como texto, col_3 y col_4 no tocar
+        model.set_row_type(self.active_row, "INFO")
         self.reset()
         return "Fila cambiada a DETALLE"
 
 
-    def _cmd_empty(self, model):
-        row = model.get_row(self.active_row)
-        row.type = "EMPTY"
-        row.col_1 = row.col_2 = row.col_3 = row.col_4 = ""
+    def _cmd_empty(self, word, model):
+        model.set_row_type(self.active_row, "EMPTY")
+        for column in range(1, 5):
+            model.set_cell(self.active_row, column, "")
         self.reset()
         self.move_or_create_row(model)
         return "Fila vaciada"
 
-    def _cmd_delete(self, model):
+    def _cmd_delete(self, word, model):
         model.remove_row(self.active_row)
         if model.row_count() == 0:
             model.add_row(ProformaRow(type="PRODUCT"))
@@ -296,12 +548,10 @@ class CommandState:
         self.reset()
         return "Fila borrada"
 
-    def _cmd_product_row(self, model):
+    def _cmd_product_row(self, word, model):
         # PRODUCTO como subcomando de ROW
-        self.mode = CommandMode.PRODUCT
-        self.product_buffer.clear()
-        self.product_matches = list(self.materials.keys())
-        return f"Fila PRODUCTO activa ({len(self.product_matches)} candidatos)"
+        self.begin_product()
+        return f"Fila PRODUCTO activa ({self.product_match_count} candidatos)"
 
     # --------------------------------------------------
     # PRODUCT MODE
@@ -312,34 +562,32 @@ class CommandState:
 
         # Confirmar producto
         if word == "SIGUIENTE":
-            if len(self.product_matches) == 1:
+            if self.product_match_count == 1:
                 product = self.product_matches[0]
                 model.set_product(self.active_row, product)
                 model.set_price(
                     self.active_row,
                     self.materials[product]["price"]
                 )
+                self.ranker.record_use(product)
                 self.reset()
                 return f"Producto {product} confirmado"
-            return f"{len(self.product_matches)} candidatos, sigue acotando"
-
-        # Añadir token
-        self.product_buffer.append(word)
-
-    # 🔥 CLAVE: SIEMPRE partir de TODOS los materiales
-        matches = []
-        for name in self.materials.keys():
-            name_upper = name.upper()
-            if all(token in name_upper for token in self.product_buffer):
-                matches.append(name)
-
-        self.product_matches = matches
+            return f"{self.product_match_count} candidatos, sigue acotando"
 
+        self._add_product_word(word)
         return (
-            f"Producto parcial: {' '.join(self.product_buffer)} "
-            f"({len(self.product_matches)} candidatos)"
+            f"Producto parcial: {' '.join(merge_numeric_tokens(self.product_buffer))} "
+            f"({self.product_match_count} candidatos)"
         )
-    
+
+    def _add_product_word(self, word: str):
+        """Añade la palabra al buffer y acota candidatos (sin tocar el modelo)."""
+        self.product_buffer.append(word)
+        ids, self._digit_node, self._digit_base = self._narrow_product(
+            self._product_ids, self._digit_node, self._digit_base, word
+        )
+        self._set_product_ids(ids)
+
     def move_or_create_row(self, model):
         current_row = model.get_row(self.active_row)
 
@@ -383,59 +631,53 @@ class CommandState:
         if row.type != "PRODUCT":
             return f"Fila {row.type} no admite cantidad/precio"
 
-        # Separador decimal
-        if word in ("COMA", "PUNTO"):
-            if "." not in self.number_buffer:
-                self.number_buffer += "."
-                return f"Valor parcial: {self.number_buffer}"
-            return "Ya hay un separador decimal"
-
-        # Dígito hablado o numérico
-        if word in self.WORD_TO_INT or word.isdigit():
-            digit = str(self.WORD_TO_INT.get(word, word))
-            self.number_buffer += digit
-            if self.mode == CommandMode.QUANTITY:
-                model.set_quantity(self.active_row, float(self.number_buffer))
-            else:
-                model.set_price(self.active_row, float(self.number_buffer))
-            return f"Valor parcial: {self.number_buffer}"
+        # 🔢 Numeral completo ("mil doscientos coma cincuenta"): se acumula
+        # y el modelo solo se toca una vez, al terminar el número
+        if self.number_parser.feed(word):
+            return f"Valor parcial: {self.number_parser.text} ({self.number_parser.value:g})"
 
         # SIGUIENTE confirma valor
         if word == "SIGUIENTE":
-            if not self.number_buffer:
+            if not self.number_parser.pending:
                 # Sin valor -> avanzar
                 if self.mode == CommandMode.QUANTITY:
                     self.mode = CommandMode.PRICE
-                    self.number_buffer = ""
                     return "Sin cantidad, cambiando a PRECIO"
                 elif self.mode == CommandMode.PRICE:
                     self.move_or_create_row(model)
                     self.reset()
                     return "Sin precio"
             else:
-                value = float(self.number_buffer)
+                msg = self._apply_number(model)
                 if self.mode == CommandMode.QUANTITY:
-                    model.set_quantity(self.active_row, value)
-                    msg = f"Cantidad asignada: {value}"
                     self.mode = CommandMode.PRICE
                 else:
-                    model.set_price(self.active_row, value)
-                    msg = f"Precio asignado: {value}"
                     self.move_or_create_row(model)
                     self.reset()
-                self.number_buffer = ""
                 return msg
 
-        # Cambiar a PRODUCT
+        # Cambiar a PRODUCT (el número dictado queda aplicado)
         if word in self.product_triggers:
-            self.mode = CommandMode.PRODUCT
-            self.product_buffer.clear()
-            self.product_matches = list(self.materials.keys())
-            return f"Modo PRODUCT activo ({len(self.product_matches)} candidatos)"
+            self._apply_number(model)
+            self.begin_product()
+            return f"Modo PRODUCT activo ({self.product_match_count} candidatos)"
 
         # Cambiar a ROW
         if word == "FILA":
+            self._apply_number(model)
             self.mode = CommandMode.ROW
             return "Modo FILA activo"
 
         return f"Valor inválido: {word}"
+
+    def _apply_number(self, model) -> str:
+        """Escribe el número acumulado en la celda del modo actual."""
+        value = self.number_parser.value
+        self.number_parser.reset()
+        if value is None:
+            return "Sin valor"
+        if self.mode == CommandMode.QUANTITY:
+            model.set_quantity(self.active_row, value)
+            return f"Cantidad asignada: {value}"
+        model.set_price(self.active_row, value)
+        return f"Precio asignado: {value}"
@@ -0,0 +1,158 @@
+# commands/material_index.py
+import re
+from typing import Iterable
+
+
+class DigitTrieNode:
+    __slots__ = ("children", "ids")
+
+    def __init__(self):
+        self.children: dict[str, "DigitTrieNode"] = {}
+        self.ids: set[int] = set()
+
+
+# Nodo vacío: secuencia de dígitos que no existe en el catálogo
+EMPTY_DIGIT_NODE = DigitTrieNode()
+
+
+class DigitTrie:
+    """
+    Trie de prefijos sobre las secuencias de dígitos de cada nombre.
+    'EPOXI RAL 7043 K-1' aporta las secuencias '7043' y '1'.
+
+    Cada nodo guarda los ids cuyo nombre tiene algún número que empieza
+    por ese prefijo -> cada dígito dictado baja un nivel en O(1).
+    """
+
+    def __init__(self):
+        self.root = DigitTrieNode()
+
+    def add(self, digits: str, material_id: int):
+        node = self.root
+        for digit in digits:
+            node = node.children.setdefault(digit, DigitTrieNode())
+            node.ids.add(material_id)
+
+    def step(self, node: DigitTrieNode | None, digit: str) -> DigitTrieNode:
+        """node=None -> empezar una secuencia nueva desde la raíz."""
+        node = node or self.root
+        return node.children.get(digit, EMPTY_DIGIT_NODE)
+
+
+class MaterialIndex:
+    """
+    Índice invertido del catálogo para acotar productos palabra a palabra.
+
+    - Cada material tiene un id = su posición en el orden del catálogo
+    - postings: término (trozo del nombre entre espacios) -> ids que lo contienen
+    - Una palabra hablada casa con un nombre si es substring de alguno de sus
+      términos (misma regla que `token in name.upper()`); el conjunto de ids
+      por palabra se calcula una vez y se memoiza
+    - trigrams: trigrama -> términos que lo contienen, para no recorrer todo
+      el vocabulario al buscar substrings de 3+ letras
+    - digits: DigitTrie para códigos dictados dígito a dígito (RAL, refs.)
+
+    narrow() intersecta con los candidatos anteriores: cada palabra nueva
+    cuesta lo que mide el conjunto más pequeño, no el catálogo entero.
+    Los candidatos son frozenset: se comparten sin copiar (deshacer,
+    especulación) y sirven como clave de caché (ProductRanker).
+    """
+
+    def __init__(self, names: Iterable[str]):
+        self.names: list[str] = list(names)
+        self.ids: dict[str, int] = {name: i for i, name in enumerate(self.names)}
+
+        self.postings: dict[str, set[int]] = {}
+        for material_id, name in enumerate(self.names):
+            for term in set(name.upper().split()):
+                self.postings.setdefault(term, set()).add(material_id)
+
+        self.trigrams: dict[str, set[str]] = {}
+        for term in self.postings:
+            for i in range(len(term) - 2):
+                self.trigrams.setdefault(term[i:i + 3], set()).add(term)
+
+        self.digits = DigitTrie()
+        for material_id, name in enumerate(self.names):
+            for run in set(re.findall(r"\d+", name)):
+                self.digits.add(run, material_id)
+
+        self._word_cache: dict[str, frozenset[int]] = {}
+
+    def __len__(self):
+        return len(self.names)
+
+    # --------------------------------------------------
+
+    def ids_for_word(self, word: str) -> frozenset[int]:
+        """Ids de los materiales cuyo nombre contiene `word`."""
+        word = word.upper()
+        cached = self._word_cache.get(word)
+        if cached is not None:
+            return cached
+
+        ids = set()
+        for term in self._terms_containing(word):
+            ids |= self.postings[term]
+
+        cached = frozenset(ids)
+        self._word_cache[word] = cached
+        return cached
+
+    def _terms_containing(self, word: str):
+        if len(word) < 3:
+            return [term for term in self.postings if word in term]
+
+        # Términos que tienen todos los trigramas de la palabra
+        grams = [word[i:i + 3] for i in range(len(word) - 2)]
+        term_sets = sorted((self.trigrams.get(g, set()) for g in grams), key=len)
+        terms = set(term_sets[0])
+        for term_set in term_sets[1:]:
+            terms &= term_set
+            if not terms:
+                break
+        return [term for term in terms if word in term]
+
+    def narrow(self, candidates: frozenset[int] | None, word: str) -> frozenset[int]:
+        """
+        candidates=None -> todo el catálogo.
+        Devuelve los candidatos que además contienen `word`.
+        """
+        ids = self.ids_for_word(word)
+        if candidates is None:
+            return ids
+        # intersection recorre el conjunto más pequeño
+        return candidates.intersection(ids)
+
+    def narrow_digit(
+        self,
+        base: frozenset[int] | None,
+        node: DigitTrieNode | None,
+        digit: str,
+    ) -> tuple[DigitTrieNode, frozenset[int]]:
+        """
+        Avanza un dígito en el trie.
+        base: candidatos antes de empezar la secuencia (None = todos).
+        Devuelve (nodo nuevo, candidatos).
+        """
+        node = self.digits.step(node, digit)
+        if base is None:
+            return node, frozenset(node.ids)
+        return node, base.intersection(node.ids)
+
+    def search(self, words: Iterable[str]) -> frozenset[int] | None:
+        candidates = None
+        for word in words:
+            candidates = self.narrow(candidates, word)
+            if not candidates:
+                break
+        return candidates
+
+    # --------------------------------------------------
+
+    def names_for(self, ids: Iterable[int]) -> list[str]:
+        """Nombres en el orden original del catálogo."""
+        return [self.names[i] for i in sorted(ids)]
+
+    def ids_for_names(self, names: Iterable[str]) -> frozenset[int]:
+        return frozenset(self.ids[name] for name in names if name in self.ids)
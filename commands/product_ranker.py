@@ -0,0 +1,181 @@
+# commands/product_ranker.py
+import heapq
+import math
+from collections import OrderedDict
+from itertools import islice
+
+from commands.material_index import MaterialIndex
+from commands.product_resolver import merge_numeric_tokens
+from core.text import edit_distance
+
+# Pesos de cada criterio en la puntuación
+COVERAGE_WEIGHT = 1.0   # proporción del nombre cubierta por lo dictado
+ORDER_WEIGHT = 0.5      # las palabras aparecen en el mismo orden que en el nombre
+SIMILARITY_WEIGHT = 0.5 # palabra exacta > substring > parecida (edición)
+USAGE_WEIGHT = 0.3      # productos usados recientemente
+
+USAGE_DECAY = 0.9       # cada uso nuevo "envejece" a los anteriores
+CACHE_SIZE = 256
+
+
+class ProductRanker:
+    """
+    Ordena los candidatos de producto y devuelve solo los k mejores.
+
+    - Selección top-k con heap: O(n log k) en lugar de ordenar todo
+    - Resultados cacheados por buffer (tupla de palabras) y candidatos: al
+      borrar y volver a dictar el mismo prefijo la lista sale de la caché,
+      y unos candidatos acotados por otra vía no reutilizan la de otros
+    - Si la última palabra deja 0 candidatos (mal reconocida), se puntúan
+      los candidatos de las palabras que sí casan por distancia de edición
+    """
+
+    def __init__(self, index: MaterialIndex):
+        self.index = index
+        self.terms = [name.upper().split() for name in index.names]
+
+        self._tick = 0
+        self._usage: dict[int, tuple[float, int]] = {}  # id -> (peso, tick)
+        self._cache: OrderedDict[tuple, list[str]] = OrderedDict()
+
+    # --------------------------------------------------
+    # Uso reciente
+    # --------------------------------------------------
+
+    def record_use(self, name: str):
+        material_id = self.index.ids.get(name)
+        if material_id is None:
+            return
+        self._tick += 1
+        weight, tick = self._usage.get(material_id, (0.0, self._tick))
+        weight = weight * USAGE_DECAY ** (self._tick - tick) + 1.0
+        self._usage[material_id] = (weight, self._tick)
+        self._cache.clear()
+
+    def usage(self, material_id: int) -> float:
+        entry = self._usage.get(material_id)
+        if entry is None:
+            return 0.0
+        weight, tick = entry
+        return weight * USAGE_DECAY ** (self._tick - tick)
+
+    # --------------------------------------------------
+    # Top-k
+    # --------------------------------------------------
+
+    def suggest(self, buffer: list[str], candidates: frozenset[int] | None, k: int = 50) -> list[str]:
+        """
+        buffer: palabras dictadas en modo PRODUCT.
+        candidates: ids ya acotados por MaterialIndex (None = todo el catálogo).
+        """
+        # frozenset de un frozenset no copia y guarda su hash
+        candidates = None if candidates is None else frozenset(candidates)
+        key = (tuple(buffer), candidates, k)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            return cached
+
+        words = merge_numeric_tokens([w.upper() for w in buffer])
+        fuzzy_words: list[str] = []
+
+        if candidates is None:
+            candidates = range(len(self.index))
+        elif not candidates and words:
+            candidates, fuzzy_words = self._fuzzy_candidates(words)
+
+        if words:
+            top = heapq.nlargest(
+                k,
+                candidates,
+                key=lambda material_id: (self.score(material_id, words, fuzzy_words), -material_id),
+            )
+        else:
+            top = self._top_by_usage(candidates, k)
+        result = [self.index.names[i] for i in top]
+
+        self._cache[key] = result
+        if len(self._cache) > CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return result
+
+    def _top_by_usage(self, candidates, k: int) -> list[int]:
+        """Sin palabras solo cuenta el uso: usados primero, luego orden de catálogo."""
+        if isinstance(candidates, range):
+            used = list(self._usage)
+        else:
+            used = [i for i in self._usage if i in candidates]
+        top = heapq.nlargest(k, used, key=lambda i: (self.usage(i), -i))
+        if len(top) < k:
+            chosen = set(top)
+            if isinstance(candidates, range):
+                # range ya está en orden de catálogo: basta con los primeros
+                rest = islice((i for i in candidates if i not in chosen), k - len(top))
+            else:
+                rest = heapq.nsmallest(k - len(top), candidates.difference(chosen))
+            top.extend(rest)
+        return top
+
+    def _fuzzy_candidates(self, words: list[str]) -> tuple[frozenset[int], list[str]]:
+        """Candidatos de las palabras que casan; el resto se tratan como mal oídas."""
+        candidates = None
+        fuzzy_words = []
+        for word in words:
+            narrowed = self.index.narrow(candidates, word)
+            if narrowed:
+                candidates = narrowed
+            else:
+                fuzzy_words.append(word)
+        if candidates is None:
+            # Ninguna palabra casa: sin base sobre la que puntuar
+            return frozenset(), fuzzy_words
+        return candidates, fuzzy_words
+
+    # --------------------------------------------------
+    # Puntuación
+    # --------------------------------------------------
+
+    def score(self, material_id: int, words: list[str], fuzzy_words=()) -> float:
+        terms = self.terms[material_id]
+        score = USAGE_WEIGHT * math.log1p(self.usage(material_id))
+        if not terms:
+            return score
+
+        covered = set()
+        positions = []
+        similarity = 0.0
+
+        for word in words:
+            best_position = None
+            best_similarity = 0.0
+
+            if word in fuzzy_words:
+                # Palabra mal reconocida -> término más parecido
+                for position, term in enumerate(terms):
+                    distance = edit_distance(word, term)
+                    value = 1.0 - distance / max(len(word), len(term))
+                    if value > best_similarity:
+                        best_similarity, best_position = value, position
+            else:
+                for position, term in enumerate(terms):
+                    if word in term:
+                        value = len(word) / len(term)
+                        if value > best_similarity:
+                            best_similarity, best_position = value, position
+
+            if best_position is not None:
+                covered.add(best_position)
+                positions.append(best_position)
+            similarity += best_similarity
+
+        coverage = len(covered) / len(terms)
+        score += COVERAGE_WEIGHT * coverage
+
+        if words:
+            score += SIMILARITY_WEIGHT * similarity / len(words)
+
+        if len(positions) > 1:
+            in_order = sum(1 for a, b in zip(positions, positions[1:]) if a < b)
+            score += ORDER_WEIGHT * in_order / (len(positions) - 1)
+
+        return score
@@ -0,0 +1,194 @@
+# commands/spanish_numbers.py
+"""
+Numerales en español dictados de una vez:
+
+    "mil doscientos cincuenta coma cincuenta" -> 1250.5
+    "treinta y cinco"                          -> 35
+    "dos cinco coma cero cinco"                -> 25.05 (dígito a dígito)
+"""
+import unicodedata
+
+UNITS = {
+    "CERO": 0, "UN": 1, "UNO": 1, "UNA": 1, "DOS": 2, "TRES": 3, "CUATRO": 4,
+    "CINCO": 5, "SEIS": 6, "SIETE": 7, "OCHO": 8, "NUEVE": 9,
+}
+
+TEENS = {
+    "DIEZ": 10, "ONCE": 11, "DOCE": 12, "TRECE": 13, "CATORCE": 14, "QUINCE": 15,
+    "DIECISEIS": 16, "DIECISIETE": 17, "DIECIOCHO": 18, "DIECINUEVE": 19,
+    "VEINTE": 20, "VEINTIUNO": 21, "VEINTIUN": 21, "VEINTIDOS": 22,
+    "VEINTITRES": 23, "VEINTICUATRO": 24, "VEINTICINCO": 25, "VEINTISEIS": 26,
+    "VEINTISIETE": 27, "VEINTIOCHO": 28, "VEINTINUEVE": 29,
+}
+
+TENS = {
+    "TREINTA": 30, "CUARENTA": 40, "CINCUENTA": 50, "SESENTA": 60,
+    "SETENTA": 70, "OCHENTA": 80, "NOVENTA": 90,
+}
+
+HUNDREDS = {
+    "CIEN": 100, "CIENTO": 100, "DOSCIENTOS": 200, "TRESCIENTOS": 300,
+    "CUATROCIENTOS": 400, "QUINIENTOS": 500, "SEISCIENTOS": 600,
+    "SETECIENTOS": 700, "OCHOCIENTOS": 800, "NOVECIENTOS": 900,
+}
+
+THOUSAND = "MIL"
+MILLIONS = ("MILLON", "MILLONES")
+CONJUNCTION = "Y"
+DECIMAL_SEPARATORS = ("COMA", "PUNTO")
+
+VALUES = {**UNITS, **TEENS, **TENS, **HUNDREDS}
+
+# Palabras para la gramática de Vosk (con tildes, como en el modelo)
+NUMBER_GRAMMAR = [
+    "cero", "un", "uno", "una", "dos", "tres", "cuatro", "cinco", "seis", "siete",
+    "ocho", "nueve", "diez", "once", "doce", "trece", "catorce", "quince",
+    "dieciséis", "diecisiete", "dieciocho", "diecinueve", "veinte", "veintiuno",
+    "veintiún", "veintidós", "veintitrés", "veinticuatro", "veinticinco",
+    "veintiséis", "veintisiete", "veintiocho", "veintinueve", "treinta",
+    "cuarenta", "cincuenta", "sesenta", "setenta", "ochenta", "noventa",
+    "cien", "ciento", "doscientos", "trescientos", "cuatrocientos", "quinientos",
+    "seiscientos", "setecientos", "ochocientos", "novecientos", "mil", "millón",
+    "millones", "y", "coma", "punto",
+]
+
+
+def number_key(word: str) -> str:
+    """Mayúsculas sin tildes: 'dieciséis' -> 'DIECISEIS'."""
+    word = unicodedata.normalize("NFD", word.upper())
+    return "".join(c for c in word if unicodedata.category(c) != "Mn")
+
+
+def is_number_word(word: str) -> bool:
+    key = number_key(word)
+    return (
+        key.isdigit()
+        or key in VALUES
+        or key == THOUSAND
+        or key in MILLIONS
+        or key == CONJUNCTION
+        or key in DECIMAL_SEPARATORS
+    )
+
+
+def _word_value(key: str) -> int:
+    return int(key) if key.isdigit() else VALUES[key]
+
+
+def _parse_integer(keys: list[str]) -> int:
+    total = 0
+    current = 0
+    last_digit = False  # la palabra anterior era un dígito suelto (0-9)
+
+    for key in keys:
+        if key == CONJUNCTION:
+            last_digit = False
+            continue
+        if key == THOUSAND:
+            total += (current or 1) * 1000
+            current = 0
+        elif key in MILLIONS:
+            total = (total + (current or 1)) * 1_000_000
+            current = 0
+        else:
+            value = _word_value(key)
+            digit = len(key) == 1 if key.isdigit() else key in UNITS
+            if digit and last_digit:
+                # "dos cinco" -> 25: dictado dígito a dígito
+                current = current * 10 + value
+            else:
+                current += value
+            last_digit = digit
+            continue
+        last_digit = False
+
+    return total + current
+
+
+def _valid_integer(keys: list[str]) -> bool:
+    """
+    Sin 'y' al principio ni dos seguidas, y un solo MIL por grupo de
+    millones ('mil mil' no es 2000).
+    """
+    if keys and keys[0] == CONJUNCTION:
+        return False
+    thousand = False
+    previous = None
+    for key in keys:
+        if key == THOUSAND:
+            if thousand:
+                return False
+            thousand = True
+        elif key in MILLIONS:
+            thousand = False
+        elif key == CONJUNCTION and previous == CONJUNCTION:
+            return False
+        previous = key
+    return True
+
+
+def parse_spanish_number(words) -> float | None:
+    """Valor de la secuencia completa; None si no hay número o no es válido."""
+    keys = [number_key(word) for word in words]
+    if not keys or not all(is_number_word(key) for key in keys):
+        return None
+
+    separators = [i for i, key in enumerate(keys) if key in DECIMAL_SEPARATORS]
+    # Un número no empieza por COMA / PUNTO y solo tiene un separador
+    if len(separators) > 1 or separators == [0]:
+        return None
+
+    if not separators:
+        if not _valid_integer(keys):
+            return None
+        return float(_parse_integer(keys))
+
+    split = separators[0]
+    integer_keys, decimal_keys = keys[:split], keys[split + 1:]
+    if not _valid_integer(integer_keys) or not _valid_integer(decimal_keys):
+        return None
+    integer = _parse_integer(integer_keys)
+    if not decimal_keys:
+        return float(integer)
+
+    # Decimales: los ceros iniciales cuentan ("coma cero cinco" -> .05)
+    zeros = 0
+    while zeros < len(decimal_keys) and decimal_keys[zeros] in ("CERO", "0"):
+        zeros += 1
+    rest = decimal_keys[zeros:]
+    decimals = "0" * zeros + (str(_parse_integer(rest)) if rest else "")
+    return float(f"{integer}.{decimals}")
+
+
+class SpanishNumberParser:
+    """
+    Acumula palabras de un número dictado y da el valor al final.
+
+    feed(palabra) -> False si la palabra no es numérica (el número ha
+    terminado y la palabra es otro comando).
+    """
+
+    def __init__(self):
+        self.words: list[str] = []
+
+    def reset(self):
+        self.words = []
+
+    def feed(self, word: str) -> bool:
+        # Una segunda COMA tampoco es parte del número
+        if not is_number_word(word) or parse_spanish_number(self.words + [word]) is None:
+            return False
+        self.words.append(word)
+        return True
+
+    @property
+    def pending(self) -> bool:
+        return bool(self.words)
+
+    @property
+    def value(self) -> float | None:
+        return parse_spanish_number(self.words)
+
+    @property
+    def text(self) -> str:
+        return " ".join(self.words)
@@ -0,0 +1,25 @@
+# core/env.py
+"""
+Carga de .env bajo demanda.
+
+Importar un módulo no lee .env: se carga la primera vez que algo pide
+una variable con getenv() (o al llamar a load_env() desde un script).
+Las variables ya definidas en el entorno tienen prioridad.
+"""
+import os
+
+from dotenv import load_dotenv
+
+_loaded = False
+
+
+def load_env():
+    global _loaded
+    if not _loaded:
+        _loaded = True
+        load_dotenv()
+
+
+def getenv(name: str, default: str | None = None) -> str | None:
+    load_env()
+    return os.getenv(name, default)
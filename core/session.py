@@ -0,0 +1,112 @@
+# core/session.py
+from collections import deque
+
+from commands.command_parser import CommandBatch, apply_tokens
+from commands.command_state import CommandState
+from db.materials_repository import load_materials
+from excel.excel_exporter import export_proforma_to_excel
+from generator.proforma_generator import generate_proforma
+from models.proforma_model import ProformaModel
+from models.proforma_row import ProformaRow
+
+# Palabras de voz que se pueden deshacer (una retracción solo afecta a la frase en curso)
+VOICE_UNDO_WORDS = 32
+
+
+class ProformaSession:
+    """
+    Núcleo de una proforma sin Qt: materiales + CommandState + ProformaModel.
+
+    La ventana (ui/ui_table.py) es un adaptador sobre esto; los scripts
+    por lotes, servicios y benchmarks lo usan directamente:
+
+        session = ProformaSession()
+        session.apply("POLITOP BLANCO SIGUIENTE CANTIDAD DOS SIGUIENTE")
+        session.export("proforma.xlsx")
+
+    materials: catálogo ya cargado (se comparte entre sesiones); None -> BD.
+    journal: CommandJournal opcional para CommandState.
+
+    Las palabras de voz (apply_voice) guardan las inversas de lo que
+    cambiaron en el modelo y el estado anterior de CommandState: si el
+    reconocedor retracta una, retract() deja la proforma como estaba antes
+    de ella, con avisos solo de las filas afectadas. Cualquier otro cambio
+    (apply, generate, forget_voice) cierra esa posibilidad.
+    """
+
+    def __init__(self, materials: dict | None = None, journal=None):
+        self.materials = materials if materials is not None else load_materials()
+        self.model = ProformaModel(self.materials)
+        self.model.add_row(ProformaRow(type="PRODUCT"))
+        self.state = CommandState(self.materials)
+        self.state.journal = journal
+        self._voice_undo: deque = deque(maxlen=VOICE_UNDO_WORDS)  # (palabra, inversas, estado previo)
+
+    def apply(self, tokens) -> CommandBatch:
+        """Texto o lista de tokens -> comandos aplicados al modelo."""
+        if isinstance(tokens, str):
+            tokens = tokens.upper().split()
+        self.forget_voice()
+        return apply_tokens(tokens, self.model, self.state)
+
+    # --------------------------------------------------
+    # Voz: palabras confirmadas que aún se pueden retractar
+    # --------------------------------------------------
+
+    def apply_voice(self, words: list[tuple[str, list[str]]]) -> CommandBatch:
+        """
+        words: (palabra reconocida, tokens normalizados) en orden.
+        Se aplican en un solo lote, pero cada palabra se puede deshacer.
+        """
+        batch = CommandBatch()
+        mode = self.state.mode
+        for text, tokens in words:
+            # Estado confirmado: handle_word descartaría la especulación igualmente
+            self.state.discard_speculation()
+            snapshot = self.state.snapshot()
+            self.model.record_undo()
+            try:
+                batch.extend(apply_tokens(tokens, self.model, self.state))
+            finally:
+                self._voice_undo.append((text, self.model.take_undo(), snapshot))
+        batch.mode_changed = self.state.mode != mode
+        return batch
+
+    def retract(self, text: str) -> bool:
+        """
+        Deshace la última palabra de voz 'text' y las posteriores.
+        False si ya no se puede (otro cambio por medio o demasiado antigua).
+        """
+        for i in range(len(self._voice_undo) - 1, -1, -1):
+            if self._voice_undo[i][0] != text:
+                continue
+            self.state.discard_speculation()
+            while len(self._voice_undo) > i:
+                _, ops, snapshot = self._voice_undo.pop()
+                self.model.undo(ops)
+            self.state.restore(snapshot)
+            self.model.set_active_row(self.state.active_row)
+            self.checkpoint()
+            return True
+        return False
+
+    def forget_voice(self):
+        self._voice_undo.clear()
+
+    def checkpoint(self):
+        """Filas completas al diario (cambios que no pasan por handle_word)."""
+        if self.state.journal is not None:
+            self.state.journal.checkpoint(self.model, self.state)
+
+    def generate(self, **options) -> list[ProformaRow]:
+        """Sustituye la proforma por la generada (mismos argumentos que generate_proforma)."""
+        rows = generate_proforma(**options)
+        self.forget_voice()
+        self.model.replace_rows(rows)
+        self.state.reset()
+        self.state.active_row = 0
+        self.model.set_active_row(0)
+        return rows
+
+    def export(self, output_path: str | None = None, open_file: bool = False) -> str:
+        return export_proforma_to_excel(self.model, output_path=output_path, open_file=open_file)
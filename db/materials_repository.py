@@ -1,15 +1,15 @@
 # db/materials_repository.py
 import sqlite3
-import os
-from dotenv import load_dotenv
 
-load_dotenv()
+from core.env import getenv
 
-DB_PATH = os.getenv("MATERIALS_DB_PATH", "materials.db")
+
+def db_path() -> str:
+    return getenv("MATERIALS_DB_PATH", "materials.db")
 
 
 def load_materials():
-    conn = sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(db_path())
     conn.row_factory = sqlite3.Row
     cur = conn.cursor()
 
@@ -4,29 +4,41 @@ import openpyxl
 from openpyxl.styles import PatternFill, Font
 import os
 from datetime import datetime
-from dotenv import load_dotenv
 import subprocess
 import platform
 
-load_dotenv()
+from core.env import getenv
 
-BASE_EXCEL = os.getenv("EXCEL_BASE_PATH", "base.xlsx")
-OUTPUT_DIR = os.getenv("EXCEL_OUTPUT_DIR", "output")
 
+def base_excel_path() -> str:
+    return getenv("EXCEL_BASE_PATH", "base.xlsx")
 
-def export_proforma_to_excel(model):
-    if not os.path.exists(BASE_EXCEL):
-        raise FileNotFoundError(f"No se encuentra el Excel base: {BASE_EXCEL}")
 
-    os.makedirs(OUTPUT_DIR, exist_ok=True)
+def output_dir() -> str:
+    return getenv("EXCEL_OUTPUT_DIR", "output")
 
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    output_path = os.path.join(
-        OUTPUT_DIR,
-        f"proforma_{timestamp}.xlsx"
-    )
 
-    wb = openpyxl.load_workbook(BASE_EXCEL)
+def export_proforma_to_excel(model, output_path=None, open_file=True):
+    """
+    output_path: ruta del .xlsx (por defecto output_dir()/proforma_<fecha>.xlsx)
+    open_file:   abrir el Excel al terminar (False en procesos por lotes)
+    """
+    base_excel = base_excel_path()
+    if not os.path.exists(base_excel):
+        raise FileNotFoundError(f"No se encuentra el Excel base: {base_excel}")
+
+    if output_path is None:
+        directory = output_dir()
+        os.makedirs(directory, exist_ok=True)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output_path = os.path.join(
+            directory,
+            f"proforma_{timestamp}.xlsx"
+        )
+    else:
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+
+    wb = openpyxl.load_workbook(base_excel)
     ws = wb.active
 
     start_row = 19  # fila inicial B19
@@ -72,6 +84,8 @@ def export_proforma_to_excel(model):
             current_row += 1
 
     wb.save(output_path)
+    if not open_file:
+        return output_path
 
     # abrir el archivo automáticamente
     try:
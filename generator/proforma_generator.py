@@ -11,7 +11,6 @@ import re
 
 
 def generate_proforma(
-    table_window,
     resin_type: str,
     work_type: str,
     area_m2: int,
@@ -19,33 +18,16 @@ def generate_proforma(
     color: str | None = None,
     customer_name: str | None = None,
     customer_phone: str | None = None
-):
+) -> list[ProformaRow]:
     """
-    Genera la proforma completa en table_window.model.
+    Filas completas de la proforma (función pura, sin Qt ni modelo).
     work_type: "IMPRIMACIÓN", "1 CAPA", "2 CAPAS",
                "IMPRIMACIÓN + 1 CAPA", etc.
     """
-    model = table_window.model
-
-    # -------------------------------------------------
-    # 1️⃣ Limpiar completamente el modelo
-    # -------------------------------------------------
-
-    # LIMPIEZA TOTAL Y SEGURA
-    model.rows.clear()
-    table = table_window.table
-    table.clearContents()
-    table.setRowCount(0)
-    table_window.active_row = 0
-
-    table_window.sync_table_rows()
-    table_window.refresh_all_rows()
-
-
     rows: list[ProformaRow] = []
 
     # -------------------------------------------------
-    # 2️⃣ Cabecera cliente (opcional)
+    # 1️⃣ Cabecera cliente (opcional)
     # -------------------------------------------------
     if customer_name or customer_phone:
         info_text = f"{customer_name or ''} {customer_phone or ''}".strip()
@@ -54,7 +36,7 @@ def generate_proforma(
         )
 
     # -------------------------------------------------
-    # 3️⃣ IMPRIMACIÓN
+    # 2️⃣ IMPRIMACIÓN
     # -------------------------------------------------
     if "IMPRIMACIÓN" in work_type:
         rows.append(ProformaRow(type="TITLE", col_0="IMPRIMACIÓN"))
@@ -83,7 +65,7 @@ def generate_proforma(
         rows.append(ProformaRow(type="EMPTY"))
 
     # -------------------------------------------------
-    # 4️⃣ CAPAS (unificadas)
+    # 3️⃣ CAPAS (unificadas)
     # -------------------------------------------------
     if "CAPA" in work_type:
         match = re.search(r"(\d+)", work_type)
@@ -124,7 +106,7 @@ def generate_proforma(
         rows.append(ProformaRow(type="EMPTY"))
 
     # -------------------------------------------------
-    # 5️⃣ HERRAMIENTAS (siempre al final)
+    # 4️⃣ HERRAMIENTAS (siempre al final)
     # -------------------------------------------------
     rows.append(ProformaRow(type="TITLE", col_0="HERRAMIENTAS"))
 
@@ -138,18 +120,4 @@ def generate_proforma(
             col_4=str(amount * price)
         ))
 
-    # -------------------------------------------------
-    # 6️⃣ Volcar filas al modelo
-    # -------------------------------------------------
-    for row in rows:
-        model.add_row(row)
-
-    # -------------------------------------------------
-    # 7️⃣ Refresco FINAL seguro
-    # -------------------------------------------------
-    table_window.active_row = 0
-    table_window.sync_table_rows()
-    table_window.refresh_all_rows()
-    table_window.highlight_active_row()
-
     return rows
@@ -0,0 +1,70 @@
+# grammar_benchmark.py
+"""
+Compara la gramática plana (build_grammar) con las gramáticas por modo
+(build_mode_grammars) sobre las mismas grabaciones.
+
+Uso:
+    python grammar_benchmark.py grabaciones/*.wav
+"""
+import argparse
+
+from core.env import load_env
+from db.materials_repository import load_materials
+from voice.recognizer_service import MODEL_PATH
+from voice_replay import replay
+
+VARIANTS = ("plana", "modo")
+
+
+def main():
+    load_env()
+    parser = argparse.ArgumentParser(description="Benchmark gramática plana vs por modo")
+    parser.add_argument("paths", nargs="+", help="ficheros .wav / PCM int16 mono 16 kHz")
+    parser.add_argument("--sin-vad", action="store_true")
+    parser.add_argument("--model", default=MODEL_PATH)
+    args = parser.parse_args()
+
+    materials = load_materials()
+    totals = {v: {"audio": 0.0, "decode": 0.0, "wall": 0.0, "tokens": 0, "errors": 0} for v in VARIANTS}
+
+    print(f"{'fichero':<30} {'gramática':<8} {'decode ms':>10} {'RTF':>7} {'tokens':>7} {'errores':>8}")
+    for path in args.paths:
+        for variant in VARIANTS:
+            stats = replay(
+                path,
+                grammar=variant,
+                use_vad=not args.sin_vad,
+                model_path=args.model,
+                verbose=False,
+                materials=materials,
+            )
+            decode = stats["timer"].totals.get("decode", 0.0)
+            rtf = stats["wall"] / stats["audio"] if stats["audio"] else 0.0
+            print(
+                f"{path[-30:]:<30} {variant:<8} {decode * 1000:10.1f} {rtf:7.3f} "
+                f"{stats['tokens']:7d} {stats['errors']:8d}"
+            )
+
+            total = totals[variant]
+            total["audio"] += stats["audio"]
+            total["decode"] += decode
+            total["wall"] += stats["wall"]
+            total["tokens"] += stats["tokens"]
+            total["errors"] += stats["errors"]
+
+    print()
+    print("Totales:")
+    for variant, total in totals.items():
+        rtf = total["wall"] / total["audio"] if total["audio"] else 0.0
+        print(
+            f"  {variant:<8} decode {total['decode'] * 1000:9.1f} ms  RTF {rtf:.3f}  "
+            f"tokens {total['tokens']}  errores {total['errors']}"
+        )
+
+    flat, mode = totals["plana"]["decode"], totals["modo"]["decode"]
+    if mode:
+        print(f"\nDecodificación por modo: {flat / mode:.2f}x respecto a la plana")
+
+
+if __name__ == "__main__":
+    main()
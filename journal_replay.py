@@ -0,0 +1,72 @@
+# journal_replay.py
+"""
+Reproduce diarios de comandos (COMMAND_JOURNAL=1) sin Qt.
+
+- Recuperación: reconstruye la proforma de una sesión interrumpida
+- Regresión: avisa si CommandState da ahora mensajes distintos a los grabados
+- Rendimiento: tokens/s de CommandState sobre sesiones reales
+
+Uso:
+    python journal_replay.py .cache/journal/*.jsonl
+    python journal_replay.py sesion.jsonl --excel recuperada.xlsx
+    python journal_replay.py .cache/journal/*.jsonl --repeticiones 20 -q
+"""
+import argparse
+import sys
+
+from commands.command_journal import read_journal, replay_journal
+from core.env import load_env
+from db.materials_repository import load_materials
+from excel.excel_exporter import export_proforma_to_excel
+
+MAX_MISMATCHES_SHOWN = 5
+
+
+def main():
+    load_env()
+    parser = argparse.ArgumentParser(description="Reproduce diarios de comandos")
+    parser.add_argument("paths", nargs="+", help="ficheros .jsonl de COMMAND_JOURNAL_DIR")
+    parser.add_argument("--repeticiones", type=int, default=1, help="repetir cada diario (benchmark)")
+    parser.add_argument("--excel", help="exportar la proforma reconstruida (un solo diario)")
+    parser.add_argument("-q", "--quiet", action="store_true", help="no listar las diferencias")
+    args = parser.parse_args()
+
+    if args.excel and len(args.paths) != 1:
+        parser.error("--excel solo con un diario")
+
+    materials = load_materials()
+    total_tokens = 0
+    total_seconds = 0.0
+    total_mismatches = 0
+
+    for path in args.paths:
+        entries = read_journal(path)
+        for _ in range(max(1, args.repeticiones)):
+            result = replay_journal(path, materials, entries=entries)
+            total_tokens += result.tokens
+            total_seconds += result.seconds
+
+        total_mismatches += len(result.mismatches)
+        status = "✅" if not result.mismatches else "❌"
+        print(
+            f"{status} {path}: {result.tokens} tokens, {result.model.row_count()} filas, "
+            f"{len(result.mismatches)} diferencias, {result.tokens_per_second:,.0f} tokens/s"
+        )
+        if not args.quiet:
+            for number, token, expected, got in result.mismatches[:MAX_MISMATCHES_SHOWN]:
+                print(f"   línea {number}: {token}: '{expected}' -> '{got}'")
+
+        if args.excel:
+            output = export_proforma_to_excel(result.model, output_path=args.excel, open_file=False)
+            print(f"Proforma reconstruida: {output}")
+
+    print()
+    print(f"Tokens:           {total_tokens}")
+    print(f"CommandState:     {total_seconds * 1000:.1f} ms  "
+          f"({total_tokens / total_seconds if total_seconds else 0:,.0f} tokens/s)")
+    print(f"Diferencias:      {total_mismatches}")
+    sys.exit(1 if total_mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
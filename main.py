@@ -1,12 +1,21 @@
 # main.py
 import sys
 from PySide6.QtWidgets import QApplication, QVBoxLayout, QWidget
+from core.env import load_env
 from ui.ui_table import ProformaTableWindow
 from ui.ui_main import MainWindow
+from voice.recognizer_service import get_recognizer_service
+from voice.voice_listener import voice_backend
 
 def main():
+    load_env()
     app = QApplication(sys.argv)
 
+    # 🟢 Cargar el modelo Vosk en segundo plano mientras se monta la UI
+    # (con VOICE_BACKEND=process el modelo se carga en el proceso hijo)
+    if voice_backend() == "thread":
+        get_recognizer_service().preload()
+
     # 🟢 Crear la ventana principal de la tabla
     table_window = ProformaTableWindow()
 
@@ -22,6 +31,8 @@ def main():
     container.resize(1700, 650)
     container.show()
 
+    app.aboutToQuit.connect(table_window.shutdown_voice)
+
     sys.exit(app.exec())
 
 if __name__ == "__main__":
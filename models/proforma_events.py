@@ -0,0 +1,60 @@
+# models/proforma_events.py
+"""
+Avisos de ProformaModel a quien lo muestre (la tabla Qt, el diario...).
+
+Se emiten después de aplicar el cambio, en el mismo hilo. Los cambios
+de estructura avisan además justo antes (RowsAboutTo*), con las filas
+aún sin tocar: Qt pide begin*() antes del cambio y end*() después.
+"""
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class RowsAboutToBeInserted:
+    first: int
+    count: int = 1
+
+
+@dataclass(frozen=True)
+class RowsInserted:
+    first: int
+    count: int = 1
+
+
+@dataclass(frozen=True)
+class RowsAboutToBeRemoved:
+    first: int
+    count: int = 1
+
+
+@dataclass(frozen=True)
+class RowsRemoved:
+    first: int
+    count: int = 1
+
+
+@dataclass(frozen=True)
+class CellChanged:
+    row: int
+    column: int
+
+
+@dataclass(frozen=True)
+class RowTypeChanged:
+    row: int  # tipo y, posiblemente, todas sus columnas
+
+
+@dataclass(frozen=True)
+class ActiveRowMoved:
+    previous: int
+    current: int
+
+
+@dataclass(frozen=True)
+class RowsAboutToBeReset:
+    """Antes de sustituir las filas en bloque."""
+
+
+@dataclass(frozen=True)
+class RowsReset:
+    """Filas sustituidas en bloque (proforma generada, checkpoint)."""
@@ -2,14 +2,69 @@
 from models.proforma_row import ProformaRow
 from db.materials_repository import load_materials
 from copy import deepcopy
+from functools import partial
 from models.row_factory import info_row
+from models.proforma_events import (
+    ActiveRowMoved,
+    CellChanged,
+    RowTypeChanged,
+    RowsAboutToBeInserted,
+    RowsAboutToBeRemoved,
+    RowsAboutToBeReset,
+    RowsInserted,
+    RowsRemoved,
+    RowsReset,
+)
 from generator.resin_config import PRODUCT_INFO_RULES
 
 
 class ProformaModel:
-    def __init__(self):
+    def __init__(self, materials: dict | None = None):
         self.rows: list[ProformaRow] = []
-        self.materials = load_materials()  # cache en memoria
+        # cache en memoria (compartida si se pasa, p. ej. desde ProformaSession)
+        self.materials = materials if materials is not None else load_materials()
+        self.active_row = 0
+        self._listeners = []
+        self._undo_ops: list | None = None  # inversas de los cambios mientras se graba
+
+    # --------------------
+    # Avisos de cambios (models/proforma_events.py)
+    # --------------------
+
+    def subscribe(self, listener):
+        """listener(evento) se llama tras cada cambio (y antes de los de estructura)."""
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        self._listeners.remove(listener)
+
+    def _emit(self, event):
+        for listener in self._listeners:
+            listener(event)
+
+    # --------------------
+    # Deshacer: operaciones inversas de cada cambio
+    # --------------------
+
+    def record_undo(self):
+        """Empieza a guardar la inversa de cada cambio (ver take_undo)."""
+        self._undo_ops = []
+
+    def take_undo(self) -> list:
+        """Inversas guardadas desde record_undo(); deja de grabar."""
+        ops, self._undo_ops = self._undo_ops or [], None
+        return ops
+
+    def undo(self, ops: list):
+        """Deshace con los mismos avisos puntuales que los cambios originales."""
+        recording, self._undo_ops = self._undo_ops, None
+        for op in reversed(ops):
+            op()
+        self._undo_ops = recording
+
+    def _push_undo(self, op, *args):
+        if self._undo_ops is not None:
+            self._undo_ops.append(partial(op, *args))
 
     # --------------------
     # Row management
@@ -17,15 +72,39 @@ class ProformaModel:
 
     def add_row(self, row: ProformaRow):
         # 🔹 Siempre añadir una copia independiente
-        self.rows.append(deepcopy(row))
+        self._insert(len(self.rows), deepcopy(row))
 
     def insert_row(self, index: int, row: ProformaRow):
         # 🔹 Siempre insertar una copia independiente
-        self.rows.insert(index, deepcopy(row))
+        index = max(0, min(index, len(self.rows)))
+        self._insert(index, deepcopy(row))
 
     def remove_row(self, index: int):
         if 0 <= index < len(self.rows):
-            self.rows.pop(index)
+            self._emit(RowsAboutToBeRemoved(index))
+            row = self.rows.pop(index)
+            # Al deshacer vuelve la misma fila (las marcas por fila la siguen)
+            self._push_undo(self._insert, index, row)
+            self._emit(RowsRemoved(index))
+
+    def _insert(self, index: int, row: ProformaRow):
+        self._emit(RowsAboutToBeInserted(index))
+        self.rows.insert(index, row)
+        self._push_undo(self.remove_row, index)
+        self._emit(RowsInserted(index))
+
+    def replace_rows(self, rows: list[ProformaRow]):
+        """Sustituye todas las filas (copias) con un único aviso."""
+        self._replace([deepcopy(row) for row in rows])
+
+    def _replace(self, rows: list[ProformaRow]):
+        self._push_undo(self._replace, self.rows)
+        self._emit(RowsAboutToBeReset())
+        self.rows = rows
+        self._emit(RowsReset())
+
+    def clear(self):
+        self.replace_rows([])
 
     def row_count(self):
         return len(self.rows)
@@ -35,7 +114,34 @@ class ProformaModel:
 
     def set_row(self, index: int, new_row: ProformaRow):
         if 0 <= index < len(self.rows):
+            self._push_undo(self.set_row, index, self.rows[index])
             self.rows[index] = new_row
+            self._emit(RowTypeChanged(index))
+
+    def set_row_type(self, index: int, row_type: str):
+        row = self.rows[index]
+        if row.type != row_type:
+            self._push_undo(self.set_row_type, index, row.type)
+            row.type = row_type
+            self._emit(RowTypeChanged(index))
+
+    def set_cell(self, index: int, column: int, text: str) -> bool:
+        """Texto de una celda; True si ha cambiado."""
+        row = self.rows[index]
+        attr = f"col_{column}"
+        previous = getattr(row, attr)
+        if previous == text:
+            return False
+        self._push_undo(self.set_cell, index, column, previous)
+        setattr(row, attr, text)
+        self._emit(CellChanged(index, column))
+        return True
+
+    def set_active_row(self, index: int):
+        if index != self.active_row:
+            previous, self.active_row = self.active_row, index
+            self._push_undo(self.set_active_row, previous)
+            self._emit(ActiveRowMoved(previous, index))
 
 
     # --------------------
@@ -47,13 +153,13 @@ class ProformaModel:
         if row.type != "PRODUCT":
             return
 
-        row.col_1 = product_name
+        self.set_cell(row_index, 1, product_name)
 
         # Precio unitario
         price = self.get_price_from_db(product_name)
         if price is not None:
-            row.col_3 = str(price)
-            self._recalculate(row)
+            self.set_cell(row_index, 3, str(price))
+            self._recalculate(row_index)
 
         # ----------------------
         # Agregar INFO si aplica
@@ -74,29 +180,31 @@ class ProformaModel:
         row = self.rows[row_index]
         if row.type != "PRODUCT":
             return
-        row.col_2 = str(quantity)
-        self._recalculate(row)
+        self.set_cell(row_index, 2, str(quantity))
+        self._recalculate(row_index)
 
     def set_price(self, row_index: int, price):
         row = self.rows[row_index]
         if row.type != "PRODUCT":
             return
-        row.col_3 = str(price)
-        self._recalculate(row)
+        self.set_cell(row_index, 3, str(price))
+        self._recalculate(row_index)
 
     # --------------------
     # Internals
     # --------------------
 
-    def _recalculate(self, row: ProformaRow):
+    def _recalculate(self, row_index: int):
+        row = self.rows[row_index]
         if row.type != "PRODUCT":
             return
         try:
             qty = float(row.col_2)
             price = float(row.col_3)
-            row.col_4 = str(qty * price)
+            total = str(qty * price)
         except (ValueError, TypeError):
-            row.col_4 = ""
+            total = ""
+        self.set_cell(row_index, 4, total)
 
 
     def get_price_from_db(self, product_name: str):
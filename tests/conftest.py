@@ -0,0 +1,42 @@
+# tests/conftest.py
+import pytest
+
+from commands.command_state import CommandState
+from models.proforma_model import ProformaModel
+from models.proforma_row import ProformaRow
+
+# Catálogo pequeño con la misma forma que load_materials()
+MATERIALS = {
+    "EPOXI AMX GRIS RAL 7001 K-1": {"id": 1, "price": 2.5},
+    "EPOXI AMX K-2 MA NEW": {"id": 2, "price": 6.27},
+    "EPOXI AM ROJO OXIDO K-1": {"id": 3, "price": 2.61},
+    "EPOXI VERDE RAL 6001 K-1": {"id": 4, "price": 3.1},
+    "POLITOP BLANCO": {"id": 5, "price": 7.0},
+    "POLITOP NEO BLANCO": {"id": 6, "price": 7.5},
+    "CARBONATO CALCICO": {"id": 7, "price": 0.32},
+}
+
+
+@pytest.fixture
+def materials():
+    return {name: dict(info) for name, info in MATERIALS.items()}
+
+
+
+@pytest.fixture
+def state(materials):
+    return CommandState(materials)
+
+
+@pytest.fixture
+def model():
+    # Como la ventana: una fila PRODUCT vacía para empezar
+    model = ProformaModel()
+    model.add_row(ProformaRow(type="PRODUCT"))
+    return model
+
+
+@pytest.fixture
+def session(materials):
+    from core.session import ProformaSession
+    return ProformaSession(materials)
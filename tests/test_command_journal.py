@@ -0,0 +1,93 @@
+# tests/test_command_journal.py
+import pytest
+
+from commands.command_journal import CommandJournal, read_journal, replay_journal
+from commands.command_parser import apply_tokens
+
+
+@pytest.fixture
+def journal(state, tmp_path):
+    journal = CommandJournal(str(tmp_path / "sesion.jsonl"))
+    state.journal = journal
+    yield journal
+    journal.close()
+
+
+def say(state, model, text):
+    return apply_tokens(text.split(), model, state)
+
+
+def cells(model):
+    return [(row.type, row.col_1, row.col_2, row.col_3) for row in model.rows]
+
+
+def test_replay_reproduce_la_sesion(state, model, journal, materials):
+    say(state, model, "PRODUCTO EPOXI VERDE SIGUIENTE")
+    say(state, model, "CANTIDAD DOS SIGUIENTE")
+    journal.close()
+
+    result = replay_journal(journal.path, materials)
+    assert result.mismatches == []
+    assert result.tokens == 7
+    assert cells(result.model) == cells(model)
+
+
+def test_replay_producto_en_idle(state, model, journal, materials):
+    say(state, model, "PRODUCTO")
+    say(state, model, "EPOXI")
+    journal.close()
+
+    result = replay_journal(journal.path, materials)
+    assert result.mismatches == []
+    assert result.state.product_buffer == ["EPOXI"]
+
+
+def test_replay_desde_checkpoint(state, model, journal, materials):
+    say(state, model, "POLITOP NEO SIGUIENTE")
+    model.get_row(0).col_3 = "9.99"  # edición a mano
+    journal.checkpoint(model, state)
+    say(state, model, "CANTIDAD TRES SIGUIENTE")
+    journal.close()
+
+    result = replay_journal(journal.path, materials)
+    assert result.mismatches == []
+    assert cells(result.model) == cells(model)
+    assert result.model.get_row(0).col_3 == "9.99"
+
+
+@pytest.mark.parametrize("words, retracted, after", [
+    ("PRODUCTO EPOXI VERDE RAL", "RAL", "SIGUIENTE"),
+    ("CANTIDAD DOS COMA CINCO", "CINCO", "SIETE SIGUIENTE"),
+])
+def test_replay_con_retract(session, journal, materials, words, retracted, after):
+    session.state.journal = journal
+    session.apply_voice([(word, [word]) for word in words.split()])
+    assert session.retract(retracted)
+    session.apply_voice([(word, [word]) for word in after.split()])
+    journal.close()
+
+    result = replay_journal(journal.path, materials)
+    assert result.mismatches == []
+    assert cells(result.model) == cells(session.model)
+
+
+def test_checkpoint_guarda_el_estado_pendiente(state, model, journal, materials):
+    say(state, model, "PRODUCTO EPOXI VERDE")
+    journal.checkpoint(model, state)
+    journal.close()
+
+    result = replay_journal(journal.path, materials)
+    assert result.state.product_buffer == ["EPOXI", "VERDE"]
+    assert result.state.product_match_count == state.product_match_count
+
+
+def test_ultima_linea_a_medias_se_ignora(state, model, journal, materials):
+    say(state, model, "CANTIDAD DOS")
+    journal.close()
+    with open(journal.path, "a", encoding="utf-8") as f:
+        f.write('{"token": "SIGUI')
+
+    assert len(read_journal(journal.path)) == 2
+    result = replay_journal(journal.path, materials)
+    assert result.mismatches == []
+    assert result.tokens == 2
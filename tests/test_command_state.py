@@ -0,0 +1,59 @@
+# tests/test_command_state.py
+import pytest
+
+from commands.command_state import CommandMode, CommandState
+
+
+def say(state, model, text):
+    return [state.handle_word(word, model) for word in text.split()]
+
+
+def test_producto_en_idle_activa_modo_con_todo_el_catalogo(state, model, materials):
+    assert say(state, model, "PRODUCTO") == [f"Modo PRODUCT activo ({len(materials)} candidatos)"]
+    assert state.mode == CommandMode.PRODUCT
+    assert state.product_buffer == []
+
+
+def test_producto_y_despues_palabra_acota_candidatos(state, model):
+    assert say(state, model, "PRODUCTO EPOXI")[-1] == "Producto parcial: EPOXI (4 candidatos)"
+
+
+def test_producto_confirmado_con_siguiente(state, model):
+    say(state, model, "PRODUCTO POLITOP NEO SIGUIENTE")
+    assert model.get_row(0).col_1 == "POLITOP NEO BLANCO"
+    assert state.mode == CommandMode.IDLE
+
+
+def test_cantidad_sin_numero_no_escribe_cero(state, model):
+    say(state, model, "CANTIDAD Y SIGUIENTE")
+    assert model.get_row(0).col_2 == ""
+
+
+@pytest.mark.parametrize("text", [
+    "PRODUCTO",
+    "PRODUCTO EPOXI",
+    "PRODUCTO EPOXI VERDE",
+    "PRODUCTO POLITOP SIGUIENTE",
+])
+def test_especulacion_coincide_con_lo_confirmado(state, model, materials, text):
+    confirmed = CommandState(materials)
+    say(confirmed, model, text)
+
+    assert state.speculate(text.split())
+    assert state.mode == confirmed.mode == CommandMode.PRODUCT
+    assert state.product_buffer == confirmed.product_buffer
+    assert state.product_matches == confirmed.product_matches
+
+
+def test_especulacion_no_pasa_de_comandos_que_tocan_el_modelo(state):
+    state.speculate(["PRODUCTO", "POLITOP", "NEO", "SIGUIENTE", "CANTIDAD"])
+    assert state.product_buffer == ["POLITOP", "NEO"]
+    assert state.discard_speculation()
+    assert state.mode == CommandMode.IDLE
+
+
+def test_especulacion_con_trigger_configurado(monkeypatch, materials):
+    monkeypatch.setenv("PRODUCT_TRIGGER_WORDS", "PRODUCTO,EPOXI")
+    state = CommandState(materials)
+    state.speculate(["EPOXI", "VERDE"])
+    assert state.product_matches == ["EPOXI VERDE RAL 6001 K-1"]
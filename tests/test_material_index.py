@@ -0,0 +1,58 @@
+# tests/test_material_index.py
+import pytest
+
+from commands.material_index import MaterialIndex
+
+
+@pytest.fixture
+def index(materials):
+    return MaterialIndex(materials)
+
+
+def test_search_acota_palabra_a_palabra(index):
+    assert len(index.search(["EPOXI"])) == 4
+    assert index.names_for(index.search(["EPOXI", "AMX"])) == [
+        "EPOXI AMX GRIS RAL 7001 K-1",
+        "EPOXI AMX K-2 MA NEW",
+    ]
+
+
+def test_palabra_casa_como_substring_de_un_termino(index):
+    assert index.names_for(index.narrow(None, "TOP")) == ["POLITOP BLANCO", "POLITOP NEO BLANCO"]
+    # AM está dentro de AMX: misma regla que `token in name`
+    assert len(index.narrow(None, "AM")) == 3
+
+
+def test_search_sin_resultados_corta_en_la_primera_palabra_vacia(index):
+    assert not index.search(["ZZZ", "EPOXI"])
+
+
+def test_narrow_devuelve_frozenset_compartible(index):
+    candidates = index.search(["EPOXI"])
+    narrowed = index.narrow(candidates, "VERDE")
+    assert isinstance(narrowed, frozenset)
+    assert len(candidates) == 4
+
+
+def test_digitos_bajan_por_el_trie(index):
+    base = index.search(["EPOXI"])
+    node, candidates = index.narrow_digit(base, None, "6")
+    assert index.names_for(candidates) == ["EPOXI VERDE RAL 6001 K-1"]
+    node, candidates = index.narrow_digit(base, node, "0")
+    assert index.names_for(candidates) == ["EPOXI VERDE RAL 6001 K-1"]
+    _, candidates = index.narrow_digit(base, node, "9")
+    assert not candidates
+
+
+def test_digito_sin_base_busca_en_todo_el_catalogo(index):
+    _, candidates = index.narrow_digit(None, None, "1")
+    # Secuencias que empiezan por 1 (el 1 de K-1), no las que lo contienen
+    assert index.names_for(candidates) == [
+        "EPOXI AMX GRIS RAL 7001 K-1",
+        "EPOXI AM ROJO OXIDO K-1",
+        "EPOXI VERDE RAL 6001 K-1",
+    ]
+
+
+def test_ids_for_names_ignora_nombres_desconocidos(index):
+    assert index.names_for(index.ids_for_names(["POLITOP BLANCO", "NO EXISTE"])) == ["POLITOP BLANCO"]
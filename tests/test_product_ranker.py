@@ -0,0 +1,42 @@
+# tests/test_product_ranker.py
+from commands.material_index import MaterialIndex
+from commands.product_ranker import ProductRanker
+from core.text import edit_distance
+
+
+def make_ranker(materials):
+    return ProductRanker(MaterialIndex(materials))
+
+
+def test_top_k_mejor_puntuado_primero(materials):
+    ranker = make_ranker(materials)
+    index = ranker.index
+    candidates = index.search(["POLITOP", "NEO"])
+    assert ranker.suggest(["POLITOP", "NEO"], candidates) == ["POLITOP NEO BLANCO"]
+
+
+def test_la_cache_depende_de_los_candidatos(materials):
+    ranker = make_ranker(materials)
+    index = ranker.index
+    everything = index.search(["EPOXI"])
+    assert len(ranker.suggest(["EPOXI"], everything)) == 4
+
+    # Mismo buffer, candidatos acotados por otra vía (product_matches)
+    only_green = index.ids_for_names(["EPOXI VERDE RAL 6001 K-1"])
+    assert ranker.suggest(["EPOXI"], only_green) == ["EPOXI VERDE RAL 6001 K-1"]
+
+
+def test_uso_reciente_primero_sin_palabras(materials):
+    ranker = make_ranker(materials)
+    ranker.record_use("CARBONATO CALCICO")
+    assert ranker.suggest([], None, k=2)[0] == "CARBONATO CALCICO"
+
+
+def test_palabra_mal_reconocida_se_puntua_por_edicion(materials):
+    ranker = make_ranker(materials)
+    assert ranker.suggest(["POLITOP", "BLANKO"], frozenset())[0] == "POLITOP BLANCO"
+
+
+def test_edit_distance():
+    assert edit_distance("BLANCO", "BLANKO") == 1
+    assert edit_distance("", "ROJO") == 4
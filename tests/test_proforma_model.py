@@ -0,0 +1,29 @@
+# tests/test_proforma_model.py
+from models.proforma_events import (
+    RowsAboutToBeInserted,
+    RowsAboutToBeRemoved,
+    RowsAboutToBeReset,
+    RowsInserted,
+    RowsRemoved,
+    RowsReset,
+)
+from models.proforma_row import ProformaRow
+
+
+def test_cambios_de_estructura_avisan_antes_y_despues(model):
+    seen = []
+    model.subscribe(lambda event: seen.append((type(event), model.row_count())))
+
+    model.add_row(ProformaRow(type="EMPTY"))
+    model.remove_row(0)
+    model.replace_rows([])
+
+    # El aviso previo llega con las filas aún sin tocar
+    assert seen == [
+        (RowsAboutToBeInserted, 1),
+        (RowsInserted, 2),
+        (RowsAboutToBeRemoved, 2),
+        (RowsRemoved, 1),
+        (RowsAboutToBeReset, 1),
+        (RowsReset, 0),
+    ]
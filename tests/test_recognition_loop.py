@@ -0,0 +1,109 @@
+# tests/test_recognition_loop.py
+import json
+
+from commands.command_state import CommandMode
+from voice.recognition_loop import RecognitionLoop
+from voice.token_commit import COMMIT, TokenCommitter
+
+SAMPLE_RATE = 16000
+BLOCK_SAMPLES = 800  # 50 ms
+
+# Audio sintético: cada muestra int16 lleva el número de la palabra (0 = silencio)
+WORDS = {1: "cantidad", 2: "cinco"}
+
+
+def block(word: int = 0) -> bytes:
+    return bytes([word, 0]) * BLOCK_SAMPLES
+
+
+class FakeRecognizer:
+    """Reconoce las palabras de su gramática a partir de las muestras recibidas."""
+
+    def __init__(self, grammar):
+        self.grammar = grammar
+        self.audio = bytearray()
+
+    def Reset(self):
+        self.audio.clear()
+
+    def AcceptWaveform(self, data):
+        self.audio += bytes(data)
+        return False
+
+    def _words(self):
+        samples = self.audio[::2]
+        words, start = [], None
+        for i, value in enumerate(list(samples) + [0]):
+            if start is not None and value != samples[start]:
+                text = WORDS[samples[start]]
+                if self.grammar is None or text in self.grammar:
+                    words.append({"word": text, "start": start / SAMPLE_RATE, "end": i / SAMPLE_RATE})
+                start = None
+            if start is None and value:
+                start = i
+        return words
+
+    def PartialResult(self):
+        return json.dumps({"partial_result": self._words()})
+
+    def FinalResult(self):
+        words = self._words()
+        self.audio.clear()
+        return json.dumps({"result": words, "text": " ".join(w["word"] for w in words)})
+
+
+class FakeService:
+    sample_rate = SAMPLE_RATE
+
+    def __init__(self):
+        self.created = {}
+
+    def recognizer(self, grammar=None, alternatives=0):
+        key = tuple(grammar) if grammar else None
+        recognizer = self.created.setdefault(key, FakeRecognizer(grammar))
+        recognizer.Reset()
+        return recognizer
+
+
+def make_loop():
+    grammars = {CommandMode.IDLE: ["cantidad"], CommandMode.QUANTITY: ["cinco"]}
+    loop = RecognitionLoop(
+        FakeService(),
+        grammars[CommandMode.IDLE],
+        mode_grammars=grammars,
+        committer=TokenCommitter(stable_partials=2, commit_lag=10),
+        nbest=0,
+    )
+    loop.start()
+    loop.set_mode(CommandMode.IDLE)
+    return loop
+
+
+def commits(events):
+    return [event.text for event in events if event.kind == COMMIT]
+
+
+def test_cambio_de_gramatica_a_mitad_de_frase_no_pierde_la_palabra_siguiente():
+    loop = make_loop()
+    events = []
+    # "cantidad cinco" de un tirón: el cambio de modo llega con "cinco" ya dicho
+    for word in (1, 1, 1, 0, 2, 2):
+        events += loop.feed(block(word))
+    assert commits(events) == ["CANTIDAD"]
+
+    loop.set_mode(CommandMode.QUANTITY)
+    events = loop.feed(block())
+    events += loop.finish()
+    assert commits(events) == ["CINCO"]
+
+
+def test_la_palabra_confirmada_no_se_vuelve_a_decodificar():
+    loop = make_loop()
+    for word in (1, 1, 1):
+        loop.feed(block(word))
+
+    loop.set_mode(CommandMode.QUANTITY)
+    loop.feed(block())
+    fed = loop.service.created[("cinco",)].audio
+    # Solo el audio tras el final de "cantidad" confirmado (2 bloques) + el nuevo
+    assert len(fed) == 2 * len(block())
@@ -0,0 +1,74 @@
+# tests/test_ring_buffer.py
+import threading
+
+import pytest
+
+from voice.ring_buffer import BLOCK, DROP_OLDEST, AudioRingBuffer
+
+
+def block(value: int) -> bytes:
+    return bytes([value, value])
+
+
+def test_lectura_en_orden_sin_copia():
+    ring = AudioRingBuffer(capacity=4, block_bytes=2)
+    for value in range(3):
+        assert ring.write(block(value))
+    assert [bytes(ring.read(0)) for _ in range(3)] == [block(0), block(1), block(2)]
+    assert ring.read(0) is None
+
+
+def test_drop_oldest_no_sobrescribe_el_bloque_del_lector():
+    ring = AudioRingBuffer(capacity=4, block_bytes=2, overflow=DROP_OLDEST)
+    for value in range(3):
+        ring.write(block(value))
+    held = ring.read(0)
+    assert bytes(held) == block(0)
+
+    for value in range(3, 7):
+        ring.write(block(value))
+
+    assert bytes(held) == block(0)  # el hueco del lector sigue intacto
+    assert ring.overruns == 3
+    assert [bytes(ring.read(0)) for _ in range(3)] == [block(4), block(5), block(6)]
+
+
+def test_block_descarta_el_bloque_nuevo_si_sigue_lleno():
+    ring = AudioRingBuffer(capacity=3, block_bytes=2, overflow=BLOCK, block_timeout=0.01)
+    ring.write(block(1))
+    held = ring.read(0)
+    ring.write(block(2))
+    ring.write(block(3))
+
+    assert not ring.write(block(4))
+    assert ring.overruns == 1
+    assert bytes(held) == block(1)
+    assert [bytes(ring.read(0)) for _ in range(2)] == [block(2), block(3)]
+
+
+def test_block_espera_a_que_el_lector_libere_un_hueco():
+    ring = AudioRingBuffer(capacity=2, block_bytes=2, overflow=BLOCK, block_timeout=1.0)
+    ring.write(block(1))
+    ring.write(block(2))
+
+    # El primer read() se queda con un hueco; el segundo libera el anterior
+    reader = threading.Timer(0.02, lambda: (ring.read(0), ring.read(0)))
+    reader.start()
+    assert ring.write(block(3))
+    reader.join()
+    assert ring.overruns == 0
+
+
+def test_bloque_corto_y_clear():
+    ring = AudioRingBuffer(capacity=3, block_bytes=4)
+    ring.write(b"\x01\x02")
+    assert bytes(ring.read(0)) == b"\x01\x02"
+    ring.write(b"\x03\x03\x03\x03")
+    ring.clear()
+    assert ring.depth == 0
+    assert ring.read(0) is None
+
+
+def test_capacidad_minima():
+    with pytest.raises(ValueError):
+        AudioRingBuffer(capacity=1, block_bytes=2)
@@ -0,0 +1,55 @@
+# tests/test_session.py
+from commands.command_state import CommandMode
+from models.proforma_events import RowsReset
+
+
+def voice(*words):
+    return [(word, [word]) for word in words]
+
+
+def test_retract_deshace_la_palabra_y_la_correccion_no_se_duplica(session):
+    session.apply_voice(voice("CANTIDAD", "CINCO"))
+    assert session.retract("CINCO")
+    assert session.state.mode == CommandMode.QUANTITY
+    assert session.state.number_parser.words == []
+
+    session.apply_voice(voice("DOS", "SIGUIENTE"))
+    assert session.model.get_row(0).col_2 == "2.0"
+
+
+def test_retract_deshace_filas_creadas(session):
+    session.apply_voice(voice("SIGUIENTE"))
+    assert session.model.row_count() == 2
+    assert session.retract("SIGUIENTE")
+    assert session.model.row_count() == 1
+    assert session.state.active_row == 0
+
+
+def test_retract_incluye_las_palabras_posteriores(session):
+    session.apply_voice(voice("PRODUCTO", "POLITOP", "NEO"))
+    assert session.retract("POLITOP")
+    assert session.state.mode == CommandMode.PRODUCT
+    assert session.state.product_buffer == []
+
+
+def test_otro_cambio_impide_deshacer_la_voz(session):
+    session.apply_voice(voice("SIGUIENTE"))
+    session.apply("CANTIDAD")
+    assert not session.retract("SIGUIENTE")
+    assert session.model.row_count() == 2
+
+
+def test_retract_avisa_solo_de_las_filas_tocadas(session):
+    session.apply("SIGUIENTE SIGUIENTE")
+    rows = list(session.model.rows)
+    session.apply_voice(voice("PRODUCTO", "POLITOP", "NEO", "SIGUIENTE"))
+    assert session.model.get_row(2).col_1 == "POLITOP NEO BLANCO"
+
+    events = []
+    session.model.subscribe(events.append)
+    assert session.retract("SIGUIENTE")
+    assert events and not any(isinstance(event, RowsReset) for event in events)
+    # Las mismas filas, sin copias
+    assert all(a is b for a, b in zip(session.model.rows, rows, strict=True))
+    assert session.model.get_row(2).col_1 == ""
+    assert session.state.product_buffer == ["POLITOP", "NEO"]
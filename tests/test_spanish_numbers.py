@@ -0,0 +1,70 @@
+# tests/test_spanish_numbers.py
+import pytest
+
+from commands.spanish_numbers import SpanishNumberParser, parse_spanish_number
+
+
+@pytest.mark.parametrize("text, value", [
+    ("CIEN", 100.0),
+    ("VEINTE Y TRES", 23.0),
+    ("MIL DOSCIENTOS CINCUENTA COMA CINCUENTA", 1250.5),
+    ("DOS COMA CERO CINCO", 2.05),
+    ("UNO DOS", 12.0),
+])
+def test_parse_spanish_number(text, value):
+    assert parse_spanish_number(text.split()) == value
+
+
+@pytest.mark.parametrize("text", [
+    "",
+    "CANTIDAD",
+    "DOS COMA CINCO COMA UNO",
+    "Y",
+    "Y DOS",
+    "COMA",
+    "PUNTO CINCO",
+    "DOS COMA Y CINCO",
+    "MIL MIL",
+    "DOS MIL TRES MIL",
+])
+def test_parse_spanish_number_invalido(text):
+    assert parse_spanish_number(text.split()) is None
+
+
+def test_parser_termina_en_la_primera_palabra_no_numerica():
+    parser = SpanishNumberParser()
+    accepted = [parser.feed(word) for word in "DOS COMA CINCO SIGUIENTE".split()]
+    assert accepted == [True, True, True, False]
+    assert parser.value == 2.5
+    assert parser.text == "DOS COMA CINCO"
+
+
+def test_parser_rechaza_una_segunda_coma():
+    parser = SpanishNumberParser()
+    for word in ("DOS", "COMA", "CINCO"):
+        parser.feed(word)
+    assert not parser.feed("COMA")
+    assert parser.value == 2.5
+
+
+@pytest.mark.parametrize("word", ["Y", "COMA", "PUNTO"])
+def test_parser_no_empieza_por_conjuncion_ni_separador(word):
+    parser = SpanishNumberParser()
+    assert not parser.feed(word)
+    assert not parser.pending
+
+
+def test_parser_rechaza_un_segundo_mil():
+    parser = SpanishNumberParser()
+    assert parser.feed("MIL")
+    assert not parser.feed("MIL")
+    assert parser.value == 1000
+
+
+def test_parser_reset():
+    parser = SpanishNumberParser()
+    parser.feed("DOS")
+    assert parser.pending
+    parser.reset()
+    assert not parser.pending
+    assert parser.value is None
@@ -0,0 +1,59 @@
+# tests/test_token_commit.py
+from voice.token_commit import COMMIT, RETRACT, TokenCommitter, Word
+
+
+def words(text, end=None):
+    return [Word(w, end=end) for w in text.split()]
+
+
+def kinds(events):
+    return [(event.kind, event.text) for event in events]
+
+
+def committer():
+    # Sin confirmación por retraso: solo cuenta la estabilidad
+    return TokenCommitter(stable_partials=2, commit_lag=1000.0)
+
+
+def test_confirma_tras_parciales_estables():
+    c = committer()
+    assert c.update(words("CANTIDAD"), 0.5) == []
+    assert kinds(c.update(words("CANTIDAD DOS"), 0.7)) == [(COMMIT, "CANTIDAD")]
+    assert kinds(c.update(words("CANTIDAD DOS"), 0.9)) == [(COMMIT, "DOS")]
+
+
+def test_confirma_por_retraso_respecto_al_cursor():
+    c = TokenCommitter(stable_partials=5, commit_lag=0.3)
+    assert kinds(c.update(words("CANTIDAD", end=0.2), 0.6)) == [(COMMIT, "CANTIDAD")]
+
+
+def test_retracta_lo_que_el_parcial_contradice():
+    c = committer()
+    c.update(words("CANTIDAD DOS"), 0.5)
+    c.update(words("CANTIDAD DOS"), 0.7)
+    events = c.update(words("CANTIDAD DOCE"), 0.9)
+    assert kinds(events) == [(RETRACT, "DOS")]
+    assert c.retractions == 1
+
+
+def test_parcial_mas_corto_no_retracta():
+    c = committer()
+    c.update(words("CANTIDAD DOS"), 0.5)
+    c.update(words("CANTIDAD DOS"), 0.7)
+    assert c.update(words("CANTIDAD"), 0.9) == []
+
+
+def test_finalize_confirma_lo_pendiente_y_empieza_frase_nueva():
+    c = committer()
+    c.update(words("CANTIDAD"), 0.5)
+    c.update(words("CANTIDAD"), 0.7)
+    events = c.finalize(words("CANTIDAD TRES"), 1.0)
+    assert kinds(events) == [(COMMIT, "TRES")]
+    assert c.committed == []
+
+
+def test_finalize_retracta_lo_que_no_aparece_en_el_resultado():
+    c = committer()
+    c.update(words("PRECIO DOS"), 0.5)
+    c.update(words("PRECIO DOS"), 0.7)
+    assert kinds(c.finalize(words("PRECIO"), 1.0)) == [(RETRACT, "DOS")]
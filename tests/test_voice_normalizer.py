@@ -0,0 +1,25 @@
+import pytest
+
+from voice.grammar_builder import build_vocabulary, command_vocabulary
+from voice.voice_normalizer import VoiceNormalizer
+
+
+@pytest.fixture
+def normalizer(materials):
+    return VoiceNormalizer(vocabulary=build_vocabulary(materials), commands=command_vocabulary(materials))
+
+
+@pytest.mark.parametrize("word", ["SE", "OSO", "SO"])
+def test_short_unknown_word_is_not_snapped_to_a_command(normalizer, word):
+    assert normalizer.normalize(word) == word
+
+
+@pytest.mark.parametrize("heard, expected", [
+    ("POLITOB", "POLITOP"),
+    ("EPOSI", "EPOXI"),
+    ("BASIA", "VACIA"),
+    ("SIGIENTE", "SIGUIENTE"),
+    ("CANTIDA", "CANTIDAD"),
+])
+def test_misheard_word_is_snapped(normalizer, heard, expected):
+    assert normalizer.normalize(heard) == expected
@@ -0,0 +1,83 @@
+# ui/product_list_model.py
+from difflib import SequenceMatcher
+
+from PySide6.QtCore import QAbstractListModel, QModelIndex, Qt
+
+PAGE_SIZE = 50  # sugerencias que se piden de una vez (más al hacer scroll)
+
+
+class ProductListModel(QAbstractListModel):
+    """
+    Sugerencias de producto de CommandState para un QListView.
+
+    refresh() pide el top-k al ranker y aplica a la vista solo las
+    diferencias (filas insertadas / borradas); si la lista no ha cambiado
+    no emite nada. El top-k es estable (puntuación + id), así que al
+    hacer scroll fetchMore() pide la página siguiente y solo añade filas.
+    """
+
+    def __init__(self, state, parent=None):
+        super().__init__(parent)
+        self.state = state
+        self._names: list[str] = []
+        self._limit = PAGE_SIZE
+        self._buffer: tuple[str, ...] = ()
+        self._exhausted = False  # el ranker ya no tiene más candidatos
+
+    # --------------------------------------------------
+    # QAbstractListModel
+    # --------------------------------------------------
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._names)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and index.isValid() and index.row() < len(self._names):
+            return self._names[index.row()]
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._exhausted and len(self._names) >= self._limit
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        self._limit += PAGE_SIZE
+        self._apply(self.state.product_suggestions(self._limit))
+
+    # --------------------------------------------------
+
+    def name(self, row: int) -> str:
+        return self._names[row]
+
+    def refresh(self, active: bool = True):
+        """Vuelve a pedir las sugerencias; active=False vacía la lista."""
+        if not active:
+            self._buffer = ()
+            self._limit = PAGE_SIZE
+            self._apply([])
+            return
+
+        # Nueva palabra dictada -> volver a la primera página
+        buffer = tuple(self.state.product_buffer)
+        if buffer != self._buffer:
+            self._buffer = buffer
+            self._limit = PAGE_SIZE
+        self._apply(self.state.product_suggestions(self._limit))
+
+    def _apply(self, names: list[str]):
+        self._exhausted = len(names) < self._limit
+        if names == self._names:
+            return
+
+        # De atrás hacia delante: los índices pendientes siguen siendo válidos
+        opcodes = SequenceMatcher(None, self._names, names, autojunk=False).get_opcodes()
+        for tag, i1, i2, j1, j2 in reversed(opcodes):
+            if tag in ("replace", "delete"):
+                self.beginRemoveRows(QModelIndex(), i1, i2 - 1)
+                del self._names[i1:i2]
+                self.endRemoveRows()
+            if tag in ("replace", "insert"):
+                self.beginInsertRows(QModelIndex(), i1, i1 + j2 - j1 - 1)
+                self._names[i1:i1] = names[j1:j2]
+                self.endInsertRows()
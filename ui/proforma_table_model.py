@@ -0,0 +1,180 @@
+# ui/proforma_table_model.py
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, Qt, Signal
+from PySide6.QtGui import QFont
+
+from models.proforma_events import (
+    ActiveRowMoved,
+    CellChanged,
+    RowTypeChanged,
+    RowsAboutToBeInserted,
+    RowsAboutToBeRemoved,
+    RowsAboutToBeReset,
+    RowsInserted,
+    RowsRemoved,
+    RowsReset,
+)
+from models.proforma_model import ProformaModel
+from models.proforma_row import ProformaRow
+
+HEADERS = ["KITS", "PRODUCTO", "CANTIDAD", "PRECIO", "TOTAL"]
+
+
+class ProformaTableModel(QAbstractTableModel):
+    """
+    Vista Qt de ProformaModel sin copiar datos: la tabla lee las filas
+    directamente y solo pide las celdas visibles.
+
+    Los colores los pone RowStyleDelegate al pintar (tipo de fila +
+    active_row / active_column); las filas marcadas por la segunda pasada
+    se subrayan con tooltip. Las marcas van por fila (id + la propia
+    ProformaRow), no por índice: siguen a la fila al insertar o borrar.
+
+    Se suscribe a los eventos de ProformaModel y solo invalida lo que
+    cambió: la celda, la fila, o las filas activa anterior y nueva.
+    Las filas insertadas, borradas o sustituidas llaman a begin* con el
+    aviso previo (RowsAboutTo*) y a end* con el posterior.
+
+    ui_ops cuenta los avisos emitidos a la vista (dataChanged, filas
+    insertadas/borradas, reset) para medir el coste de repintado.
+    """
+
+    # Edición a mano de una celda (fila, columna), ya escrita en ProformaModel
+    cell_edited = Signal(int, int)
+
+    def __init__(
+        self,
+        proforma: ProformaModel,
+        rescore_flags: dict[int, tuple[ProformaRow, str]] | None = None,
+        parent=None,
+    ):
+        super().__init__(parent)
+        self.proforma = proforma
+        self.rescore_flags = rescore_flags if rescore_flags is not None else {}
+        self.active_column: int | None = None
+        self.ui_ops = 0
+
+        self._event_handlers = {
+            CellChanged: self._on_cell_changed,
+            RowTypeChanged: lambda event: self.rows_changed([event.row]),
+            RowsAboutToBeInserted: self._on_rows_about_to_be_inserted,
+            RowsInserted: lambda event: self.endInsertRows(),
+            RowsAboutToBeRemoved: self._on_rows_about_to_be_removed,
+            RowsRemoved: lambda event: self.endRemoveRows(),
+            RowsAboutToBeReset: self._on_rows_about_to_be_reset,
+            RowsReset: lambda event: self.endResetModel(),
+            ActiveRowMoved: lambda event: self.rows_changed({event.previous, event.current}),
+        }
+        proforma.subscribe(self.on_proforma_event)
+
+    @property
+    def active_row(self) -> int:
+        return self.proforma.active_row
+
+    # --------------------------------------------------
+    # QAbstractTableModel
+    # --------------------------------------------------
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.proforma.row_count()
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= self.proforma.row_count():
+            return None
+        r, c = index.row(), index.column()
+        row = self.proforma.get_row(r)
+
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            return row.as_list()[c]
+
+        # 🔍 Las dos pasadas no coinciden -> revisar la fila
+        entry = self.rescore_flags.get(id(row))
+        flag = entry[1] if entry is not None and entry[0] is row else None
+        if role == Qt.ToolTipRole and flag:
+            return f"Segunda pasada: {flag}"
+        if role == Qt.FontRole and flag:
+            font = QFont()
+            font.setUnderline(True)
+            return font
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsEditable
+
+    def setData(self, index, value, role=Qt.EditRole):
+        """UI -> modelo: única dirección de escritura desde la tabla."""
+        if role != Qt.EditRole or not index.isValid():
+            return False
+        r, c = index.row(), index.column()
+
+        # 🔒 Si el valor ya es el mismo, NO hacer nada
+        if not self.proforma.set_cell(r, c, value or ""):
+            return False
+
+        # 🔢 Recalcular TOTAL solo si toca
+        row = self.proforma.get_row(r)
+        if row.type == "PRODUCT" and c in (2, 3):
+            try:
+                total = str(round(float(row.col_2) * float(row.col_3), 2))
+            except ValueError:
+                total = ""
+            self.proforma.set_cell(r, 4, total)
+
+        self.cell_edited.emit(r, c)
+        return True
+
+    # --------------------------------------------------
+    # Eventos de ProformaModel
+    # --------------------------------------------------
+
+    def on_proforma_event(self, event):
+        self._event_handlers[type(event)](event)
+
+    def _on_cell_changed(self, event):
+        index = self.index(event.row, event.column)
+        self._data_changed(index, index)
+
+    def _on_rows_about_to_be_inserted(self, event):
+        self.ui_ops += 1
+        self.beginInsertRows(QModelIndex(), event.first, event.first + event.count - 1)
+
+    def _on_rows_about_to_be_removed(self, event):
+        self.ui_ops += 1
+        self.beginRemoveRows(QModelIndex(), event.first, event.first + event.count - 1)
+
+    def _on_rows_about_to_be_reset(self, event):
+        self.ui_ops += 1
+        self.beginResetModel()
+
+    # --------------------------------------------------
+    # Avisos desde la ventana
+    # --------------------------------------------------
+
+    def rows_changed(self, rows):
+        """Todas las celdas de esas filas (tipo de fila, marcas de la segunda pasada)."""
+        for r in rows:
+            if 0 <= r < self.proforma.row_count():
+                self._data_changed(self.index(r, 0), self.index(r, len(HEADERS) - 1))
+
+    def set_active_column(self, column: int | None):
+        """Celda que se está dictando en la fila activa: se repintan la anterior y la nueva."""
+        previous, self.active_column = self.active_column, column
+        if previous == column or not 0 <= self.active_row < self.proforma.row_count():
+            return
+        for c in (previous, column):
+            if c is not None:
+                index = self.index(self.active_row, c)
+                self._data_changed(index, index)
+
+    def _data_changed(self, first, last):
+        self.ui_ops += 1
+        self.dataChanged.emit(first, last)
@@ -0,0 +1,62 @@
+# ui/row_delegate.py
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QBrush, QColor, QPalette
+from PySide6.QtWidgets import QStyledItemDelegate
+
+# Colores por tipo de fila: (fondo, texto)
+ROW_COLORS = {
+    "TITLE": (QColor(Qt.blue), QColor(Qt.white)),
+    "INFO": (QColor(250, 245, 230), QColor(Qt.black)),
+    "EMPTY": (QColor(Qt.lightGray), QColor(Qt.black)),
+    "PRODUCT": (QColor(Qt.white), QColor(Qt.black)),
+}
+
+# Fila activa: el fondo depende del tipo, el texto siempre negro
+ACTIVE_ROW_COLORS = {
+    "TITLE": QColor(180, 200, 255),  # azul + highlight
+    "INFO": QColor(255, 255, 150),
+    "EMPTY": QColor(230, 230, 180),
+    "PRODUCT": QColor(255, 255, 0, 100),
+}
+
+ACTIVE_CELL_COLOR = QColor(Qt.cyan)  # celda que se está dictando (CANTIDAD / PRECIO)
+
+
+class RowStyleDelegate(QStyledItemDelegate):
+    """
+    Pinta cada celda según el tipo de fila y la fila/celda activa de
+    ProformaTableModel, en el momento de pintar: no hay colores guardados
+    por celda, así que mover la fila activa solo invalida dos filas.
+
+    Los QBrush se crean una vez por tipo y estado.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._brushes = {
+            (row_type, False): (QBrush(background), QBrush(text))
+            for row_type, (background, text) in ROW_COLORS.items()
+        }
+        black = QBrush(QColor(Qt.black))
+        self._brushes.update({
+            (row_type, True): (QBrush(background), black)
+            for row_type, background in ACTIVE_ROW_COLORS.items()
+        })
+        self._active_cell = (QBrush(ACTIVE_CELL_COLOR), black)
+
+    def initStyleOption(self, option, index):
+        super().initStyleOption(option, index)
+        model = index.model()
+        r = index.row()
+        if r >= model.proforma.row_count():
+            return
+
+        active = r == model.active_row
+        if active and index.column() == model.active_column:
+            background, text = self._active_cell
+        else:
+            row_type = model.proforma.get_row(r).type
+            background, text = self._brushes.get((row_type, active), self._brushes[("PRODUCT", active)])
+
+        option.backgroundBrush = background
+        option.palette.setBrush(QPalette.Text, text)
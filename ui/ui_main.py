@@ -5,7 +5,6 @@ from PySide6.QtWidgets import (
 )
 from PySide6.QtCore import Qt
 
-from generator.proforma_generator import generate_proforma
 from pricing.multipliers import MULTIPLICADORES
 
 # Tipos de resina
@@ -101,8 +100,7 @@ class MainWindow(QWidget):
         customer_phone = self.phone_input.text()
 
         # Generar filas completas (se limpia todo)
-        rows = generate_proforma(
-            table_window=self.table_window,
+        self.table_window.generate_proforma(
             resin_type=resin,
             work_type=work_type,
             area_m2=area,
@@ -1,51 +1,80 @@
 # ui/ui_table.py
-
 from PySide6.QtWidgets import (
-    QMainWindow, QTableWidget, QTableWidgetItem,
+    QMainWindow, QTableView, QAbstractItemView,
     QVBoxLayout, QHBoxLayout, QWidget, QGridLayout,
-    QLineEdit, QLabel, QPushButton, QListWidget, QStyledItemDelegate
+    QLineEdit, QLabel, QPushButton, QListView
 )
-from PySide6.QtCore import Qt
-from PySide6.QtGui import QColor
+from PySide6.QtCore import Qt, QTimer, Signal
 
-from voice.voice_listener import VoiceListener
-from voice.voice_normalizer import normalize_command
-from voice.grammar_builder import build_grammar
+from ui.proforma_table_model import ProformaTableModel
+from ui.row_delegate import RowStyleDelegate
+from ui.product_list_model import ProductListModel
+from voice.voice_listener import create_voice_listener
+from voice.voice_normalizer import VoiceNormalizer
+from voice.grammar_builder import build_mode_grammars, build_vocabulary, command_vocabulary
+from voice.rescorer import Rescorer
+from voice.session_recorder import session_recording_enabled
 
-from commands.command_state import CommandState
 from commands.command_state import CommandMode
-from excel.excel_exporter import export_proforma_to_excel
-from db.materials_repository import load_materials
+from commands.command_journal import CommandJournal, command_journal_enabled
+from core.env import getenv
+from core.session import ProformaSession
 
-from models.proforma_model import ProformaModel
 from models.proforma_row import ProformaRow
 
 
 class ProformaTableWindow(QMainWindow):
+    # Resultados de la segunda pasada (llegan desde un hilo del executor)
+    rescore_ready = Signal(object)
+    rescore_failed = Signal(str)
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("PresupuestatorVoice")
         self.resize(1100, 550)
-        self._updating_ui = False
-        self.user_editing = False
 
 
         # --------------------------------------------------
-        # Datos / estado
+        # Datos / estado (núcleo sin Qt; la ventana es un adaptador)
         # --------------------------------------------------
-        self.materials = load_materials()
-        self.model = ProformaModel()
-        self.state = CommandState(self.materials)
+        # 📓 Diario de comandos (COMMAND_JOURNAL=1) para recuperar / reproducir la sesión
+        journal = CommandJournal() if command_journal_enabled() else None
+        self.session = ProformaSession(journal=journal)
+        self.materials = self.session.materials
+        self.model = self.session.model
+        self.state = self.session.state
+        self.normalizer = VoiceNormalizer(
+            vocabulary=build_vocabulary(self.materials),
+            commands=command_vocabulary(self.materials),
+        )
 
         self.active_row = 0
-        self.last_token = None
         self.listening = False
         self.voice_worker = None
 
-        # --------------------------------------------------
-        # Filas iniciales
-        # --------------------------------------------------
-        self.model.add_row(ProformaRow(type="PRODUCT"))
+        # 🔹 Segunda pasada (SESSION_RECORDING=1): filas tocadas por la frase en curso
+        self.rescorer = None
+        # Por id(fila) y guardando la fila: los índices cambian al insertar /
+        # borrar filas mientras la segunda pasada está en marcha
+        self.rescore_flags: dict[int, tuple[ProformaRow, str]] = {}  # -> (fila, texto de la pasada completa)
+        self._utterance_rows: dict[int, ProformaRow] = {}
+        if session_recording_enabled():
+            self.rescorer = Rescorer(on_result=self.rescore_ready.emit, on_error=self.rescore_failed.emit)
+            self.rescore_ready.connect(self.on_rescored)
+            self.rescore_failed.connect(self.on_rescore_error)
+
+        # 🔹 Tokens de voz acumulados: se aplican en un solo lote por frame
+        self._pending_words: list[tuple[str, list[str]]] = []  # (palabra, tokens)
+        self._pending_hypothesis: str | None = None
+        self._voice_frame = QTimer(self)
+        self._voice_frame.setSingleShot(True)
+        self._voice_frame.setInterval(int(getenv("VOICE_FRAME_MS", "30")))
+        self._voice_frame.timeout.connect(self._flush_voice_frame)
+
+        # 📊 Avisos de repintado a la tabla por token dictado / tecleado
+        self._ui_ops_total = 0
+        self._ui_ops_tokens = 0
+        self._ui_ops_last = 0.0
 
         # --------------------------------------------------
         # Barra lateral izquierda
@@ -132,28 +161,31 @@ class ProformaTableWindow(QMainWindow):
         # --------------------------------------------------
 
 
-        self.HIGHLIGHT_COLORS = {
-            "PRODUCT": QColor(255, 230, 160),
-            "INFO":    QColor(230, 230, 200),
-            "TITLE":   QColor(220, 220, 220),
-            "EMPTY":   QColor(210, 210, 210),
-        }
-        self.table = QTableWidget(self.model.row_count(), 5)
-        self.table.setHorizontalHeaderLabels(
-            ["KITS", "PRODUCTO", "CANTIDAD", "PRECIO", "TOTAL"]
+        # 🔹 La vista lee ProformaModel directamente (solo celdas visibles)
+        self.table_model = ProformaTableModel(self.model, self.rescore_flags, self)
+        self.table_model.cell_edited.connect(self.on_cell_edited)
+        self.table = QTableView()
+        self.table.setModel(self.table_model)
+        self.table.setItemDelegate(RowStyleDelegate(self.table))
+        self.table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.table.setEditTriggers(
+            QAbstractItemView.DoubleClicked | QAbstractItemView.EditKeyPressed
+        )
+        self.table.clicked.connect(
+            lambda index: self.on_cell_clicked(index.row(), index.column())
         )
-        self._init_table_items()
-        self.table.cellChanged.connect(self.on_cell_changed)
-        self.table.cellClicked.connect(self.on_cell_clicked)
 
         # --------------------------------------------------
         # Lista de productos
         # --------------------------------------------------
-        self.product_list = QListWidget()
+        # 🔹 Sugerencias ligadas a CommandState: solo diferencias, páginas al hacer scroll
+        self.product_model = ProductListModel(self.state, self)
+        self.product_list = QListView()
+        self.product_list.setModel(self.product_model)
+        self.product_list.setUniformItemSizes(True)
+        self.product_list.setEditTriggers(QAbstractItemView.NoEditTriggers)
         self.product_list.setMaximumWidth(350)
-        self.product_list.itemClicked.connect(self.on_product_clicked)
-        self.table.itemSelectionChanged.connect(self._on_selection_changed)
-        self.table.setItemDelegate(UserEditDelegate(self))
+        self.product_list.clicked.connect(self.on_product_clicked)
 
 
         self.product_list.hide()
@@ -193,10 +225,8 @@ class ProformaTableWindow(QMainWindow):
         # Refresco inicial
         # --------------------------------------------------
         #self.create_dummy_starting_rows()
-        self.table.setRowCount(self.model.row_count())
-        self._init_table_items()
-        self.refresh_all_rows()
         self.highlight_active_row()
+        self.journal_checkpoint()
 
 
         self.table.setColumnWidth(0, 200)  # suficiente para mostrar info
@@ -212,62 +242,22 @@ class ProformaTableWindow(QMainWindow):
     # Tabla
     # ======================================================
 
-    def _init_table_items(self):
-        """Inicializa QTableWidgetItem en todas las celdas"""
-        for r in range(self.table.rowCount()):
-            for c in range(self.table.columnCount()):
-                if self.table.item(r, c) is None:
-                    self.table.setItem(r, c, QTableWidgetItem(""))
-                    
-
     def highlight_active_row(self):
-        row_count = self.model.row_count()
-        if row_count == 0:
+        """
+        Colores por tipo de fila (los calcula ProformaTableModel): el
+        evento ActiveRowMoved repinta solo la fila anterior y la nueva.
+        """
+        if self.model.row_count() == 0:
             return  # nada que hacer
 
-        INFO_BG = QColor(250, 245, 230)
-        ACTIVE_INFO_BG = QColor(255, 255, 0, 100)
-
         self.update_row_type_buttons()
-        for r in range(self.table.rowCount()):
-            if r >= row_count:
-                continue  # evitar pedir filas que no existen
-
-            row = self.model.get_row(r)
-            for c in range(self.table.columnCount()):
-                item = self.table.item(r, c)
-                if not item:
-                    continue
-
-                if r == self.active_row:
-                    # ACTIVE overrides, depende del tipo
-                    if row.type == "TITLE":
-                        item.setBackground(QColor(180, 200, 255))  # azul + highlight
-                    elif row.type == "INFO":
-                        item.setBackground(QColor(255, 255, 150))
-                    elif row.type == "EMPTY":
-                        item.setBackground(QColor(230, 230, 180))
-                    else:  # PRODUCT
-                        item.setBackground(ACTIVE_INFO_BG)
-                    item.setForeground(Qt.black)
-                else:
-                    # colores normales
-                    if row.type == "TITLE":
-                        item.setBackground(Qt.blue)
-                        item.setForeground(Qt.white)
-                    elif row.type == "INFO":
-                        item.setBackground(INFO_BG)
-                        item.setForeground(Qt.black)
-                    elif row.type == "EMPTY":
-                        item.setBackground(Qt.lightGray)
-                        item.setForeground(Qt.black)
-                    else:
-                        item.setBackground(Qt.white)
-                        item.setForeground(Qt.black)
+        self.model.set_active_row(self.active_row)
 
 
 
     def on_cell_clicked(self, row, column):
+        self._flush_voice_frame()
+        self.state.discard_speculation()
         self.active_row = row
         self.state.active_row = row
 
@@ -275,115 +265,42 @@ class ProformaTableWindow(QMainWindow):
 
         # Solo PRODUCT + columna PRODUCTO
         if row_type == "PRODUCT" and column == 1:
-            self.state.mode = CommandMode.PRODUCT
-            self.state.product_buffer.clear()
-            self.state.product_matches = list(self.materials.keys())
+            self.state.begin_product()
         else:
             self.state.mode = CommandMode.IDLE
 
         self.highlight_active_row()
         self.highlight_active_cell()
         self.update_product_suggestions()
+        self._sync_voice_mode()
+        self.journal_checkpoint()
 
 
 
-    def refresh_row(self, row_index):
-        """
-        Actualiza la UI de la fila a partir del modelo sin entrar en bucles infinitos.
-        TITLE/INFO respetan manual edits en columnas 0–2.
-        """
-        row = self.model.get_row(row_index)
-        self._updating_ui = True
-        self.table.blockSignals(True)
-
-        for col_index in range(5):
-            current_text = row.as_list()[col_index]
-            # 🔹 Obtener o crear el item siempre
-            item = self.table.item(row_index, col_index)
-            if item is None:
-                item = QTableWidgetItem()
-                self.table.setItem(row_index, col_index, item)
-
-            # ⚡ Asegurarse de que la celda esté habilitada
-            item.setFlags(item.flags() | Qt.ItemIsEnabled | Qt.ItemIsSelectable)
-
-            # Actualizar texto
-            item.setText(current_text)
-
-            # Mensaje de debug
-            #if row.type in ("TITLE", "INFO") and col_index < 2:
-            #    print("REFRESH", row.type, col_index, current_text)
-
-        self.table.blockSignals(False)
-        self._updating_ui = False
-
-
-
-    def refresh_all_rows(self):
-        for r in range(self.model.row_count()):
-            self.refresh_row(r)
-
-    def sync_table_rows(self):
-        """Añade filas nuevas al QTableWidget si el modelo creció"""
-        current_table_rows = self.table.rowCount()
-        model_rows = self.model.row_count()
-        if model_rows > current_table_rows:
-            self.table.setRowCount(model_rows)
-            for r in range(current_table_rows, model_rows):
-                for c in range(self.table.columnCount()):
-                    if self.table.item(r, c) is None:
-                        self.table.setItem(r, c, QTableWidgetItem(""))
-
-    def on_cell_changed(self, row, column):
-        if self._updating_ui:
-            return
-        if not self.user_editing:
-            return
-        item = self.table.item(row, column)
-        if not item:
-            return
+    def generate_proforma(self, **options):
+        """Proforma generada (ui_main) -> sustituye la tabla entera."""
+        self._flush_voice_frame()
+        self.rescore_flags.clear()
+        self._utterance_rows.clear()
+        self.session.generate(**options)
+        self.active_row = 0
 
-        text = item.text() or ""
-        proforma_row = self.model.get_row(row)
+        self.highlight_active_row()
+        self.highlight_active_cell()
+        self.update_product_suggestions()
+        self._sync_voice_mode()
+        # 📓 La proforma generada entra en el diario como checkpoint
+        self.journal_checkpoint()
 
-        # 🔒 Si el valor ya es el mismo, NO hacer nada
-        current = [
-            proforma_row.col_0,
-            proforma_row.col_1,
-            proforma_row.col_2,
-            proforma_row.col_3,
-            proforma_row.col_4,
-        ][column]
 
-        if text == current:
-            return
 
-        # ✅ UI → MODELO (única dirección permitida aquí)
-        if column == 0:
-            proforma_row.col_0 = text
-        elif column == 1:
-            proforma_row.col_1 = text
-        elif column == 2:
-            proforma_row.col_2 = text
-        elif column == 3:
-            proforma_row.col_3 = text
-        elif column == 4:
-            proforma_row.col_4 = text
-
-        # 🔢 Recalcular TOTAL solo si toca
-        if proforma_row.type == "PRODUCT" and column in (2, 3):
-            try:
-                qty = float(proforma_row.col_2)
-                price = float(proforma_row.col_3)
-                proforma_row.col_4 = str(round(qty * price, 2))
-            except:
-                proforma_row.col_4 = ""
-        if proforma_row.type == "PRODUCT" and column in (2, 3):
-            self._updating_ui = True
-            total_item = self.table.item(row, 4)
-            if total_item:
-                total_item.setText(proforma_row.col_4)
-            self._updating_ui = False
+    def refresh_row(self, row_index):
+        """Repinta la fila (p. ej. marcas de la segunda pasada)."""
+        self.table_model.rows_changed([row_index])
+
+    def on_cell_edited(self, row, column):
+        # ✅ UI → MODELO ya aplicado por ProformaTableModel.setData
+        self.journal_checkpoint()
 
 
     # ======================================================
@@ -391,6 +308,7 @@ class ProformaTableWindow(QMainWindow):
     # ======================================================
 
     def process_command(self):
+        self._flush_voice_frame()
         text = self.command_input.text().upper()
         self.command_input.clear()
         self._process_tokens(text.split())
@@ -399,96 +317,239 @@ class ProformaTableWindow(QMainWindow):
         if not self.listening:
             self.listening = True
             self.listen_button.setText("⏹️")
-            grammar = build_grammar(self.materials)
-            self.voice_worker = VoiceListener(grammar=grammar)
-            self.voice_worker.result_ready.connect(self.on_voice_result)
-            self.voice_worker.start()
+            # 🔹 El listener se crea una vez y se reutiliza entre toggles
+            if self.voice_worker is None:
+                mode_grammars = build_mode_grammars(self.materials)
+                self.voice_worker = create_voice_listener(
+                    grammar=mode_grammars[self.state.mode],
+                    mode_grammars=mode_grammars,
+                )
+                self.voice_worker.result_ready.connect(self.on_voice_result)
+                self.voice_worker.token_retracted.connect(self.on_voice_retracted)
+                self.voice_worker.utterance_closed.connect(self.on_utterance_closed)
+                self.voice_worker.alternatives_ready.connect(self.on_voice_alternatives)
+                self.voice_worker.hypothesis_ready.connect(self.on_voice_hypothesis)
+                self.voice_worker.voice_error.connect(self.on_voice_error)
+                self._sync_voice_mode()
+            self.voice_worker.resume()
         else:
             self.listening = False
             self.listen_button.setText("🎙️")
             if self.voice_worker:
-                self.voice_worker.stop()
-                self.voice_worker = None
+                self.voice_worker.pause()
+                summaries = [
+                    self.voice_worker.vad_summary(),
+                    self.voice_worker.capture_summary(),
+                    self.ui_ops_summary(),
+                ]
+                summary = " · ".join(s for s in summaries if s)
+                if summary:
+                    self.status_label.setText(summary)
+
+    def on_voice_error(self, message, stopped):
+        self.status_label.setText(f"⚠️ {message}")
+        if stopped and self.sender() is self.voice_worker:
+            # El listener ya no captura: el siguiente clic en el micro crea otro
+            self._flush_voice_frame()
+            self.voice_worker.stop()
+            self.voice_worker = None
+            self.listening = False
+            self.listen_button.setText("🎙️")
 
-    def on_voice_result(self, text):
-        normalized = normalize_command(text)
-        self._process_tokens(normalized.split())
-        self.refresh_all_rows()
+    def shutdown_voice(self):
+        self._flush_voice_frame()
+        if self.voice_worker:
+            self.voice_worker.stop()
+            self.voice_worker = None
+        if self.rescorer:
+            self.rescorer.shutdown()
+            self.rescorer = None
+        self.listening = False
 
-    def _process_tokens(self, tokens):
-        repeat_allowed = ["SIGUIENTE", "NUEVA", "PRODUCTO", "KIT", "EPOXI",
-                        "UNO", "DOS", "TRES", "CUATRO", "CINCO", "SEIS",
-                        "SIETE", "OCHO", "NUEVE", "CERO"]
+    def on_voice_result(self, text):
+        # Ráfagas de tokens -> un único lote al vencer el frame
+        self._pending_words.append((text, self.normalizer.normalize(text).split()))
+        self._schedule_voice_frame()
+
+    def on_voice_hypothesis(self, text):
+        # Solo cuenta la última hipótesis del frame
+        self._pending_hypothesis = text
+        self._schedule_voice_frame()
+
+    def _schedule_voice_frame(self):
+        if not self._voice_frame.isActive():
+            self._voice_frame.start()
+
+    def _flush_voice_frame(self):
+        """Aplica lo acumulado de voz: tokens confirmados y luego la hipótesis."""
+        self._voice_frame.stop()
+        words, self._pending_words = self._pending_words, []
+        hypothesis, self._pending_hypothesis = self._pending_hypothesis, None
+        if words:
+            self._apply_batch(lambda: self.session.apply_voice(words), sum(len(t) for _, t in words))
+        if hypothesis is not None:
+            self._apply_hypothesis(hypothesis)
+
+    def _apply_hypothesis(self, text):
+        # ⚡ Acotado especulativo: sugerencias en vivo antes de confirmar
+        words = self.normalizer.normalize(text).split() if text else []
+        if words:
+            changed = self.state.speculate(words)
+        else:
+            changed = self.state.discard_speculation()
+        if changed:
+            self.update_product_suggestions()
 
-        for token in tokens:
-            if token == self.last_token and token not in repeat_allowed:
-                continue
-            self.last_token = token
+    def on_voice_alternatives(self, alternatives):
+        # N-best en modo PRODUCT: la alternativa que mejor acota el catálogo
+        # (elegida sobre el estado con los tokens anteriores ya aplicados)
+        self._flush_voice_frame()
+        candidates = [self.normalizer.normalize(a.text).split() for a in alternatives]
+        chosen = self.state.choose_product_alternative(candidates)
+        self._process_tokens(candidates[chosen])
+
+    def on_voice_retracted(self, text):
+        # Las retracciones llegan de la última palabra hacia atrás
+        for i in range(len(self._pending_words) - 1, -1, -1):
+            if self._pending_words[i][0] == text:
+                # Aún en el frame: basta con no aplicarla
+                del self._pending_words[i:]
+                self.status_label.setText(f"↩️ Reconocimiento corregido: '{text}' descartado")
+                return
+
+        self._flush_voice_frame()
+        if not self.session.retract(text):
+            self.status_label.setText(f"↩️ Reconocimiento corregido: '{text}' (no se puede deshacer)")
+            return
 
-            before_rows = self.model.row_count()
+        # Comando deshecho: el modelo ya avisó a la tabla fila a fila; las
+        # filas son las mismas, así que sus marcas de segunda pasada siguen
+        self._sync_active_row()
+        self.highlight_active_row()
+        self.highlight_active_cell()
+        self.update_product_suggestions()
+        self._sync_voice_mode()
+        self.status_label.setText(f"↩️ Reconocimiento corregido: '{text}' deshecho")
+
+    def on_utterance_closed(self, utterance):
+        # Todos los tokens de la frase ya han pasado por _process_tokens
+        self._flush_voice_frame()
+        rows = list(self._utterance_rows.values())
+        self._utterance_rows.clear()
+        if self.rescorer and rows:
+            self.rescorer.submit(utterance, rows)
+
+    def on_rescored(self, result):
+        if not result.disagrees:
+            return
+        for row in result.rows:
+            # Fila borrada o sustituida desde entonces -> nada que marcar
+            index = next((i for i, current in enumerate(self.model.rows) if current is row), None)
+            if index is not None:
+                self.rescore_flags[id(row)] = (row, result.text)
+                self.refresh_row(index)
+        self.status_label.setText(
+            f"🔍 Segunda pasada: '{result.utterance.text}' -> '{result.text}'"
+        )
 
-            msg = self.state.handle_word(token, self.model)
+    def on_rescore_error(self, message):
+        # La pasada en vivo sigue; solo se pierde la revisión de esa frase
+        self.status_label.setText(f"⚠️ {message}")
 
-            after_rows = self.model.row_count()
+    def _process_tokens(self, tokens):
+        # Sin deduplicar: TokenCommitter ya emite cada palabra una sola vez
+        if not tokens:
+            return
+        self._apply_batch(lambda: self.session.apply(tokens), len(tokens))
+
+    def _apply_batch(self, apply, token_count):
+        ui_ops = self.table_model.ui_ops
+        batch = apply()
+        self._utterance_rows.update(
+            (id(row), row)
+            for row in (self.model.get_row(r) for r in batch.rows if r < self.model.row_count())
+        )
 
-            # 🔹 Actualizar active_row desde CommandState
-            self.active_row = min(self.state.active_row, after_rows - 1) if after_rows > 0 else 0
+        self._sync_active_row()
+        if batch.messages:
+            self.status_label.setText(batch.message)
+        self._refresh_batch(batch)
+        self._sync_voice_mode()
 
-            self.status_label.setText(msg)
+        # 📊 Coste de repintado: avisos a la vista por token
+        if token_count:
+            self._ui_ops_last = (self.table_model.ui_ops - ui_ops) / token_count
+            self._ui_ops_total += self.table_model.ui_ops - ui_ops
+            self._ui_ops_tokens += token_count
 
-            # 🔴 Sincronizar filas de tabla con el modelo
-            if after_rows != before_rows:
-                # Asegurarnos de eliminar filas sobrantes si se borraron
-                self.table.setRowCount(after_rows)
-                self.refresh_all_rows()
-            else:
-                # Solo refrescar la fila activa
-                if 0 <= self.active_row < after_rows:
-                    self.refresh_row(self.active_row)
+    def _sync_active_row(self):
+        # 🔹 Actualizar active_row desde CommandState
+        row_count = self.model.row_count()
+        self.active_row = min(self.state.active_row, row_count - 1) if row_count > 0 else 0
 
-            # 🔹 Highlight siempre sobre fila activa válida
-            if after_rows > 0:
-                self.highlight_active_row()
-                self.highlight_active_cell()
+    def _refresh_batch(self, batch):
+        """
+        Las celdas ya se invalidaron con los eventos de ProformaModel;
+        aquí solo queda mover la fila/celda activa y las sugerencias.
+        """
+        # 🔹 Highlight siempre sobre fila activa válida
+        if self.model.row_count() > 0:
+            self.highlight_active_row()
+            self.highlight_active_cell()
 
-            # 🔹 Actualizar sugerencias de producto
+        # 🔹 Sugerencias solo si hay (o había) modo PRODUCT
+        if batch.mode_changed or self.state.mode == CommandMode.PRODUCT:
             self.update_product_suggestions()
 
+    def journal_checkpoint(self):
+        # 📓 Cambios que no pasan por handle_word -> filas completas al diario;
+        # la voz anterior ya no se puede deshacer por encima de ellos
+        self.session.forget_voice()
+        self.session.checkpoint()
+
+    def ui_ops_summary(self) -> str:
+        if not self._ui_ops_tokens:
+            return ""
+        return (
+            f"Repintado: {self._ui_ops_total / self._ui_ops_tokens:.1f} avisos/token "
+            f"(último lote {self._ui_ops_last:.1f})"
+        )
+
+    def _sync_voice_mode(self):
+        # 🔹 Gramática del reconocedor según el modo actual
+        if self.voice_worker:
+            self.voice_worker.set_mode(self.state.mode)
+
 
     # ======================================================
     # ProductBuffer UI
     # ======================================================
 
     def update_product_suggestions(self):
-        self.product_list.clear()
-        if self.state.mode != CommandMode.PRODUCT:
-            self.product_list.hide()
-            return
+        active = self.state.mode == CommandMode.PRODUCT
+        self.product_model.refresh(active)
+        self.product_list.setVisible(active)
 
-        self.product_list.show()
-        for product in self.state.product_matches[:50]:
-            self.product_list.addItem(product)
 
 
-
-    def on_product_clicked(self, item):
-        product = item.text()
+    def on_product_clicked(self, index):
+        # El producto que se ha visto al hacer clic, antes de aplicar la voz pendiente
+        product = self.product_model.name(index.row())
+        self._flush_voice_frame()
         self.model.set_product(self.state.active_row, product)
+        self.state.ranker.record_use(product)
         price = self.model.get_price_from_db(product)
         if price is not None:
             self.model.set_price(self.state.active_row, price)
 
         # Resetear estado
         self.state.reset()
-        self.product_list.clear()
-        self.product_list.hide()
-
-        # Sincronizar tabla con el modelo
-        self.sync_table_rows()
+        self.update_product_suggestions()
+        self._sync_voice_mode()
 
-        # Refrescar todas las filas relevantes
-        self.refresh_all_rows()
+        # La tabla ya se actualizó con los eventos de ProformaModel
         self.highlight_active_row()
+        self.journal_checkpoint()
 
 
     # ======================================================
@@ -497,7 +558,7 @@ class ProformaTableWindow(QMainWindow):
 
     def export_excel(self):
         try:
-            path = export_proforma_to_excel(self.model)
+            path = self.session.export(open_file=True)
             self.status_label.setText(f"Excel creado: {path}")
         except Exception as e:
             self.status_label.setText(f"Error exportando Excel: {e}")
@@ -507,24 +568,15 @@ class ProformaTableWindow(QMainWindow):
 
         self.model.insert_row(insert_at, ProformaRow(type="PRODUCT"))
 
-        self.sync_table_rows()
-        self.refresh_all_rows()
-
         self.active_row = insert_at
         self.state.active_row = insert_at
         self.highlight_active_row()
+        self.journal_checkpoint()
 
     def highlight_active_cell(self):
-        if self.state.mode == CommandMode.QUANTITY:
-            col = 2
-        elif self.state.mode == CommandMode.PRICE:
-            col = 3
-        else:
-            return
-
-        item = self.table.item(self.active_row, col)
-        if item:
-            item.setBackground(Qt.cyan)
+        # Celda que se está dictando: CANTIDAD / PRECIO
+        col = {CommandMode.QUANTITY: 2, CommandMode.PRICE: 3}.get(self.state.mode)
+        self.table_model.set_active_column(col)
 
     def create_dummy_starting_rows(self):
         self.model.add_row(ProformaRow(
@@ -561,11 +613,8 @@ class ProformaTableWindow(QMainWindow):
         if self.active_row >= self.model.row_count():
             self.active_row = self.model.row_count() - 1
 
-        # 🔹 Refrescar tabla completa
-        self.table.setRowCount(self.model.row_count())
-        self._init_table_items()           # asegura que todos los QTableWidgetItem existen
-        self.refresh_all_rows()
         self.highlight_active_row()
+        self.journal_checkpoint()
 
 
         
@@ -605,8 +654,8 @@ class ProformaTableWindow(QMainWindow):
             return  # seguridad
 
         self.model.set_row(self.active_row, new_row)
-        self.refresh_row(self.active_row)
         self.highlight_active_row()
+        self.journal_checkpoint()
 
 
     def update_row_type_buttons(self):
@@ -619,42 +668,3 @@ class ProformaTableWindow(QMainWindow):
                 )
             else:
                 button.setStyleSheet("")
-
-    def _on_selection_changed(self):
-        self.user_editing = False
-
-    def refresh_row_except(self, row_index, except_column):
-        row = self.model.get_row(row_index)
-        self._updating_ui = True
-        self.table.blockSignals(True)
-
-        values = row.as_list()
-        for col in range(5):
-            if col == except_column:
-                continue  # ⚠️ NO tocar la celda editada
-
-            item = self.table.item(row_index, col)
-            if not item:
-                item = QTableWidgetItem()
-                self.table.setItem(row_index, col, item)
-
-            item.setText(values[col])
-
-        self.table.blockSignals(False)
-        self._updating_ui = False
-
-class UserEditDelegate(QStyledItemDelegate):
-    def __init__(self, table):
-        super().__init__(table)
-        self.table = table
-
-    def createEditor(self, parent, option, index):
-        self.table.user_editing = True
-        return super().createEditor(parent, option, index)
-
-    def destroyEditor(self, editor, index):
-        self.table.user_editing = False
-        super().destroyEditor(editor, index)
-
-
-
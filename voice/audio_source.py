@@ -0,0 +1,185 @@
+# voice/audio_source.py
+import time
+import wave
+
+from voice.recognizer_service import SAMPLE_RATE
+from voice.ring_buffer import ring_buffer_from_env
+
+BLOCK_SIZE = 8000  # muestras por bloque (0.5 s a 16 kHz)
+SAMPLE_WIDTH = 2   # int16
+
+
+class AudioSource:
+    """
+    Fuente de audio PCM int16 mono.
+
+    read() devuelve el siguiente bloque (bytes o memoryview), o None si
+    no hay datos todavía (timeout). Cuando la fuente se agota, finished=True.
+    """
+
+    def __init__(self, sample_rate: int = SAMPLE_RATE, block_size: int = BLOCK_SIZE):
+        self.sample_rate = sample_rate
+        self.block_size = block_size
+        self.finished = False
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def read(self, timeout: float = 0.1) -> bytes | memoryview | None:
+        raise NotImplementedError
+
+    def pause(self):
+        pass
+
+    def resume(self):
+        pass
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+# --------------------------------------------------
+# Micrófono
+# --------------------------------------------------
+
+class MicrophoneSource(AudioSource):
+    """
+    Captura en vivo con sd.RawInputStream; pause() descarta el audio.
+
+    El callback escribe en un AudioRingBuffer preasignado (sin bytes nuevos
+    por bloque) y read() devuelve un memoryview válido hasta el siguiente read().
+    """
+
+    def __init__(self, sample_rate: int = SAMPLE_RATE, block_size: int = BLOCK_SIZE):
+        super().__init__(sample_rate, block_size)
+        self.active = True
+        self.ring = ring_buffer_from_env(block_size * SAMPLE_WIDTH)
+        self._stream = None
+
+    def open(self):
+        # Import diferido: las fuentes de fichero no necesitan PortAudio
+        import sounddevice as sd
+
+        def callback(indata, frames, time, status):
+            if self.active:
+                self.ring.write(indata)
+
+        self._stream = sd.RawInputStream(
+            samplerate=self.sample_rate,
+            blocksize=self.block_size,
+            dtype="int16",
+            channels=1,
+            callback=callback
+        )
+        self._stream.start()
+
+    def close(self):
+        if self._stream is not None:
+            self._stream.stop()
+            self._stream.close()
+            self._stream = None
+
+    def read(self, timeout: float = 0.1) -> memoryview | None:
+        return self.ring.read(timeout)
+
+    def pause(self):
+        self.active = False
+        self.ring.clear()
+
+    def resume(self):
+        self.ring.clear()
+        self.active = True
+
+    def summary(self) -> str:
+        return self.ring.summary()
+
+
+# --------------------------------------------------
+# Fichero WAV / PCM crudo
+# --------------------------------------------------
+
+class FileAudioSource(AudioSource):
+    """
+    Lee un .wav (int16 mono) o un fichero PCM crudo int16 mono.
+
+    realtime=False -> entrega bloques tan rápido como se pidan
+    realtime=True  -> respeta el ritmo real del audio (multiplicado por speed)
+    """
+
+    def __init__(
+        self,
+        path: str,
+        realtime: bool = False,
+        speed: float = 1.0,
+        sample_rate: int = SAMPLE_RATE,
+        block_size: int = BLOCK_SIZE,
+    ):
+        super().__init__(sample_rate, block_size)
+        self.path = path
+        self.realtime = realtime
+        self.speed = speed
+        self.samples_read = 0
+
+        self._wav = None
+        self._raw = None
+        self._start = None
+
+    def open(self):
+        self.finished = False
+        self.samples_read = 0
+        self._start = time.perf_counter()
+
+        if self.path.lower().endswith(".wav"):
+            self._wav = wave.open(self.path, "rb")
+            if self._wav.getnchannels() != 1 or self._wav.getsampwidth() != SAMPLE_WIDTH:
+                raise ValueError(f"{self.path}: se espera WAV mono int16")
+            if self._wav.getframerate() != self.sample_rate:
+                raise ValueError(
+                    f"{self.path}: {self._wav.getframerate()} Hz, "
+                    f"se esperaba {self.sample_rate} Hz"
+                )
+        else:
+            self._raw = open(self.path, "rb")
+
+    def close(self):
+        if self._wav is not None:
+            self._wav.close()
+            self._wav = None
+        if self._raw is not None:
+            self._raw.close()
+            self._raw = None
+
+    def read(self, timeout: float = 0.1) -> bytes | None:
+        if self.finished:
+            return None
+
+        if self._wav is not None:
+            data = self._wav.readframes(self.block_size)
+        else:
+            data = self._raw.read(self.block_size * SAMPLE_WIDTH)
+
+        if not data:
+            self.finished = True
+            return None
+
+        self.samples_read += len(data) // SAMPLE_WIDTH
+
+        if self.realtime:
+            # No entregar el bloque antes de que "haya sonado"
+            due = self._start + self.samples_read / (self.sample_rate * self.speed)
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+        return data
+
+    @property
+    def seconds_read(self) -> float:
+        return self.samples_read / self.sample_rate
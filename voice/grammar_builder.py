@@ -1,5 +1,11 @@
 #grammar_builder.py
 
+import re
+
+from commands.command_state import CommandMode
+from commands.spanish_numbers import NUMBER_GRAMMAR
+from core.env import getenv
+
 BASE_GRAMMAR = [
     "fila",
     "cantidad",
@@ -10,7 +16,7 @@ BASE_GRAMMAR = [
     "nuevo",
     "nueva",
     "titulo",
-    "detalle", 
+    "detalle",
     "vacia",
     "borrar",
     "coma",
@@ -22,9 +28,91 @@ BASE_GRAMMAR = [
     "cero","uno", "dos", "tres", "cuatro", "cinco", "seis", "siete", "ocho", "nueve", "diez",
 ]
 
-def build_grammar(materials: dict) -> list[str]:
-    grammar = set(BASE_GRAMMAR)
+DIGIT_WORDS = ["cero", "uno", "dos", "tres", "cuatro", "cinco", "seis", "siete", "ocho", "nueve"]
+
+# Palabras habladas que el normalizador convierte en triggers de producto
+TRIGGER_ALIASES = ["acrilica", "acrilico", "polizon", "epoxy", "eposi"]
+
+# Palabra comodín de Vosk: absorbe lo que no está en la gramática
+UNK = "[unk]"
+
+def material_vocabulary(materials: dict) -> set[str]:
+    """
+    Palabras sueltas de los nombres de material, sin duplicados.
+    'EPOXI RAL 7043 K-1' -> {'epoxi', 'ral', 'k'}
+    (los números se dictan dígito a dígito: ya están en DIGIT_WORDS)
+    """
+    vocabulary = set()
     for name in materials.keys():
-        grammar.add(name.lower())
-    
-    return sorted(grammar)
\ No newline at end of file
+        vocabulary.update(re.findall(r"[^\W\d_]+", name.lower()))
+    return vocabulary
+
+
+def build_grammar(materials: dict) -> list[str]:
+    grammar = set(BASE_GRAMMAR) | set(NUMBER_GRAMMAR)
+    grammar |= material_vocabulary(materials)
+    grammar.add(UNK)
+
+    return sorted(grammar)
+
+
+def _product_trigger_words() -> set[str]:
+    triggers = getenv("PRODUCT_TRIGGER_WORDS", "PRODUCTO").split(",")
+    return {t.strip().lower() for t in triggers if t.strip()} | set(TRIGGER_ALIASES)
+
+
+def build_mode_grammars(materials: dict) -> dict[CommandMode, list[str]]:
+    """
+    Una gramática reducida por modo de CommandState.
+    Solo contiene lo que handle_word acepta en ese modo (+ CANCELAR / NO).
+    QUANTITY y PRICE comparten la misma lista: pasar de uno a otro no
+    cambia de recognizer.
+    """
+    cancel = {"cancelar", "no"}
+    triggers = _product_trigger_words()
+
+    idle = cancel | triggers | {
+        "fila", "si", "siguiente", "producto", "cantidad", "precio",
+    }
+
+    row = cancel | set(DIGIT_WORDS[1:]) | {
+        "titulo", "informacion", "detalle", "producto", "vacia", "borrar",
+    }
+
+    # Numerales completos: "mil doscientos cincuenta coma cincuenta"
+    number = sorted(cancel | triggers | set(NUMBER_GRAMMAR) | {
+        "siguiente", "fila", "si", "producto",
+    })
+
+    product = cancel | set(DIGIT_WORDS) | {"siguiente", UNK}
+    product |= material_vocabulary(materials)
+
+    return {
+        CommandMode.IDLE: sorted(idle),
+        CommandMode.ROW: sorted(row),
+        CommandMode.QUANTITY: number,
+        CommandMode.PRICE: number,
+        CommandMode.PRODUCT: sorted(product),
+    }
+
+
+def command_vocabulary(materials: dict) -> list[str]:
+    """Palabras de comando de todas las gramáticas (sin las de materiales)."""
+    commands = set(BASE_GRAMMAR)
+    for mode, grammar in build_mode_grammars(materials).items():
+        if mode != CommandMode.PRODUCT:
+            commands.update(grammar)
+    commands.update(("cancelar", "no", "siguiente"))
+    commands.update(DIGIT_WORDS)
+    commands.discard(UNK)
+    return sorted(commands)
+
+
+def build_vocabulary(materials: dict) -> list[str]:
+    """
+    Todas las palabras válidas para el normalizador: primero las de
+    comandos (ganan si comparten clave fonética), luego las de materiales.
+    """
+    commands = command_vocabulary(materials)
+    material_words = material_vocabulary(materials) - set(commands)
+    return commands + sorted(material_words)
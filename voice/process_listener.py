@@ -0,0 +1,216 @@
+# voice/process_listener.py
+import multiprocessing
+import threading
+import time
+
+from PySide6.QtCore import QThread, Signal
+
+from voice.recognizer_process import run_recognizer_process
+from voice.recognizer_service import MODEL_PATH
+from voice.session_recorder import session_recording_enabled
+
+MAX_RESTART_DELAY = 5.0  # segundos
+MAX_FAILED_STARTS = 3    # hijos seguidos que mueren sin llegar a "ready" -> no relanzar
+
+
+class ProcessVoiceListener(QThread):
+    """
+    Backend por procesos: captura y decodificación en un proceso hijo,
+    fuera del GIL de la UI. Este hilo solo lee tokens del Pipe y los
+    reemite por result_ready (misma interfaz que VoiceListener).
+
+    Si el hijo muere sin que se haya pedido stop(), se relanza con el
+    último estado (captura activa/pausada y modo). Si muere MAX_FAILED_STARTS
+    veces seguidas sin llegar a arrancar (modelo inexistente...), se deja
+    de relanzar y voice_error avisa con stopped=True.
+    """
+    result_ready = Signal(str)
+    token_retracted = Signal(str)
+    utterance_closed = Signal(object)
+    alternatives_ready = Signal(object)
+    hypothesis_ready = Signal(str)
+    voice_error = Signal(str, bool)  # mensaje, True si el reconocimiento se ha detenido
+
+    def __init__(
+        self,
+        grammar=None,
+        model_path=MODEL_PATH,
+        source=None,
+        use_vad=True,
+        mode_grammars=None,
+        record=None,
+    ):
+        super().__init__()
+        if source is not None:
+            raise ValueError("El backend por procesos solo captura del micrófono")
+
+        self.running = False
+        self.restarts = 0
+        self.last_error = None
+
+        self._config = {
+            "model_path": model_path,
+            "grammar": grammar,
+            "mode_grammars": mode_grammars or {},
+            "use_vad": use_vad,
+            "record": record if record is not None else session_recording_enabled(),
+            "mode": None,
+            "capturing": False,
+        }
+        self._vad_summary = None
+        self._capture_summary = None
+
+        self._context = multiprocessing.get_context("spawn")
+        self._process = None
+        self._control = None
+        self._results = None
+        self._send_lock = threading.Lock()
+
+    # --------------------------------------------------
+    # Proceso hijo
+    # --------------------------------------------------
+
+    def _spawn(self):
+        control_recv, control_send = self._context.Pipe(duplex=False)
+        results_recv, results_send = self._context.Pipe(duplex=False)
+
+        self._process = self._context.Process(
+            target=run_recognizer_process,
+            args=(control_recv, results_send, dict(self._config)),
+            name="vosk-recognizer",
+            daemon=True,
+        )
+        self._process.start()
+
+        # Los extremos del hijo solo viven en el hijo
+        control_recv.close()
+        results_send.close()
+
+        with self._send_lock:
+            self._control = control_send
+        self._results = results_recv
+
+    def _send(self, command, arg=None):
+        with self._send_lock:
+            if self._control is None:
+                return
+            try:
+                self._control.send((command, arg))
+            except (BrokenPipeError, OSError):
+                pass  # el hilo lector detecta la caída y relanza
+
+    def _shutdown_process(self):
+        self._send("stop")
+        if self._process is not None:
+            self._process.join(timeout=2)
+            if self._process.is_alive():
+                self._process.terminate()
+                self._process.join()
+        with self._send_lock:
+            if self._control is not None:
+                self._control.close()
+                self._control = None
+        if self._results is not None:
+            self._results.close()
+            self._results = None
+        self._process = None
+
+    # --------------------------------------------------
+    # Hilo lector
+    # --------------------------------------------------
+
+    def run(self):
+        self.running = True
+        self._spawn()
+        delay = 0.5
+        ready = False       # el hijo actual ha cargado el modelo
+        failed_starts = 0   # hijos seguidos muertos antes de "ready"
+
+        while self.running:
+            # Primero vaciar el Pipe: el "error" del hijo llega antes de que muera
+            try:
+                if self._results.poll(0.1):
+                    kind, payload = self._results.recv()
+                    if kind == "ready":
+                        delay = 0.5
+                        ready = True
+                    else:
+                        self._dispatch(kind, payload)
+                    continue
+            except (EOFError, OSError):
+                time.sleep(0.1)  # el hijo está terminando; is_alive() lo confirmará
+
+            if self._process.is_alive() or not self.running:
+                continue
+
+            exitcode = self._process.exitcode
+            failed_starts = 0 if ready else failed_starts + 1
+            if failed_starts >= MAX_FAILED_STARTS:
+                # 🛑 No llega a arrancar: relanzar no lo va a arreglar
+                reason = self.last_error or f"código {exitcode}"
+                self.voice_error.emit(f"El reconocimiento no arranca ({reason})", True)
+                self.running = False
+                break
+
+            # 💥 Caída del hijo -> relanzar con backoff
+            self.restarts += 1
+            self.voice_error.emit(
+                f"Proceso de reconocimiento caído (código {exitcode}), reinicio #{self.restarts}",
+                False,
+            )
+            self._shutdown_process()
+            time.sleep(delay)
+            delay = min(delay * 2, MAX_RESTART_DELAY)
+            ready = False
+            self._spawn()
+
+        self._shutdown_process()
+
+    def _dispatch(self, kind, payload):
+        if kind == "token":
+            self.result_ready.emit(payload)
+        elif kind == "retract":
+            self.token_retracted.emit(payload)
+        elif kind == "hypothesis":
+            self.hypothesis_ready.emit(payload)
+        elif kind == "nbest":
+            self.alternatives_ready.emit(payload)
+        elif kind == "utterance":
+            self.utterance_closed.emit(payload)
+        elif kind == "vad":
+            self._vad_summary = payload
+        elif kind == "capture":
+            self._capture_summary = payload
+        elif kind == "error":
+            self.last_error = payload
+            self.voice_error.emit(f"Error en el proceso de reconocimiento: {payload}", False)
+
+    # --------------------------------------------------
+    # Control de captura (misma interfaz que VoiceListener)
+    # --------------------------------------------------
+
+    def set_mode(self, mode):
+        if mode == self._config["mode"]:
+            return
+        self._config["mode"] = mode
+        self._send("mode", mode)
+
+    def resume(self):
+        self._config["capturing"] = True
+        self._send("resume")
+        if not self.isRunning():
+            self.start()
+
+    def pause(self):
+        self._config["capturing"] = False
+        self._send("pause")
+
+    def vad_summary(self) -> str | None:
+        return self._vad_summary
+
+    def capture_summary(self) -> str | None:
+        return self._capture_summary
+
+    def stop(self):
+        self.running = False
+        self.wait()
@@ -0,0 +1,251 @@
+# voice/recognition_loop.py
+import json
+
+from commands.command_state import CommandMode
+from core.env import getenv
+from voice.audio_source import SAMPLE_WIDTH
+from voice.recognizer_service import RecognizerService, as_waveform
+from voice.token_commit import (
+    HYPOTHESIS,
+    NBEST,
+    TokenCommitter,
+    TokenEvent,
+    Word,
+    alternatives_from_result,
+    words_from_result,
+)
+
+_UNSET = object()
+
+# Audio sin resultado final que se guarda para pasarlo a la gramática nueva
+MAX_REFEED_SECONDS = 30
+
+
+class RecognitionLoop:
+    """
+    Bucle de decodificación sin Qt: bloque de audio -> eventos de token
+    (COMMIT / RETRACT / NBEST / HYPOTHESIS) a través de TokenCommitter.
+
+    Lo comparten VoiceListener (hilo) y el proceso hijo del backend
+    por procesos. set_mode() y request_reset() se pueden llamar desde
+    otro hilo: se aplican en el siguiente feed().
+
+    recorder: SessionRecorder opcional; cada fin de frase deja un
+    Utterance que se recoge con take_utterances().
+
+    N-best: en los modos de nbest_modes (PRODUCT) no se confirma nada
+    con los parciales; al final de la frase, si Vosk da varias
+    alternativas, se emite un único evento NBEST y el consumidor elige.
+
+    Cada cambio en las palabras sin confirmar se emite como HYPOTHESIS
+    (texto vacío cuando ya no queda nada pendiente) para que el consumidor
+    pueda acotar productos de forma especulativa.
+
+    Cambio de gramática a mitad de frase ("cantidad cinco" de un tirón):
+    el recognizer nuevo empieza de cero, así que se le vuelve a pasar el
+    audio desde el final de la última palabra confirmada. Para eso se
+    guarda el audio desde el último resultado final.
+    """
+
+    def __init__(
+        self,
+        service: RecognizerService,
+        grammar,
+        mode_grammars=None,
+        vad=None,
+        committer=None,
+        recorder=None,
+        nbest: int | None = None,
+        nbest_modes=(CommandMode.PRODUCT,),
+    ):
+        self.service = service
+        self.grammar = grammar
+        self.mode_grammars = mode_grammars or {}
+        self.vad = vad
+        self.committer = committer or TokenCommitter()
+        self.recorder = recorder
+        self.nbest = nbest if nbest is not None else int(getenv("VOICE_NBEST", "3"))
+        self.nbest_modes = set(nbest_modes)
+        self._utterances = []
+        self.recognizer = None
+        self.mode = None
+        self._alternatives = 0
+        self._samples = 0  # audio aceptado desde el último Reset()
+        self._hypothesis = ""  # última HYPOTHESIS emitida
+        self._since_final = bytearray()  # audio aceptado desde el último resultado final
+        self._since_final_start = 0      # muestra (desde Reset) donde empieza
+
+        self._pending_mode = _UNSET
+        self._reset_pending = False
+
+    def start(self):
+        """Precompila las gramáticas de modo y prepara el recognizer inicial."""
+        for mode, grammar in self.mode_grammars.items():
+            self.service.recognizer(grammar, self._alternatives_for(mode))
+        self.recognizer = self.service.recognizer(self.grammar)
+
+    # --------------------------------------------------
+    # Control (desde cualquier hilo)
+    # --------------------------------------------------
+
+    def set_mode(self, mode):
+        if mode != self.mode:
+            self._pending_mode = mode
+
+    def request_reset(self):
+        self._reset_pending = True
+
+    # --------------------------------------------------
+    # Decodificación
+    # --------------------------------------------------
+
+    def feed(self, data: bytes) -> list[TokenEvent]:
+        # 🔄 Tras resume(): mismo recognizer, estado limpio
+        if self._reset_pending:
+            self._reset_pending = False
+            self.recognizer.Reset()
+            self._restart()
+            self._close_utterance()
+            if self.vad:
+                self.vad.reset()
+
+        # 🔀 Cambio de modo -> gramática precompilada de ese modo
+        events = []
+        refeed = b""
+        if self._pending_mode is not _UNSET:
+            mode, self._pending_mode = self._pending_mode, _UNSET
+            refeed = self._switch_mode(mode)
+            # Audio ya grabado de la palabra en curso -> recognizer nuevo
+            if refeed:
+                events += self._accept(refeed)
+
+        # 🔇 Silencio -> ni AcceptWaveform ni PartialResult
+        blocks = self.vad.process(data) if self.vad else [data]
+        if not blocks and not refeed:
+            return []
+
+        for block in blocks:
+            if self.recorder:
+                self.recorder.add_audio(block)
+            events += self._accept(block)
+
+        # 🔚 Fin de voz según el VAD -> cerrar la frase sin esperar al endpoint
+        if self.vad and not self.vad.in_speech:
+            events += self._finalize(self.recognizer.FinalResult())
+            self._close_utterance()
+            return events
+
+        partial = words_from_result(json.loads(self.recognizer.PartialResult()), "partial")
+        if self.holding:
+            # N-best: nada se confirma hasta el resultado final de la frase
+            pending = partial
+        else:
+            events += self._track(self.committer.update(partial, self.cursor))
+            pending = self.committer.pending
+        events += self._hypothesis_event(" ".join(word.text for word in pending))
+        return events
+
+    def finish(self) -> list[TokenEvent]:
+        """Fin del audio: confirma lo que quede en el resultado final."""
+        events = self._finalize(self.recognizer.FinalResult())
+        self._close_utterance()
+        return events
+
+    def take_utterances(self) -> list:
+        """Frases grabadas desde la última llamada (vacío sin recorder)."""
+        utterances, self._utterances = self._utterances, []
+        return utterances
+
+    @property
+    def cursor(self) -> float:
+        """Segundos de audio decodificados (misma escala que los tiempos de Vosk)."""
+        return self._samples / self.service.sample_rate
+
+    @property
+    def holding(self) -> bool:
+        """True si el modo actual espera al final de frase para elegir alternativa."""
+        return self._alternatives > 1
+
+    # --------------------------------------------------
+
+    def _alternatives_for(self, mode) -> int:
+        return self.nbest if self.nbest > 1 and mode in self.nbest_modes else 0
+
+    def _accept(self, block) -> list[TokenEvent]:
+        self._samples += len(block) // SAMPLE_WIDTH
+        self._keep_audio(block)
+        # Fin de frase detectado por Vosk -> resultado definitivo
+        if self.recognizer.AcceptWaveform(as_waveform(block)):
+            events = self._finalize(self.recognizer.Result())
+            self._close_utterance()
+            return events
+        return []
+
+    def _keep_audio(self, block):
+        self._since_final += block
+        excess = len(self._since_final) - MAX_REFEED_SECONDS * self.service.sample_rate * SAMPLE_WIDTH
+        if excess > 0:
+            del self._since_final[:excess]
+            self._since_final_start += excess // SAMPLE_WIDTH
+
+    def _unconfirmed_audio(self) -> bytes:
+        """Audio desde el final de la última palabra confirmada (o del último resultado final)."""
+        start = self._since_final_start
+        committed = self.committer.committed
+        if committed:
+            if committed[-1].end is None:
+                return b""  # sin tiempos no se sabe dónde cortar
+            start = max(start, int(committed[-1].end * self.service.sample_rate))
+        offset = (start - self._since_final_start) * SAMPLE_WIDTH
+        return bytes(self._since_final[offset:])
+
+    def _switch_mode(self, mode) -> bytes:
+        """Devuelve el audio que hay que volver a pasar al recognizer nuevo."""
+        self.mode = mode
+        grammar = self.mode_grammars.get(mode, self.grammar)
+        alternatives = self._alternatives_for(mode)
+        if grammar is self.grammar and alternatives == self._alternatives:
+            return b""
+        refeed = self._unconfirmed_audio()
+        self.grammar = grammar
+        self._alternatives = alternatives
+        self.recognizer = self.service.recognizer(grammar, alternatives)
+        self._restart()
+        return refeed
+
+    def _finalize(self, result_json: str) -> list[TokenEvent]:
+        self._since_final.clear()
+        self._since_final_start = self._samples
+        result = json.loads(result_json)
+        alternatives = alternatives_from_result(result) if self.holding else []
+        if len(alternatives) > 1:
+            self.committer.reset()
+            top = alternatives[0]
+            events = [TokenEvent(NBEST, Word(top.text, conf=top.confidence), alternatives=alternatives)]
+        else:
+            events = self.committer.finalize(words_from_result(result, "text"), self.cursor)
+        return self._track(events) + self._hypothesis_event("")
+
+    def _hypothesis_event(self, text: str) -> list[TokenEvent]:
+        if text == self._hypothesis:
+            return []
+        self._hypothesis = text
+        return [TokenEvent(HYPOTHESIS, Word(text))]
+
+    def _track(self, events: list[TokenEvent]) -> list[TokenEvent]:
+        if self.recorder and events:
+            self.recorder.track(events)
+        return events
+
+    def _close_utterance(self):
+        if self.recorder:
+            utterance = self.recorder.close_utterance()
+            if utterance is not None:
+                self._utterances.append(utterance)
+
+    def _restart(self):
+        self._samples = 0
+        self._since_final.clear()
+        self._since_final_start = 0
+        self._hypothesis = ""
+        self.committer.reset()
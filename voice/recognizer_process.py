@@ -0,0 +1,83 @@
+# voice/recognizer_process.py
+"""
+Punto de entrada del proceso hijo del backend VOICE_BACKEND=process.
+Sin Qt: captura + VAD + decodificación, y los tokens vuelven por un Pipe.
+
+Mensajes control (padre -> hijo): ("pause", None) ("resume", None)
+                                  ("mode", CommandMode) ("stop", None)
+Mensajes results (hijo -> padre): ("ready", segundos_carga) ("token", str)
+                                  ("retract", str) ("nbest", list[Alternative])
+                                  ("hypothesis", str)
+                                  ("vad", resumen)
+                                  ("capture", resumen) ("utterance", Utterance)
+                                  ("error", texto)
+"""
+from voice.audio_source import BLOCK_SIZE, MicrophoneSource
+from voice.recognition_loop import RecognitionLoop
+from voice.recognizer_service import get_recognizer_service
+from voice.session_recorder import SessionRecorder
+from voice.token_commit import COMMIT, HYPOTHESIS, NBEST
+from voice.vad import VAD_BLOCK_SIZE, EnergyVAD
+
+
+def run_recognizer_process(control, results, config: dict):
+    try:
+        service = get_recognizer_service(config["model_path"])
+        vad = EnergyVAD() if config["use_vad"] else None
+        loop = RecognitionLoop(
+            service,
+            config["grammar"],
+            mode_grammars=config["mode_grammars"],
+            vad=vad,
+            recorder=SessionRecorder() if config["record"] else None,
+        )
+        source = MicrophoneSource(block_size=VAD_BLOCK_SIZE if vad else BLOCK_SIZE)
+
+        loop.start()
+        if config["mode"] is not None:
+            loop.set_mode(config["mode"])
+        if not config["capturing"]:
+            source.pause()
+        results.send(("ready", service.load_seconds))
+
+        with source:
+            while True:
+                while control.poll():
+                    command, arg = control.recv()
+                    if command == "stop":
+                        return
+                    if command == "pause":
+                        source.pause()
+                        if vad:
+                            results.send(("vad", vad.summary()))
+                        results.send(("capture", source.summary()))
+                    elif command == "resume":
+                        loop.request_reset()
+                        source.resume()
+                    elif command == "mode":
+                        loop.set_mode(arg)
+
+                data = source.read(timeout=0.05)
+                if data is None:
+                    continue
+
+                for event in loop.feed(data):
+                    if event.kind == COMMIT:
+                        results.send(("token", event.text))
+                    elif event.kind == NBEST:
+                        results.send(("nbest", event.alternatives))
+                    elif event.kind == HYPOTHESIS:
+                        results.send(("hypothesis", event.text))
+                    else:
+                        results.send(("retract", event.text))
+                for utterance in loop.take_utterances():
+                    results.send(("utterance", utterance))
+
+    except (EOFError, BrokenPipeError):
+        return  # el padre ha desaparecido
+    except Exception as e:
+        try:
+            results.send(("error", f"{type(e).__name__}: {e}"))
+        except (EOFError, BrokenPipeError, OSError):
+            pass
+        raise
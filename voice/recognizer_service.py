@@ -0,0 +1,138 @@
+# voice/recognizer_service.py
+import json
+import threading
+import time
+
+from cffi import FFI
+from vosk import Model, KaldiRecognizer
+
+MODEL_PATH = "models/vosk-es"
+SAMPLE_RATE = 16000
+
+_ffi = FFI()
+
+
+def as_waveform(data):
+    """
+    AcceptWaveform (cffi, char *) solo acepta bytes o cdata: los memoryview
+    del buffer circular se envuelven con from_buffer, sin copiar.
+    """
+    if isinstance(data, bytes):
+        return data
+    return _ffi.from_buffer(data)
+
+
+class RecognizerService:
+    """
+    Mantiene el modelo Vosk cargado durante toda la vida del proceso.
+
+    - El modelo se carga una sola vez en segundo plano (preload)
+    - Los KaldiRecognizer se cachean por gramática y se reutilizan
+      con Reset() en lugar de reconstruirlos
+    """
+
+    def __init__(self, model_path: str = MODEL_PATH, sample_rate: int = SAMPLE_RATE):
+        self.model_path = model_path
+        self.sample_rate = sample_rate
+
+        self._model = None
+        self._error = None
+        self._loaded = threading.Event()
+        self._loader = None
+        self._lock = threading.Lock()
+
+        # (gramática json, n alternativas) -> KaldiRecognizer
+        self._recognizers: dict[tuple[str, int], KaldiRecognizer] = {}
+
+        self.load_seconds = None
+
+    # --------------------------------------------------
+    # Carga del modelo
+    # --------------------------------------------------
+
+    def preload(self):
+        """Lanza la carga del modelo en un hilo de fondo (idempotente)."""
+        with self._lock:
+            if self._loader is None:
+                self._loader = threading.Thread(
+                    target=self._load_model,
+                    name="vosk-model-loader",
+                    daemon=True,
+                )
+                self._loader.start()
+
+    def _load_model(self):
+        start = time.perf_counter()
+        try:
+            self._model = Model(self.model_path)
+        except Exception as e:
+            self._error = e
+        self.load_seconds = time.perf_counter() - start
+        self._loaded.set()
+
+    def is_ready(self) -> bool:
+        return self._loaded.is_set() and self._error is None
+
+    def model(self, timeout: float | None = None) -> Model:
+        """Devuelve el modelo, esperando a que termine la carga si hace falta."""
+        self.preload()
+        if not self._loaded.wait(timeout):
+            raise TimeoutError(f"Modelo Vosk no cargado tras {timeout}s")
+        if self._error is not None:
+            raise RuntimeError(
+                f"No se pudo cargar el modelo {self.model_path}: {self._error}"
+            )
+        return self._model
+
+    # --------------------------------------------------
+    # Recognizers
+    # --------------------------------------------------
+
+    def recognizer(self, grammar: list[str] | None = None, alternatives: int = 0) -> KaldiRecognizer:
+        """
+        Devuelve un recognizer para la gramática dada, ya reseteado.
+        grammar=None -> modelo completo, sin restricciones.
+        alternatives>0 -> el resultado final trae N-best ("alternatives")
+        """
+        key = json.dumps(grammar) if grammar is not None else ""
+        model = self.model()
+
+        with self._lock:
+            recognizer = self._recognizers.get((key, alternatives))
+            if recognizer is None:
+                if grammar is None:
+                    recognizer = KaldiRecognizer(model, self.sample_rate)
+                else:
+                    recognizer = KaldiRecognizer(model, self.sample_rate, key)
+                # Tiempos y confianza por palabra (TokenCommitter)
+                recognizer.SetWords(True)
+                recognizer.SetPartialWords(True)
+                if alternatives:
+                    recognizer.SetMaxAlternatives(alternatives)
+                self._recognizers[(key, alternatives)] = recognizer
+            else:
+                recognizer.Reset()
+
+        return recognizer
+
+    def prepare(self, grammars, alternatives: int = 0):
+        """Precompila un recognizer por gramática (p.ej. una por modo)."""
+        for grammar in grammars:
+            self.recognizer(grammar, alternatives)
+
+
+# --------------------------------------------------
+# Instancias compartidas (una por ruta de modelo)
+# --------------------------------------------------
+
+_services: dict[str, RecognizerService] = {}
+_services_lock = threading.Lock()
+
+
+def get_recognizer_service(model_path: str = MODEL_PATH) -> RecognizerService:
+    with _services_lock:
+        service = _services.get(model_path)
+        if service is None:
+            service = RecognizerService(model_path)
+            _services[model_path] = service
+        return service
@@ -0,0 +1,107 @@
+# voice/rescorer.py
+"""
+Segunda pasada: re-decodifica las frases grabadas con el modelo completo
+(sin gramática, como voice_test.py) en un proceso de baja prioridad y
+marca las filas donde las dos pasadas no coinciden.
+"""
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+from voice.audio_source import FileAudioSource
+from voice.recognizer_service import MODEL_PATH, get_recognizer_service
+from voice.session_recorder import Utterance
+
+RESCORE_NICE = 10
+
+_service = None  # RecognizerService del proceso trabajador
+
+
+@dataclass
+class RescoreResult:
+    utterance: Utterance
+    rows: list       # filas (ProformaRow) que tocó la frase en la pasada en vivo
+    text: str        # texto de la pasada completa
+
+    @property
+    def disagrees(self) -> bool:
+        return comparable_words(self.utterance.text) != comparable_words(self.text)
+
+
+def comparable_words(text: str) -> list[str]:
+    """Palabras en mayúsculas, sin [unk] (la gramática lo usa como comodín)."""
+    return [word for word in text.upper().split() if word != "[UNK]"]
+
+
+# --------------------------------------------------
+# Proceso trabajador
+# --------------------------------------------------
+
+def _init_worker(model_path: str, niceness: int):
+    global _service
+    try:
+        os.nice(niceness)  # ceder CPU a la pasada en vivo
+    except (AttributeError, OSError):
+        pass  # Windows / sin permisos: prioridad normal
+    _service = get_recognizer_service(model_path)
+    _service.model()
+
+
+def decode_file(path: str) -> str:
+    """Texto completo de un fichero con el modelo sin restricciones."""
+    recognizer = _service.recognizer(None)
+    words = []
+    with FileAudioSource(path) as source:
+        while True:
+            data = source.read()
+            if data is None:
+                break
+            if recognizer.AcceptWaveform(data):
+                words.append(json.loads(recognizer.Result()).get("text", ""))
+    words.append(json.loads(recognizer.FinalResult()).get("text", ""))
+    return " ".join(text for text in words if text)
+
+
+# --------------------------------------------------
+# Lado de la aplicación
+# --------------------------------------------------
+
+class Rescorer:
+    """
+    Cola de re-decodificación en procesos aparte (spawn, nice RESCORE_NICE).
+
+    on_result(RescoreResult) y on_error(mensaje) se llaman desde un hilo
+    interno del executor: en la UI conviene reemitirlos con una Signal.
+    """
+
+    def __init__(self, model_path: str = MODEL_PATH, workers: int = 1, on_result=None, on_error=None):
+        self.on_result = on_result
+        self.on_error = on_error
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(model_path, RESCORE_NICE),
+        )
+
+    def submit(self, utterance: Utterance, rows: list):
+        future = self._executor.submit(decode_file, utterance.path)
+
+        def done(f):
+            if f.cancelled():
+                return
+            error = f.exception()
+            if error is not None:
+                if self.on_error:
+                    self.on_error(f"Error en la segunda pasada ({utterance.path}): {error}")
+                return
+            if self.on_result:
+                self.on_result(RescoreResult(utterance, rows, f.result()))
+
+        future.add_done_callback(done)
+        return future
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,144 @@
+# voice/ring_buffer.py
+import threading
+from collections import deque
+
+from core.env import getenv
+
+DROP_OLDEST = "drop_oldest"
+BLOCK = "block"
+
+
+class AudioRingBuffer:
+    """
+    Buffer circular preasignado para la captura de audio.
+
+    - Productor (callback de PortAudio): write() copia el bloque dentro de
+      un bytearray reservado al crear el buffer, sin crear objetos bytes
+    - Consumidor: read() devuelve un memoryview sobre el hueco, sin copia.
+      El memoryview es válido hasta la siguiente llamada a read(): ese hueco
+      queda reservado para el lector y el productor nunca lo sobrescribe
+    - Desbordamiento explícito:
+        drop_oldest -> se descarta el bloque más antiguo sin leer
+        block       -> el productor espera hasta block_timeout; si sigue
+                       lleno se descarta el bloque nuevo
+      En ambos casos se cuenta un overrun.
+
+    Los huecos no van en orden fijo: _pending guarda los índices por leer
+    (del más antiguo al más nuevo), _free los libres y _reader el que tiene
+    el consumidor. Al descartar el más antiguo se reutiliza su hueco, nunca
+    el del lector.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        block_bytes: int,
+        overflow: str = DROP_OLDEST,
+        block_timeout: float = 0.05,
+    ):
+        if capacity < 2:
+            raise ValueError("capacity debe ser >= 2 (un hueco es del lector)")
+        if overflow not in (DROP_OLDEST, BLOCK):
+            raise ValueError(f"Política de desbordamiento desconocida: {overflow}")
+
+        self.capacity = capacity
+        self.block_bytes = block_bytes
+        self.overflow = overflow
+        self.block_timeout = block_timeout
+
+        self._buffer = bytearray(capacity * block_bytes)
+        self._view = memoryview(self._buffer)
+        self._lengths = [0] * capacity
+        self._free = deque(range(capacity))  # huecos libres
+        self._pending: deque[int] = deque()  # huecos por leer, del más antiguo al más nuevo
+        self._reader: int | None = None      # hueco del último read()
+        self._cond = threading.Condition()
+
+        # Contadores
+        self.writes = 0
+        self.overruns = 0
+        self.max_depth = 0
+
+    # --------------------------------------------------
+    # Productor
+    # --------------------------------------------------
+
+    def write(self, data) -> bool:
+        """Devuelve False si el bloque se descartó por desbordamiento."""
+        size = len(data)
+        with self._cond:
+            if self._free:
+                slot = self._free.popleft()
+            elif self.overflow == BLOCK:
+                self._cond.wait_for(lambda: self._free, self.block_timeout)
+                if not self._free:
+                    self.overruns += 1
+                    return False
+                slot = self._free.popleft()
+            else:
+                # Sin huecos libres -> reutilizar el pendiente más antiguo
+                slot = self._pending.popleft()
+                self.overruns += 1
+
+            start = slot * self.block_bytes
+            if size == self.block_bytes:
+                self._buffer[start:start + size] = data
+            else:
+                size = min(size, self.block_bytes)
+                self._buffer[start:start + size] = memoryview(data)[:size]
+            self._lengths[slot] = size
+
+            self._pending.append(slot)
+            self.writes += 1
+            if len(self._pending) > self.max_depth:
+                self.max_depth = len(self._pending)
+            self._cond.notify()
+            return True
+
+    # --------------------------------------------------
+    # Consumidor
+    # --------------------------------------------------
+
+    def read(self, timeout: float | None = None) -> memoryview | None:
+        with self._cond:
+            # El bloque anterior ya no está en uso -> su hueco vuelve a estar libre
+            if self._reader is not None:
+                self._free.append(self._reader)
+                self._reader = None
+                self._cond.notify()  # productor en modo block
+
+            if not self._pending:
+                self._cond.wait_for(lambda: self._pending, timeout)
+                if not self._pending:
+                    return None
+
+            slot = self._reader = self._pending.popleft()
+
+        start = slot * self.block_bytes
+        return self._view[start:start + self._lengths[slot]]
+
+    def clear(self):
+        # El hueco del lector no se libera: puede seguir en uso
+        with self._cond:
+            self._free.extend(self._pending)
+            self._pending.clear()
+            self._cond.notify_all()
+
+    @property
+    def depth(self) -> int:
+        return len(self._pending)
+
+    def summary(self) -> str:
+        return (
+            f"Buffer audio: {self.depth}/{self.capacity} "
+            f"(máx {self.max_depth}), {self.overruns} overruns"
+        )
+
+
+def ring_buffer_from_env(block_bytes: int) -> AudioRingBuffer:
+    """AUDIO_BUFFER_BLOCKS (64 por defecto) y AUDIO_OVERFLOW (drop_oldest | block)."""
+    return AudioRingBuffer(
+        capacity=int(getenv("AUDIO_BUFFER_BLOCKS", "64")),
+        block_bytes=block_bytes,
+        overflow=getenv("AUDIO_OVERFLOW", DROP_OLDEST).strip().lower(),
+    )
@@ -0,0 +1,93 @@
+# voice/session_recorder.py
+import json
+import os
+import time
+import wave
+from dataclasses import asdict, dataclass
+
+from core.env import getenv
+from voice.audio_source import SAMPLE_WIDTH
+from voice.recognizer_service import SAMPLE_RATE
+from voice.token_commit import COMMIT, NBEST, RETRACT
+
+
+def session_recording_enabled() -> bool:
+    """SESSION_RECORDING=1 -> grabar cada frase y re-decodificarla en segundo plano."""
+    return getenv("SESSION_RECORDING", "0").strip().lower() in ("1", "true", "si", "sí")
+
+
+def sessions_dir() -> str:
+    return getenv("SESSION_AUDIO_DIR", ".cache/sessions")
+
+
+@dataclass
+class Utterance:
+    id: int
+    path: str
+    text: str       # tokens confirmados por la pasada en vivo
+    seconds: float  # solo voz (el VAD ya quitó el silencio)
+
+
+class SessionRecorder:
+    """
+    Guarda el audio que llega al recognizer, una frase por fichero.
+
+    Solo se graban los bloques que pasan el VAD, así que cada .wav
+    (16 kHz int16 mono) contiene voz y poco más. Junto a los audios
+    se escribe session.jsonl con el texto de la pasada en vivo.
+
+    close_utterance() escribe el fichero en el propio hilo de
+    decodificación: ocurre en un fin de frase (pausa del hablante)
+    y son unos pocos KB.
+    """
+
+    def __init__(self, directory: str | None = None, sample_rate: int = SAMPLE_RATE):
+        self.directory = os.path.join(directory or sessions_dir(), time.strftime("%Y%m%d-%H%M%S"))
+        self.sample_rate = sample_rate
+        self.manifest_path = os.path.join(self.directory, "session.jsonl")
+
+        self._audio = bytearray()
+        self._words: list[str] = []
+        self._next_id = 1
+
+    def add_audio(self, block):
+        # Copia: los bloques pueden ser memoryviews del buffer circular
+        self._audio += block
+
+    def track(self, events):
+        """Sigue los COMMIT/RETRACT para conocer el texto en vivo de la frase."""
+        for event in events:
+            if event.kind == COMMIT:
+                self._words.append(event.text)
+            elif event.kind == NBEST:
+                self._words.extend(event.text.split())  # la más probable
+            elif event.kind == RETRACT and self._words and self._words[-1] == event.text:
+                self._words.pop()
+
+    def close_utterance(self) -> Utterance | None:
+        """Cierra la frase actual; None si no había audio."""
+        if not self._audio:
+            self._words = []
+            return None
+
+        os.makedirs(self.directory, exist_ok=True)
+        utterance = Utterance(
+            id=self._next_id,
+            path=os.path.join(self.directory, f"{self._next_id:05d}.wav"),
+            text=" ".join(self._words),
+            seconds=len(self._audio) / (SAMPLE_WIDTH * self.sample_rate),
+        )
+        self._next_id += 1
+
+        with wave.open(utterance.path, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(SAMPLE_WIDTH)
+            wav.setframerate(self.sample_rate)
+            wav.writeframes(self._audio)
+
+        with open(self.manifest_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(asdict(utterance), ensure_ascii=False) + "\n")
+
+        self._audio = bytearray()
+        self._words = []
+        return utterance
@@ -0,0 +1,208 @@
+# voice/token_commit.py
+from dataclasses import dataclass, field
+
+from core.env import getenv
+
+COMMIT = "commit"
+RETRACT = "retract"
+NBEST = "nbest"  # frase retenida: el consumidor elige entre las alternativas
+HYPOTHESIS = "hypothesis"  # palabras aún sin confirmar (para especular)
+
+
+@dataclass
+class Word:
+    text: str
+    start: float | None = None  # segundos desde el último Reset()
+    end: float | None = None
+    conf: float = 1.0
+
+
+@dataclass
+class Alternative:
+    text: str
+    confidence: float = 0.0
+
+
+@dataclass
+class TokenEvent:
+    kind: str  # COMMIT | RETRACT | NBEST | HYPOTHESIS
+    word: Word
+    latency: float | None = None  # cursor de audio - fin de la palabra al confirmar
+    alternatives: list[Alternative] = field(default_factory=list)  # solo NBEST
+
+    @property
+    def text(self) -> str:
+        return self.word.text
+
+
+def words_from_result(result: dict, key: str) -> list[Word]:
+    """
+    Palabras con tiempos de un resultado Vosk.
+
+    key="partial" -> usa "partial_result" (SetPartialWords)
+    key="text"    -> usa "result" (SetWords)
+    Sin tiempos (Vosk antiguo) se cae al texto plano.
+    Con SetMaxAlternatives el resultado final trae "alternatives": se usa la primera.
+    """
+    if key != "partial" and result.get("alternatives"):
+        result = result["alternatives"][0]
+    detail = result.get("partial_result" if key == "partial" else "result")
+    if detail:
+        return [
+            Word(
+                item["word"].upper(),
+                item.get("start"),
+                item.get("end"),
+                item.get("conf", 1.0),
+            )
+            for item in detail
+        ]
+    return [Word(text) for text in result.get(key, "").upper().split()]
+
+
+def alternatives_from_result(result: dict) -> list[Alternative]:
+    """N-best de un resultado final, sin duplicados ni vacías, en orden de Vosk."""
+    alternatives = []
+    seen = set()
+    for item in result.get("alternatives", []):
+        text = item.get("text", "").upper()
+        if text and text not in seen:
+            seen.add(text)
+            alternatives.append(Alternative(text, item.get("confidence", 0.0)))
+    return alternatives
+
+
+class TokenCommitter:
+    """
+    Confirma tokens cuando dejan de cambiar en los resultados parciales.
+
+    Una palabra se confirma (en orden) cuando:
+    - aparece igual en stable_partials parciales seguidos, o
+    - su final queda al menos commit_lag segundos por detrás del cursor de audio
+
+    Si un parcial posterior contradice una palabra ya confirmada, se emite
+    RETRACT para ella (y las siguientes) antes de seguir. El resultado final
+    de cada frase es definitivo: confirma todo lo pendiente y retracta lo
+    confirmado que no aparezca en él.
+    """
+
+    def __init__(self, stable_partials: int | None = None, commit_lag: float | None = None):
+        self.stable_partials = (
+            stable_partials if stable_partials is not None
+            else int(getenv("TOKEN_STABLE_PARTIALS", "2"))
+        )
+        self.commit_lag = (
+            commit_lag if commit_lag is not None
+            else int(getenv("TOKEN_COMMIT_LAG_MS", "300")) / 1000
+        )
+
+        self.committed: list[Word] = []  # frase actual, ya emitidas
+        self._pending: list[Word] = []   # hipótesis tras lo confirmado
+        self._counts: list[int] = []     # parciales seguidos sin cambio
+
+        # Estadísticas
+        self.commits = 0
+        self.retractions = 0
+        self._latency_total = 0.0
+        self._latency_count = 0
+        self.max_latency = 0.0
+
+    def reset(self):
+        """Nueva frase desde cero (Reset del recognizer o cambio de gramática)."""
+        self.committed = []
+        self._pending = []
+        self._counts = []
+
+    @property
+    def pending(self) -> list[Word]:
+        """Hipótesis tras lo confirmado, aún sin estabilizar."""
+        return self._pending
+
+    # --------------------------------------------------
+
+    def update(self, words: list[Word], cursor: float) -> list[TokenEvent]:
+        """Nuevo resultado parcial; cursor = segundos de audio decodificados."""
+        events = self._reconcile(words, final=False)
+        tail = words[len(self.committed):]
+
+        counts = []
+        for i, word in enumerate(tail):
+            # Solo cuenta como estable si todo lo anterior tampoco cambió
+            if (
+                len(counts) == i
+                and i < len(self._pending)
+                and self._pending[i].text == word.text
+            ):
+                counts.append(self._counts[i] + 1)
+            else:
+                break
+        counts += [1] * (len(tail) - len(counts))
+
+        committed = 0
+        for word, count in zip(tail, counts):
+            lagging = word.end is not None and cursor - word.end >= self.commit_lag
+            if count < self.stable_partials and not lagging:
+                break
+            events.append(self._commit(word, cursor))
+            committed += 1
+
+        self._pending = tail[committed:]
+        self._counts = counts[committed:]
+        return events
+
+    def finalize(self, words: list[Word], cursor: float) -> list[TokenEvent]:
+        """Resultado final de la frase: confirma todo y empieza frase nueva."""
+        events = self._reconcile(words, final=True)
+        for word in words[len(self.committed):]:
+            events.append(self._commit(word, cursor))
+        self.reset()
+        return events
+
+    # --------------------------------------------------
+
+    def _reconcile(self, words: list[Word], final: bool) -> list[TokenEvent]:
+        """RETRACT de lo confirmado que la nueva hipótesis contradice."""
+        keep = 0
+        for committed, word in zip(self.committed, words):
+            if committed.text != word.text:
+                break
+            keep += 1
+
+        # Un parcial más corto no contradice nada: puede ser transitorio
+        if keep == len(self.committed) or (not final and keep == len(words)):
+            return []
+
+        retracted = self.committed[keep:]
+        self.committed = self.committed[:keep]
+        self._pending = []
+        self._counts = []
+        self.retractions += len(retracted)
+        return [TokenEvent(RETRACT, word) for word in reversed(retracted)]
+
+    def _commit(self, word: Word, cursor: float) -> TokenEvent:
+        self.committed.append(word)
+        self.commits += 1
+        latency = None
+        if word.end is not None:
+            latency = max(0.0, cursor - word.end)
+            self._latency_total += latency
+            self._latency_count += 1
+            self.max_latency = max(self.max_latency, latency)
+        return TokenEvent(COMMIT, word, latency)
+
+    # --------------------------------------------------
+
+    @property
+    def mean_latency(self) -> float | None:
+        if not self._latency_count:
+            return None
+        return self._latency_total / self._latency_count
+
+    def summary(self) -> str:
+        text = f"Tokens: {self.commits} confirmados, {self.retractions} retractados"
+        if self.mean_latency is not None:
+            text += (
+                f", latencia media {self.mean_latency * 1000:.0f} ms "
+                f"(máx {self.max_latency * 1000:.0f} ms)"
+            )
+        return text
@@ -0,0 +1,130 @@
+# voice/vad.py
+import numpy as np
+
+from core.env import getenv
+from voice.recognizer_service import SAMPLE_RATE
+
+# Con el VAD filtrando el silencio podemos usar bloques pequeños:
+# 100 ms en lugar de 500 ms -> menos latencia al final de cada palabra
+VAD_BLOCK_SIZE = 1600
+
+
+class EnergyVAD:
+    """
+    Detector de voz por energía (RMS) + tasa de cruces por cero, con histéresis.
+
+    - Entra en voz cuando una trama supera start_rms y su ZCR no pasa de max_zcr
+      (descarta siseos / ruido blanco de bajo nivel)
+    - Sale de voz cuando la energía queda bajo stop_rms durante hangover_ms
+    - Al entrar en voz reenvía el bloque anterior (pre-roll) para no cortar
+      el inicio de la palabra
+
+    process(bloque) devuelve la lista de bloques a pasar al recognizer
+    (vacía si el bloque es silencio y se puede saltar).
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = SAMPLE_RATE,
+        start_rms: float | None = None,
+        stop_rms: float | None = None,
+        max_zcr: float | None = None,
+        hangover_ms: int | None = None,
+        frame_ms: int = 20,
+    ):
+        self.sample_rate = sample_rate
+        self.start_rms = start_rms if start_rms is not None else float(getenv("VAD_START_RMS", "500"))
+        self.stop_rms = stop_rms if stop_rms is not None else float(getenv("VAD_STOP_RMS", "300"))
+        self.max_zcr = max_zcr if max_zcr is not None else float(getenv("VAD_MAX_ZCR", "0.35"))
+        self.hangover_ms = hangover_ms if hangover_ms is not None else int(getenv("VAD_HANGOVER_MS", "400"))
+        self.frame_size = max(1, sample_rate * frame_ms // 1000)
+        self.frame_ms = frame_ms
+
+        self.in_speech = False
+        self._silence_ms = 0
+        # Copia del último bloque de silencio (los bloques de entrada pueden
+        # ser memoryviews de un buffer circular que se reutiliza)
+        self._preroll_buffer = bytearray()
+        self._preroll_size = 0
+
+        # Estadísticas
+        self.blocks_total = 0
+        self.blocks_skipped = 0
+
+    # --------------------------------------------------
+
+    def reset(self):
+        """Estado limpio (tras pause/resume); conserva las estadísticas."""
+        self.in_speech = False
+        self._silence_ms = 0
+        self._preroll_size = 0
+
+    def frame_features(self, data: bytes) -> tuple[np.ndarray, np.ndarray]:
+        """RMS y ZCR por trama, calculados de una vez para todo el bloque."""
+        samples = np.frombuffer(data, dtype=np.int16).astype(np.float32)
+        n_frames = len(samples) // self.frame_size
+        if n_frames == 0:
+            frames = samples.reshape(1, -1)
+        else:
+            frames = samples[: n_frames * self.frame_size].reshape(n_frames, self.frame_size)
+
+        rms = np.sqrt(np.mean(frames * frames, axis=1))
+        signs = np.signbit(frames).astype(np.int8)
+        zcr = np.mean(np.abs(np.diff(signs, axis=1)), axis=1) if frames.shape[1] > 1 else np.zeros(len(frames))
+        return rms, zcr
+
+    def process(self, data) -> list:
+        self.blocks_total += 1
+        if not data:
+            self.blocks_skipped += 1
+            return []
+
+        rms, zcr = self.frame_features(data)
+        voiced = (rms >= self.start_rms) & (zcr <= self.max_zcr)
+        loud = rms >= self.stop_rms
+
+        was_speech = self.in_speech
+        for is_voiced, is_loud in zip(voiced, loud):
+            if not self.in_speech:
+                if is_voiced:
+                    self.in_speech = True
+                    self._silence_ms = 0
+            elif is_loud:
+                self._silence_ms = 0
+            else:
+                self._silence_ms += self.frame_ms
+                if self._silence_ms >= self.hangover_ms:
+                    self.in_speech = False
+
+        # Bloque con algo de voz (o cola de hangover) -> decodificar
+        if self.in_speech or was_speech:
+            blocks = [data]
+            if not was_speech and self._preroll_size:
+                blocks.insert(0, memoryview(self._preroll_buffer)[:self._preroll_size])
+            self._preroll_size = 0
+            return blocks
+
+        self._store_preroll(data)
+        self.blocks_skipped += 1
+        return []
+
+    def _store_preroll(self, data):
+        size = len(data)
+        if len(self._preroll_buffer) < size:
+            self._preroll_buffer = bytearray(size)  # solo crece la primera vez
+        self._preroll_buffer[:size] = data
+        self._preroll_size = size
+
+    # --------------------------------------------------
+
+    @property
+    def skipped_ratio(self) -> float:
+        if not self.blocks_total:
+            return 0.0
+        return self.blocks_skipped / self.blocks_total
+
+    def summary(self) -> str:
+        return (
+            f"VAD: {self.blocks_skipped}/{self.blocks_total} bloques omitidos "
+            f"({self.skipped_ratio:.0%})"
+        )
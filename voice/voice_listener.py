@@ -1,10 +1,14 @@
 # voice/voice_listener.py
-import json
-import queue
-import sounddevice as sd
-from vosk import Model, KaldiRecognizer
 from PySide6.QtCore import QThread, Signal
 
+from core.env import getenv
+from voice.audio_source import MicrophoneSource
+from voice.recognition_loop import RecognitionLoop
+from voice.recognizer_service import MODEL_PATH, get_recognizer_service
+from voice.session_recorder import SessionRecorder, session_recording_enabled
+from voice.token_commit import COMMIT, HYPOTHESIS, NBEST
+from voice.vad import VAD_BLOCK_SIZE, EnergyVAD
+
 GRAMMAR = [
     "fila", "borrar", "cantidad", "precio",
     "uno", "dos", "tres", "cuatro", "cinco",
@@ -14,48 +18,134 @@ GRAMMAR = [
 ] #se usa el de grammar_builder.py, este solo es fallback
 
 
+def voice_backend() -> str:
+    """VOICE_BACKEND=thread (por defecto) | process"""
+    return getenv("VOICE_BACKEND", "thread").strip().lower()
+
+
+def create_voice_listener(**kwargs):
+    """VoiceListener o ProcessVoiceListener según VOICE_BACKEND."""
+    if voice_backend() == "process":
+        from voice.process_listener import ProcessVoiceListener
+        return ProcessVoiceListener(**kwargs)
+    return VoiceListener(**kwargs)
+
+
 class VoiceListener(QThread):
+    """
+    Hilo de captura + reconocimiento de larga duración.
+
+    El modelo vive en RecognizerService; el botón del micro solo
+    llama a pause()/resume(), que paran la captura y resetean el
+    recognizer existente en vez de reconstruirlo.
+
+    source: cualquier AudioSource (micrófono por defecto, o
+    FileAudioSource para reproducir grabaciones).
+
+    use_vad: salta los bloques de silencio antes de AcceptWaveform y
+    permite capturar en bloques pequeños (VAD_BLOCK_SIZE).
+
+    mode_grammars: {CommandMode: gramática}. Si se da, set_mode() cambia
+    a la gramática precompilada del modo actual de CommandState.
+
+    record: graba cada frase para la segunda pasada (utterance_closed).
+    None -> según SESSION_RECORDING.
+    """
     result_ready = Signal(str)
+    token_retracted = Signal(str)  # token ya emitido que Vosk ha corregido
+    utterance_closed = Signal(object)  # Utterance grabada
+    alternatives_ready = Signal(object)  # list[Alternative] (modo PRODUCT)
+    hypothesis_ready = Signal(str)  # palabras sin confirmar ("" = ninguna)
+    voice_error = Signal(str, bool)  # mensaje, True si el reconocimiento se ha detenido
 
-    def __init__(self, grammar=None, model_path="models/vosk-es"):
+    def __init__(
+        self,
+        grammar=None,
+        model_path=MODEL_PATH,
+        source=None,
+        use_vad=True,
+        mode_grammars=None,
+        record=None,
+    ):
         super().__init__()
         self.running = False
-        self.grammar = grammar or GRAMMAR
-        self.model_path = model_path
-        self.last_tokens = []  # lista de tokens ya emitidos
+        self.service = get_recognizer_service(model_path)
+        self.vad = EnergyVAD() if use_vad else None
+        if source is None:
+            source = MicrophoneSource(block_size=VAD_BLOCK_SIZE) if use_vad else MicrophoneSource()
+        self.source = source
+        if record is None:
+            record = session_recording_enabled()
+        self.loop = RecognitionLoop(
+            self.service,
+            grammar or GRAMMAR,
+            mode_grammars=mode_grammars,
+            vad=self.vad,
+            recorder=SessionRecorder() if record else None,
+        )
 
     def run(self):
         self.running = True
-        q = queue.Queue()
+        try:
+            self.loop.start()
+
+            with self.source:
+                while self.running:
+                    data = self.source.read(timeout=0.1)
+                    if data is None:
+                        if self.source.finished:
+                            self._emit(self.loop.finish())
+                            break
+                        continue
+
+                    self._emit(self.loop.feed(data))
+        except Exception as e:
+            # Modelo o micrófono no disponibles: avisar a la UI en vez de morir en silencio
+            self.voice_error.emit(f"{type(e).__name__}: {e}", True)
+
+        self.running = False
+
+    def _emit(self, events):
+        for event in events:
+            if event.kind == COMMIT:
+                self.result_ready.emit(event.text)
+            elif event.kind == NBEST:
+                self.alternatives_ready.emit(event.alternatives)
+            elif event.kind == HYPOTHESIS:
+                self.hypothesis_ready.emit(event.text)
+            else:
+                self.token_retracted.emit(event.text)
+        for utterance in self.loop.take_utterances():
+            self.utterance_closed.emit(utterance)
 
-        def callback(indata, frames, time, status):
-            q.put(bytes(indata))
+    # --------------------------------------------------
+    # Control de captura
+    # --------------------------------------------------
 
-        model = Model(self.model_path)
-        recognizer = KaldiRecognizer(model, 16000, json.dumps(self.grammar))
+    def set_mode(self, mode):
+        """Llamar cuando CommandState cambia de modo."""
+        self.loop.set_mode(mode)
 
-        with sd.RawInputStream(
-            samplerate=16000,
-            blocksize=8000,
-            dtype="int16",
-            channels=1,
-            callback=callback
-        ):
-            while self.running:
-                data = q.get()
-                recognizer.AcceptWaveform(data)
+    def resume(self):
+        """Reanuda la captura; arranca el hilo la primera vez."""
+        self.loop.request_reset()
+        self.source.resume()
+        if not self.isRunning():
+            self.start()
 
-                partial = json.loads(recognizer.PartialResult())
-                current_tokens = partial.get("partial", "").upper().split()
+    def pause(self):
+        """Deja de capturar audio sin soltar modelo ni recognizer."""
+        self.source.pause()
 
-                # obtenemos solo los tokens nuevos
-                new_tokens = current_tokens[len(self.last_tokens):]
+    def vad_summary(self) -> str | None:
+        return self.vad.summary() if self.vad else None
 
-                if new_tokens:
-                    self.last_tokens = current_tokens
-                    for token in new_tokens:
-                        self.result_ready.emit(token)
+    def capture_summary(self) -> str | None:
+        """Profundidad y overruns del buffer de captura (solo micrófono)."""
+        summary = getattr(self.source, "summary", None)
+        return summary() if summary else None
 
     def stop(self):
+        self.source.pause()
         self.running = False
         self.wait()
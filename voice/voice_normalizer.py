@@ -1,39 +1,159 @@
-# commands/normalizer.py
+# voice/voice_normalizer.py
+import json
+import os
+import re
+import unicodedata
+from functools import lru_cache
 
-def normalize_command(text: str) -> str:
-    text = text.upper()
+from core.text import edit_distance
 
-    # --------------------------------------------------
-    # Correcciones directas de frases completas
-    # --------------------------------------------------
-    phrase_aliases = {
-        "SI LA": "FILA",
-        "SILA": "FILA",
-    }
+ALIASES_PATH = os.path.join(os.path.dirname(__file__), "aliases.json")
+
+# Reglas fonéticas del español, se prueban en orden en cada posición
+PHONETIC_RULES = [
+    ("GUE", "GE"), ("GUI", "GI"),
+    ("QU", "K"), ("CH", "X"), ("LL", "Y"),
+    ("CE", "SE"), ("CI", "SI"),
+    ("GE", "JE"), ("GI", "JI"),
+    ("C", "K"), ("Z", "S"), ("V", "B"), ("W", "B"),
+    ("X", "KS"), ("Ñ", "NY"), ("H", ""),
+]
+
+
+def phonetic_key(word: str) -> str:
+    """
+    Clave fonética aproximada: palabras que suenan igual en español
+    comparten clave. 'EPOXI' -> 'EPOKSI', 'VACIA' -> 'BASIA'
+    """
+    word = word.upper().replace("Ñ", "\0")
+    word = unicodedata.normalize("NFD", word)
+    word = "".join(c for c in word if unicodedata.category(c) != "Mn")
+    word = re.sub(r"[^A-Z\0]", "", word.replace("\0", "Ñ"))
+
+    key = []
+    i = 0
+    while i < len(word):
+        for pattern, replacement in PHONETIC_RULES:
+            if word.startswith(pattern, i):
+                key.append(replacement)
+                i += len(pattern)
+                break
+        else:
+            key.append(word[i])
+            i += 1
+
+    # Letras dobles -> una
+    return re.sub(r"(.)\1+", r"\1", "".join(key))
+
+
+def load_aliases(path: str = ALIASES_PATH) -> tuple[dict, dict]:
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return data.get("phrases", {}), data.get("words", {})
+
+
+class VoiceNormalizer:
+    """
+    Normalizador compilado de lo que devuelve el reconocedor.
+
+    - Alias (frases y palabras) cargados de aliases.json y compilados en una
+      única regex: una sola pasada sobre el texto
+    - vocabulary: palabras válidas (gramática + materiales). Un token que no
+      está en el vocabulario se ajusta a la palabra con la misma clave
+      fonética, o a la más cercana por distancia de edición
+    - commands: palabras de comando (y destinos de alias). La tolerancia
+      hacia ellas escala con su longitud y sin mínimo: SI, NO o UNO solo
+      con la clave exacta, para que una palabra corta desconocida no se
+      convierta en un comando por estar a una letra
+    - Resultados por token memoizados con LRU
+    """
+
+    def __init__(self, vocabulary=None, aliases_path: str = ALIASES_PATH, commands=()):
+        phrases, words = load_aliases(aliases_path)
+        self.aliases = {k.upper(): v.upper() for k, v in {**words, **phrases}.items()}
+
+        # Claves más largas primero: "SI LA" gana a "SI"
+        keys = sorted(self.aliases, key=len, reverse=True)
+        self._pattern = re.compile(
+            r"(?<!\S)(?:" + "|".join(re.escape(k) for k in keys) + r")(?!\S)"
+        ) if keys else None
+
+        self.vocabulary: set[str] = set()
+        self._by_key: dict[str, str] = {}
+        self._keys_by_length: dict[int, list[str]] = {}
+        self._command_keys: set[str] = set()
+        self._snap = lru_cache(maxsize=4096)(self._snap_uncached)
 
-    for wrong, correct in phrase_aliases.items():
-        text = text.replace(wrong, correct)
+        if vocabulary is not None:
+            self.set_vocabulary(vocabulary, commands)
 
     # --------------------------------------------------
-    # Normalización de palabras sueltas (dominio)
+
+    def set_vocabulary(self, words, commands=()):
+        """
+        Palabras válidas; las primeras ganan si comparten clave fonética.
+        commands: palabras de comando (tolerancia según su longitud, ver arriba).
+        """
+        command_words = {w.upper() for w in commands} | set(self.aliases.values())
+        self.vocabulary = {w.upper() for w in words} | command_words
+        self._by_key.clear()
+        self._keys_by_length.clear()
+        self._command_keys.clear()
+
+        ordered = [*self.aliases.values(), *(w.upper() for w in commands), *(w.upper() for w in words)]
+        for word in ordered:
+            key = phonetic_key(word)
+            if key and key not in self._by_key:
+                self._by_key[key] = word
+                self._keys_by_length.setdefault(len(key), []).append(key)
+                if word in command_words:
+                    self._command_keys.add(key)
+
+        self._snap.cache_clear()
+
+    def normalize(self, text: str) -> str:
+        text = text.upper()
+
+        if self._pattern is not None:
+            text = self._pattern.sub(lambda m: self.aliases[m.group(0)], text)
+
+        # [UNK] = comodín de la gramática Vosk, no es una palabra
+        tokens = [token for token in text.split() if token != "[UNK]"]
+        return " ".join(self._snap(token) for token in tokens)
+
     # --------------------------------------------------
-    word_aliases = {
-        # Fonética / reconocimiento
-        "TOP": "POLITOP",
-        "ACRILICA": "ENEKRIL",
-        "ACRILICO": "ENEKRIL",
-
-        # Variantes comunes
-        "EPOXY": "EPOXI",
-        "EPOSI": "EPOXI",
-        "NO": "CANCELAR",
-        "POLIZON": "POLITOP",
-    }
-
-    tokens = text.split()
-    normalized_tokens = [
-        word_aliases.get(token, token)
-        for token in tokens
-    ]
-
-    return " ".join(normalized_tokens)
+
+    def _snap_uncached(self, token: str) -> str:
+        if not self.vocabulary or token in self.vocabulary or token.isdigit():
+            return token
+
+        key = phonetic_key(token)
+        exact = self._by_key.get(key)
+        if exact is not None:
+            return exact
+
+        # Clave más cercana con una tolerancia según la longitud
+        max_distance = max(1, len(key) // 4)
+        best, best_distance = None, max_distance + 1
+        for length in range(len(key) - max_distance, len(key) + max_distance + 1):
+            for candidate in self._keys_by_length.get(length, ()):
+                distance = edit_distance(key, candidate)
+                if distance >= best_distance:
+                    continue
+                # Comandos: tolerancia según su propia longitud, sin mínimo de 1
+                if candidate in self._command_keys and distance > len(candidate) // 4:
+                    continue
+                best, best_distance = candidate, distance
+
+        return self._by_key[best] if best is not None else token
+
+
+_default_normalizer = None
+
+
+def normalize_command(text: str) -> str:
+    """Solo alias (sin vocabulario); para ajuste fonético usar VoiceNormalizer."""
+    global _default_normalizer
+    if _default_normalizer is None:
+        _default_normalizer = VoiceNormalizer()
+    return _default_normalizer.normalize(text)
@@ -2,11 +2,9 @@
 
 from PySide6.QtCore import QThread, Signal
 import json
-import queue
-import sounddevice as sd
-import json
 
-from vosk import Model, KaldiRecognizer
+from voice.audio_source import MicrophoneSource
+from voice.recognizer_service import get_recognizer_service, as_waveform
 
 
 class VoiceWorker(QThread):
@@ -17,33 +15,21 @@ class VoiceWorker(QThread):
         self.grammar = grammar
         self.running = True
         self.last_token = ""
+        self.source = MicrophoneSource()
 
 
     def run(self):
-        MODEL_PATH = "models/vosk-es"
-
-        q = queue.Queue()
-
-        def callback(indata, frames, time, status):
-            if self.running:
-                q.put(bytes(indata))
-
-        model = Model(MODEL_PATH)
-        recognizer = KaldiRecognizer(
-            model, 16000, json.dumps(self.grammar)
-        )
-
-        with sd.RawInputStream(
-            samplerate=16000,
-            blocksize=8000,
-            dtype="int16",
-            channels=1,
-            callback=callback
-        ):
+        # 🔹 Modelo compartido, ya cargado por RecognizerService
+        recognizer = get_recognizer_service().recognizer(self.grammar)
+
+        # 🔹 Buffer circular preasignado: sin bytes nuevos por bloque
+        with self.source:
             while self.running:
-                data = q.get()
+                data = self.source.read(timeout=0.1)
+                if data is None:
+                    continue
 
-                recognizer.AcceptWaveform(data)
+                recognizer.AcceptWaveform(as_waveform(data))
 
                 partial = json.loads(recognizer.PartialResult())
                 token = partial.get("partial", "").upper()
@@ -58,5 +44,3 @@ class VoiceWorker(QThread):
 
     def stop(self):
         self.running = False
-
-
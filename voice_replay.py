@@ -0,0 +1,233 @@
+# voice_replay.py
+"""
+Reproduce una dictación grabada (WAV / PCM int16 mono 16 kHz) a través de
+todo el pipeline: recognizer -> VoiceNormalizer -> CommandState.
+
+Uso:
+    python voice_replay.py grabacion.wav
+    python voice_replay.py grabacion.wav --realtime
+    python voice_replay.py grabacion.wav --gramatica plana
+    python voice_replay.py grabacion.raw --gramatica ninguna
+"""
+import argparse
+import time
+
+from core.env import load_env
+from core.session import ProformaSession
+from voice.audio_source import BLOCK_SIZE, FileAudioSource
+from voice.grammar_builder import build_grammar, build_mode_grammars, build_vocabulary, command_vocabulary
+from voice.recognition_loop import RecognitionLoop
+from voice.recognizer_service import MODEL_PATH, get_recognizer_service
+from voice.token_commit import HYPOTHESIS, NBEST, RETRACT
+from voice.vad import VAD_BLOCK_SIZE, EnergyVAD
+from voice.voice_normalizer import VoiceNormalizer
+
+GRAMMAR_CHOICES = ("modo", "plana", "ninguna")
+
+# Mensajes de CommandState que indican una palabra mal reconocida
+ERROR_MARKERS = ("no reconocida", "inválid", "fuera de rango")
+
+
+class StageTimer:
+    """Acumula tiempo total y número de llamadas por etapa."""
+
+    def __init__(self):
+        self.totals: dict[str, float] = {}
+        self.counts: dict[str, int] = {}
+
+    def add(self, stage: str, seconds: float):
+        self.totals[stage] = self.totals.get(stage, 0.0) + seconds
+        self.counts[stage] = self.counts.get(stage, 0) + 1
+
+    def report(self):
+        for stage, total in self.totals.items():
+            count = self.counts[stage]
+            print(
+                f"  {stage:<12} {total * 1000:9.1f} ms total  "
+                f"{total * 1000 / count:7.3f} ms/llamada  ({count} llamadas)"
+            )
+
+
+def replay(
+    path,
+    realtime=False,
+    speed=1.0,
+    grammar="modo",
+    use_vad=True,
+    vad_options=None,
+    model_path=MODEL_PATH,
+    verbose=True,
+    materials=None,
+):
+    """
+    Devuelve un dict con las métricas de la reproducción
+    (audio, wall, tokens, errores, first_token, timer, vad, committer, state, model).
+    """
+    session = ProformaSession(materials)
+    materials, model, state = session.materials, session.model, session.state
+    normalizer = VoiceNormalizer(
+        vocabulary=build_vocabulary(materials),
+        commands=command_vocabulary(materials),
+    )
+
+    service = get_recognizer_service(model_path)
+    start = time.perf_counter()
+    service.model()
+    model_seconds = time.perf_counter() - start
+
+    flat_grammar, mode_grammars = build_grammar(materials), build_mode_grammars(materials)
+    vad = EnergyVAD(**(vad_options or {})) if use_vad else None
+    if grammar == "modo":
+        loop = RecognitionLoop(service, mode_grammars[state.mode], mode_grammars=mode_grammars, vad=vad)
+    else:
+        loop = RecognitionLoop(service, flat_grammar if grammar == "plana" else None, vad=vad)
+    loop.start()
+    loop.set_mode(state.mode)
+
+    timer = StageTimer()
+    token_count = 0
+    error_count = 0
+    first_token_at = None
+
+    def process(events):
+        nonlocal token_count, error_count, first_token_at
+
+        for event in events:
+            if event.kind == HYPOTHESIS:
+                continue
+            if event.kind == RETRACT:
+                undone = session.retract(event.text)
+                loop.set_mode(state.mode)
+                if verbose:
+                    print(f"{event.text:<12} <- retractado{' (deshecho)' if undone else ''}")
+                continue
+            if first_token_at is None:
+                first_token_at = time.perf_counter()
+
+            t0 = time.perf_counter()
+            if event.kind == NBEST:
+                candidates = [normalizer.normalize(a.text).split() for a in event.alternatives]
+                words = candidates[state.choose_product_alternative(candidates)]
+                if verbose:
+                    print(f"{'N-best':<12} -> {' | '.join(a.text for a in event.alternatives)}")
+            else:
+                words = normalizer.normalize(event.text).split()
+            timer.add("normalize", time.perf_counter() - t0)
+
+            # N-best es el resultado final de la frase; un COMMIT aún se puede retractar
+            t0 = time.perf_counter()
+            if event.kind == NBEST:
+                batch = session.apply(words)
+            else:
+                batch = session.apply_voice([(event.text, words)])
+            timer.add("command", time.perf_counter() - t0)
+
+            for word, msg in zip(words, batch.messages):
+                token_count += 1
+                if any(marker in msg for marker in ERROR_MARKERS):
+                    error_count += 1
+                if verbose:
+                    print(f"{word:<12} -> {msg}")
+
+            # Gramática / N-best del nuevo modo desde el siguiente bloque
+            loop.set_mode(state.mode)
+
+    block_size = VAD_BLOCK_SIZE if use_vad else BLOCK_SIZE
+    source = FileAudioSource(path, realtime=realtime, speed=speed, block_size=block_size)
+    decode_start = time.perf_counter()
+
+    with source:
+        while True:
+            data = source.read()
+            if data is None:
+                break
+
+            # decode incluye VAD, AcceptWaveform y TokenCommitter
+            t0 = time.perf_counter()
+            events = loop.feed(data)
+            timer.add("decode", time.perf_counter() - t0)
+            process(events)
+
+        t0 = time.perf_counter()
+        events = loop.finish()
+        timer.add("decode", time.perf_counter() - t0)
+        process(events)
+
+    wall = time.perf_counter() - decode_start
+
+    return {
+        "audio": source.seconds_read,
+        "wall": wall,
+        "model_seconds": model_seconds,
+        "first_token": first_token_at - decode_start if first_token_at is not None else None,
+        "tokens": token_count,
+        "errors": error_count,
+        "timer": timer,
+        "vad": vad,
+        "committer": loop.committer,
+        "state": state,
+        "model": model,
+    }
+
+
+def print_report(stats):
+    audio = stats["audio"]
+    wall = stats["wall"]
+
+    print()
+    print(f"Audio:            {audio:.2f} s")
+    print(f"Tiempo total:     {wall:.2f} s  (RTF {wall / audio if audio else 0:.3f})")
+    print(f"Carga modelo:     {stats['model_seconds'] * 1000:.0f} ms")
+    if stats["first_token"] is not None:
+        print(f"Primer token:     {stats['first_token'] * 1000:.0f} ms")
+    print(f"Tokens:           {stats['tokens']}  ({stats['tokens'] / wall if wall else 0:.1f} tokens/s)")
+    print(f"No reconocidos:   {stats['errors']}")
+    print(stats["committer"].summary())
+    if stats["vad"]:
+        print(stats["vad"].summary())
+    print("Etapas:")
+    stats["timer"].report()
+    print("Transiciones:")
+    for line in stats["state"].transition_summary():
+        print(f"  {line}")
+
+
+def main():
+    load_env()
+    parser = argparse.ArgumentParser(description="Reproduce una dictación grabada")
+    parser.add_argument("path", help="fichero .wav o PCM crudo int16 mono 16 kHz")
+    parser.add_argument("--realtime", action="store_true", help="alimentar al ritmo real del audio")
+    parser.add_argument("--speed", type=float, default=1.0, help="factor de velocidad con --realtime")
+    parser.add_argument(
+        "--gramatica", choices=GRAMMAR_CHOICES, default="modo",
+        help="modo: una gramática por CommandMode · plana: build_grammar · ninguna: modelo completo",
+    )
+    parser.add_argument("--sin-vad", action="store_true", help="decodificar también los bloques de silencio")
+    parser.add_argument("--vad-start", type=float, help="RMS para entrar en voz")
+    parser.add_argument("--vad-stop", type=float, help="RMS para salir de voz")
+    parser.add_argument("--vad-zcr", type=float, help="ZCR máxima para considerar voz")
+    parser.add_argument("--vad-hangover", type=int, help="ms de silencio antes de cerrar la voz")
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("-q", "--quiet", action="store_true", help="no imprimir cada token")
+    args = parser.parse_args()
+
+    stats = replay(
+        args.path,
+        realtime=args.realtime,
+        speed=args.speed,
+        grammar=args.gramatica,
+        use_vad=not args.sin_vad,
+        vad_options={
+            "start_rms": args.vad_start,
+            "stop_rms": args.vad_stop,
+            "max_zcr": args.vad_zcr,
+            "hangover_ms": args.vad_hangover,
+        },
+        model_path=args.model,
+        verbose=not args.quiet,
+    )
+    print_report(stats)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,30 +1,32 @@
 import json
-import queue
-import sounddevice as sd
-from vosk import Model, KaldiRecognizer
+import sys
+from voice.audio_source import FileAudioSource, MicrophoneSource
+from core.env import load_env
+from voice.recognizer_service import MODEL_PATH, as_waveform, get_recognizer_service
 
-MODEL_PATH = "models/vosk-es"
+load_env()
 
-q = queue.Queue()
+# Modelo completo, sin gramática
+recognizer = get_recognizer_service(MODEL_PATH).recognizer()
 
-def callback(indata, frames, time, status):
-    q.put(bytes(indata))
+# python voice_test.py [grabacion.wav] -> fichero en vez de micrófono
+if len(sys.argv) > 1:
+    source = FileAudioSource(sys.argv[1], realtime=True)
+else:
+    source = MicrophoneSource()
 
-model = Model(MODEL_PATH)
-recognizer = KaldiRecognizer(model, 16000)
-
-with sd.RawInputStream(
-    samplerate=16000,
-    blocksize=8000,
-    dtype="int16",
-    channels=1,
-    callback=callback
-):
+with source:
     print("🎙️ Escuchando... (Ctrl+C para salir)")
-    while True:
-        data = q.get()
-        if recognizer.AcceptWaveform(data):
+    while not source.finished:
+        data = source.read()
+        if data is None:
+            continue
+        if recognizer.AcceptWaveform(as_waveform(data)):
             result = json.loads(recognizer.Result())
             text = result.get("text", "")
             if text:
                 print("Reconocido:", text)
+
+    text = json.loads(recognizer.FinalResult()).get("text", "")
+    if text:
+        print("Reconocido:", text)